@@ -1,7 +1,6 @@
 """Threading module, used to launch games while monitoring them."""
 import contextlib
 import fcntl
-import io
 import os
 import shlex
 import subprocess
@@ -14,6 +13,7 @@ from gi.repository import GLib
 from lutris import runtime, settings
 from lutris.util import system
 from lutris.util.log import logger
+from lutris.util.log_store import LogStore
 from lutris.util.shell import get_terminal_script
 
 
@@ -51,6 +51,7 @@ class MonitoredCommand:
         include_processes=None,
         exclude_processes=None,
         log_buffer=None,
+        log_store=None,
         title=None,
     ):  # pylint: disable=too-many-arguments
         self.ready_state = True
@@ -78,13 +79,14 @@ class MonitoredCommand:
 
         self.cwd = self.get_cwd(cwd)
 
-        self._stdout = io.StringIO()
+        self.log_store = log_store if log_store is not None else LogStore()
 
         self._title = title if title else command[0]
 
     @property
     def stdout(self):
-        return self._stdout.getvalue()
+        """The whole output of the command; this can be large, prefer log_store"""
+        return "".join(self.log_store.iter_text())
 
     def get_wrapper_command(self):
         """Return launch arguments for the wrapper script"""
@@ -180,14 +182,22 @@ class MonitoredCommand:
         return True
 
     def log_handler_stdout(self, line):
-        """Add the line to this command's stdout attribute"""
+        """Add the line to this command's log store"""
         if not self.log_filter(line):
             return
-        self._stdout.write(line)
+        self.log_store.append(line)
 
     def log_handler_buffer(self, line):
-        """Add the line to the associated LogBuffer object"""
+        """Add the line to the associated LogBuffer object, which only keeps
+        the most recent lines; older ones are read back from the log store."""
+        if not self.log_filter(line):
+            return
         self.log_buffer.insert(self.log_buffer.get_end_iter(), line, -1)
+        excess_lines = self.log_buffer.get_line_count() - self.log_store.max_memory_lines
+        if excess_lines > 0:
+            # Trim a block at a time, so the start of the buffer isn't deleted on each output
+            excess_lines += self.log_store.block_lines // 2
+            self.log_buffer.delete(self.log_buffer.get_start_iter(), self.log_buffer.get_iter_at_line(excess_lines))
 
     def log_handler_console_output(self, line):
         """Print the line to stdout"""
@@ -0,0 +1,113 @@
+"""Query plan diagnostics for the queries Lutris runs the most"""
+from lutris import settings
+from lutris.database import sql
+
+# Description, query, parameters and whether a full table scan is expected
+STANDARD_QUERIES = [
+    ("Game by id", "SELECT * FROM games where id=?", (1, ), False),
+    ("Game by slug", "SELECT * FROM games where slug=?", ("slug", ), False),
+    ("Game by config path", "SELECT * FROM games where configpath=?", ("slug-1234", ), False),
+    ("Games by runner", "SELECT * FROM games where runner=?", ("wine", ), False),
+    ("Games by id", "select * from games WHERE id in (?, ?, ?)", (1, 2, 3), False),
+    (
+        "Installed games",
+        "select * from games WHERE installed = ? ORDER BY slug ASC",
+        (1, ),
+        False,
+    ),
+    (
+        "Installed games for a runner",
+        "select * from games WHERE installed = ? AND runner = ? ORDER BY slug ASC",
+        (1, "wine"),
+        False,
+    ),
+    (
+        "Installed games for a service",
+        "select * from games WHERE service = ? AND installed = ? ORDER BY slug ASC",
+        ("gog", 1),
+        False,
+    ),
+    (
+        "Game for a service id",
+        "select * from games WHERE service_id = ? AND service = ? ORDER BY slug ASC",
+        ("1234", "gog"),
+        False,
+    ),
+    ("All games", "select * from games ORDER BY slug ASC", (), True),
+    (
+        "Page of games by name",
+        "select * from games ORDER BY sort_key ASC, id ASC LIMIT ? OFFSET ?",
+        (100, 200),
+        False,
+    ),
+    (
+        "Service games",
+        "select * from service_games WHERE service = ? ORDER BY slug ASC",
+        ("gog", ),
+        False,
+    ),
+    (
+        "Service game by appid",
+        "select * from service_games WHERE service = ? AND appid = ? ORDER BY slug ASC",
+        ("gog", "1234"),
+        False,
+    ),
+    (
+        "Games in category",
+        "SELECT game_id FROM games_categories "
+        "JOIN categories ON categories.id = games_categories.category_id "
+        "WHERE categories.name=?",
+        ("favorite", ),
+        False,
+    ),
+    (
+        "Categories of a game",
+        "SELECT categories.name FROM categories "
+        "JOIN games_categories ON categories.id = games_categories.category_id "
+        "JOIN games ON games.id = games_categories.game_id "
+        "WHERE games.id=?",
+        (1, ),
+        False,
+    ),
+    (
+        "TOSEC ROM sets by MD5",
+        "SELECT * FROM tosec_roms WHERE (dat, game) IN "
+        "(SELECT dat, game FROM tosec_roms WHERE md5 IN (?, ?)) ORDER BY dat, game, id",
+        ("d41d8cd98f00b204e9800998ecf8427e", "0cc175b9c0f1b6a831c399e269772661"),
+        False,
+    ),
+]
+
+
+def is_table_scan(detail):
+    """True if a query plan step reads a whole table without an index"""
+    return detail.startswith("SCAN") and "USING" not in detail
+
+
+def explain_query(query, params=(), db_path=None):
+    """Return the steps of the query plan of a query"""
+    with sql.db_cursor(db_path or settings.PGA_DB, readonly=True) as cursor:
+        # EXPLAIN doesn't check if the schema changed since the connection
+        # loaded it, reading from sqlite_master forces a reload.
+        cursor.execute("SELECT count(*) FROM sqlite_master").fetchall()
+        rows = cursor.execute("EXPLAIN QUERY PLAN " + query, params).fetchall()
+    return [row[3] for row in rows]
+
+
+def explain_standard_queries(db_path=None):
+    """Run EXPLAIN QUERY PLAN over the standard queries.
+
+    Returns:
+        list: dicts with the description, query, plan and the table scans
+        that aren't expected for each query
+    """
+    report = []
+    for description, query, params, scan_expected in STANDARD_QUERIES:
+        plan = explain_query(query, params, db_path=db_path)
+        report.append({
+            "description": description,
+            "query": query,
+            "plan": plan,
+            "unexpected_scans": [] if scan_expected else [step for step in plan if is_table_scan(step)],
+        })
+    return report
@@ -0,0 +1,36 @@
+"""Paths of the main file of installed games, used to find missing games"""
+from lutris import settings
+from lutris.database import sql
+
+
+def get_game_paths():
+    """Return the paths of the games, by game ID as a string"""
+    rows = sql.db_query(
+        settings.PGA_DB,
+        "SELECT game_paths.game_id, game_paths.path FROM game_paths "
+        "JOIN games ON games.id = game_paths.game_id"
+    )
+    return {str(row["game_id"]): row["path"] for row in rows}
+
+
+def has_game_paths():
+    return bool(sql.db_query(settings.PGA_DB, "SELECT game_id FROM game_paths LIMIT 1"))
+
+
+def set_game_paths(game_paths):
+    """Add or update the paths of games, given by game ID"""
+    sql.db_upsert_many(
+        settings.PGA_DB,
+        "game_paths",
+        [{"game_id": int(game_id), "path": path} for game_id, path in game_paths.items()],
+        ["game_id"]
+    )
+
+
+def delete_game_path(game_id):
+    sql.db_delete(settings.PGA_DB, "game_paths", "game_id", int(game_id))
+
+
+def clear_game_paths():
+    with sql.db_cursor(settings.PGA_DB) as cursor:
+        cursor.execute("DELETE FROM game_paths")
@@ -5,28 +5,90 @@ from itertools import chain
 from lutris import settings
 from lutris.database import sql
 from lutris.util.log import logger
-from lutris.util.strings import slugify
+from lutris.util.strings import get_natural_sort_key, slugify
 
 _SERVICE_CACHE = {}
 _SERVICE_CACHE_ACCESSED = False  # Keep time of last access to have a self degrading cache
+# Leading words ignored when sorting games by name
+SORT_KEY_ARTICLES = ("the ", "a ", "an ")
 
 
 def get_games(
     searches=None,
     filters=None,
     excludes=None,
-    sorts=None
+    sorts=None,
+    text_search=None,
+    limit=None,
+    offset=None
 ):
-    return sql.filtered_query(
+    """Return a list of games as read-only records, see sql.filtered_query()
+    for the arguments"""
+    return list(iter_games(
+        searches=searches,
+        filters=filters,
+        excludes=excludes,
+        sorts=sorts,
+        text_search=text_search,
+        limit=limit,
+        offset=offset
+    ))
+
+
+def iter_games(
+    searches=None,
+    filters=None,
+    excludes=None,
+    sorts=None,
+    text_search=None,
+    fields=None,
+    limit=None,
+    offset=None
+):
+    """Yield games as read-only records, selecting only `fields` if given"""
+    return sql.iter_filtered_query(
         settings.PGA_DB,
         "games",
+        fields=fields,
         searches=searches,
         filters=filters,
         excludes=excludes,
-        sorts=sorts
+        sorts=sorts,
+        text_search=text_search,
+        limit=limit,
+        offset=offset
     )
 
 
+def get_sort_key(name, sortname=None):
+    """Return the key games are sorted by name with: the natural sort key of
+    their sort name or, if they have none, of their name without its leading
+    article. Keys compare correctly as plain strings, SQLite sorts and indexes
+    them without a custom collation."""
+    if sortname:
+        return get_natural_sort_key(sortname)
+    name = (name or "").strip()
+    for article in SORT_KEY_ARTICLES:
+        if name[:len(article)].casefold() == article and len(name) > len(article):
+            name = name[len(article):].lstrip()
+            break
+    return get_natural_sort_key(name)
+
+
+def update_missing_sort_keys():
+    """Fill in the sort keys of the games that have none, like those added
+    before the sort_key column existed"""
+    rows = sql.db_query(settings.PGA_DB, "SELECT id, name, sortname FROM games WHERE sort_key IS NULL")
+    if not rows:
+        return
+    logger.info("Computing the sort keys of %s games", len(rows))
+    with sql.db_transaction(settings.PGA_DB) as cursor:
+        cursor.executemany(
+            "UPDATE games SET sort_key = ? WHERE id = ?",
+            [(get_sort_key(row["name"], row["sortname"]), row["id"]) for row in rows]
+        )
+
+
 def get_games_where(**conditions):
     """
         Query games table based on conditions
@@ -118,10 +180,13 @@ def get_service_games(service):
     _SERVICE_CACHE_ACCESSED = time.time()
     if service not in _SERVICE_CACHE or _SERVICE_CACHE_ACCESSED - previous_cache_accessed > 1:
         if service == "lutris":
-            _SERVICE_CACHE[service] = [game["slug"] for game in get_games(filters={"installed": "1"})]
+            _SERVICE_CACHE[service] = [
+                game["slug"] for game in iter_games(filters={"installed": "1"}, fields=("slug", ))
+            ]
         else:
             _SERVICE_CACHE[service] = [
-                game["service_id"] for game in get_games(filters={"service": service, "installed": "1"})
+                game["service_id"]
+                for game in iter_games(filters={"service": service, "installed": "1"}, fields=("service_id", ))
             ]
     return _SERVICE_CACHE[service]
 
@@ -151,6 +216,7 @@ def add_game(**game_data):
     game_data["installed_at"] = int(time.time())
     if "slug" not in game_data:
         game_data["slug"] = slugify(game_data["name"])
+    game_data["sort_key"] = get_sort_key(game_data.get("name"), game_data.get("sortname"))
     return sql.db_insert(settings.PGA_DB, "games", game_data)
 
 
@@ -164,7 +230,8 @@ def add_games_bulk(games):
         Returns:
             list: List of inserted game ids
     """
-    return [sql.db_insert(settings.PGA_DB, "games", game) for game in games]
+    games = [dict(game, sort_key=get_sort_key(game.get("name"), game.get("sortname"))) for game in games]
+    return sql.db_insert_many(settings.PGA_DB, "games", games)
 
 
 def add_or_update(**params):
@@ -187,6 +254,12 @@ def update_existing(**params):
     game_id = get_matching_game(params)
     if game_id:
         params["id"] = game_id
+        if "name" in params or "sortname" in params:
+            game = {} if "name" in params and "sortname" in params else get_game_by_field(game_id, "id")
+            params["sort_key"] = get_sort_key(
+                params["name"] if "name" in params else game.get("name"),
+                params["sortname"] if "sortname" in params else game.get("sortname"),
+            )
         sql.db_update(settings.PGA_DB, "games", params, {"id": game_id})
         return game_id
     return None
@@ -220,7 +293,7 @@ def delete_game(game_id):
 
 def get_used_runners():
     """Return a list of the runners in use by installed games."""
-    with sql.db_cursor(settings.PGA_DB) as cursor:
+    with sql.db_cursor(settings.PGA_DB, readonly=True) as cursor:
         query = "select distinct runner from games where runner is not null order by runner"
         rows = cursor.execute(query)
         results = rows.fetchall()
@@ -229,7 +302,7 @@ def get_used_runners():
 
 def get_used_platforms():
     """Return a list of platforms currently in use"""
-    with sql.db_cursor(settings.PGA_DB) as cursor:
+    with sql.db_cursor(settings.PGA_DB, readonly=True) as cursor:
         query = (
             "select distinct platform from games "
             "where platform is not null and platform is not '' order by platform"
@@ -0,0 +1,40 @@
+"""Resource usage of the play sessions of games"""
+from lutris import settings
+from lutris.database import sql
+
+PLAY_SESSION_FIELDS = (
+    "started_at",
+    "ended_at",
+    "samples",
+    "cpu_time",
+    "cpu_percent_avg",
+    "cpu_percent_max",
+    "rss_max",
+    "pss_max",
+    "read_bytes",
+    "write_bytes",
+    "threads_max",
+    "gpu_busy_avg",
+    "gpu_busy_max",
+)
+
+
+def add_play_session(game_id, summary):
+    """Store the resource usage summary of a play session, as returned by
+    ResourceSampler.get_summary()"""
+    fields = {field: summary[field] for field in PLAY_SESSION_FIELDS}
+    return sql.db_insert(settings.PGA_DB, "play_sessions", dict(fields, game_id=game_id))
+
+
+def get_play_sessions(game_id=None):
+    """Return the play sessions of a game, or of all games, along with the
+    slug and name of their game, oldest first"""
+    query = (
+        "SELECT play_sessions.*, games.slug, games.name FROM play_sessions "
+        "LEFT JOIN games ON games.id = play_sessions.game_id"
+    )
+    params = ()
+    if game_id is not None:
+        query += " WHERE play_sessions.game_id = ?"
+        params = (game_id, )
+    return sql.db_query(settings.PGA_DB, query + " ORDER BY play_sessions.started_at", params)
@@ -1,4 +1,5 @@
 from lutris import settings
+from lutris.database import games as games_db
 from lutris.database import sql
 from lutris.util.log import logger
 
@@ -101,6 +102,10 @@ DATABASE = {
             "name": "discord_id",
             "type": "TEXT",
         },
+        {
+            "name": "sort_key",
+            "type": "TEXT"
+        },
     ],
     "service_games": [
         {
@@ -156,7 +161,64 @@ DATABASE = {
     "games_categories": [
         {"name": "game_id", "type": "INTEGER", "indexed": False},
         {"name": "category_id", "type": "INTEGER", "indexed": False},
-    ]
+    ],
+    "game_paths": [
+        {"name": "game_id", "type": "INTEGER", "indexed": True},
+        {"name": "path", "type": "TEXT"},
+    ],
+    "play_sessions": [
+        {"name": "id", "type": "INTEGER", "indexed": True},
+        {"name": "game_id", "type": "INTEGER"},
+        {"name": "started_at", "type": "INTEGER"},
+        {"name": "ended_at", "type": "INTEGER"},
+        {"name": "samples", "type": "INTEGER"},
+        {"name": "cpu_time", "type": "REAL"},
+        {"name": "cpu_percent_avg", "type": "REAL"},
+        {"name": "cpu_percent_max", "type": "REAL"},
+        {"name": "rss_max", "type": "INTEGER"},
+        {"name": "pss_max", "type": "INTEGER"},
+        {"name": "read_bytes", "type": "INTEGER"},
+        {"name": "write_bytes", "type": "INTEGER"},
+        {"name": "threads_max", "type": "INTEGER"},
+        {"name": "gpu_busy_avg", "type": "REAL"},
+        {"name": "gpu_busy_max", "type": "INTEGER"},
+    ],
+    "tosec_roms": [
+        {"name": "id", "type": "INTEGER", "indexed": True},
+        {"name": "dat", "type": "TEXT"},
+        {"name": "category", "type": "TEXT"},
+        {"name": "game", "type": "TEXT"},
+        {"name": "name", "type": "TEXT"},
+        {"name": "size", "type": "INTEGER"},
+        {"name": "crc", "type": "TEXT"},
+        {"name": "md5", "type": "TEXT"},
+        {"name": "sha1", "type": "TEXT"},
+    ],
+}
+
+# Indexes created on top of the tables; unique indexes are relied upon by upserts.
+# Check the query plans with `lutris --db-explain` when changing these.
+INDEXES = [
+    {"name": "games_slug", "table": "games", "fields": ["slug"]},
+    {"name": "games_service_service_id", "table": "games", "fields": ["service", "service_id"]},
+    {"name": "games_installed_runner", "table": "games", "fields": ["installed", "runner"]},
+    {"name": "games_runner", "table": "games", "fields": ["runner"]},
+    {"name": "games_configpath", "table": "games", "fields": ["configpath"]},
+    {"name": "games_sort_key", "table": "games", "fields": ["sort_key"]},
+    {"name": "service_games_service_appid", "table": "service_games", "fields": ["service", "appid"], "unique": True},
+    {"name": "games_categories_category_game", "table": "games_categories", "fields": ["category_id", "game_id"]},
+    {"name": "games_categories_game", "table": "games_categories", "fields": ["game_id"]},
+    {"name": "play_sessions_game", "table": "play_sessions", "fields": ["game_id"]},
+    {"name": "tosec_roms_md5", "table": "tosec_roms", "fields": ["md5"]},
+    {"name": "tosec_roms_sha1", "table": "tosec_roms", "fields": ["sha1"]},
+    {"name": "tosec_roms_crc", "table": "tosec_roms", "fields": ["crc"]},
+    {"name": "tosec_roms_dat_game", "table": "tosec_roms", "fields": ["dat", "game"]},
+]
+
+# Fields indexed for full-text search, the indexes are kept in sync by triggers
+FTS_INDEXES = {
+    "games": ["name", "sortname", "slug", "platform"],
+    "service_games": ["name", "slug", "lutris_slug"],
 }
 
 
@@ -172,7 +234,7 @@ def get_schema(tablename):
     """
     tables = []
     query = "pragma table_info('%s')" % tablename
-    with sql.db_cursor(settings.PGA_DB) as cursor:
+    with sql.db_cursor(settings.PGA_DB, readonly=True) as cursor:
         for row in cursor.execute(query).fetchall():
             field = {
                 "name": row[1],
@@ -204,6 +266,78 @@ def create_table(name, schema):
         cursor.execute(query)
 
 
+def get_indexes():
+    """Return the names of the indexes present in the database"""
+    with sql.db_cursor(settings.PGA_DB, readonly=True) as cursor:
+        rows = cursor.execute("SELECT name FROM sqlite_master WHERE type='index'").fetchall()
+    return [row[0] for row in rows]
+
+
+def create_index(name, table, fields, unique=False):
+    """Creates an index on the given fields of a table. Before adding a unique index,
+    duplicate rows are removed, keeping the most recent one."""
+    columns = ", ".join(fields)
+    query = "CREATE %sINDEX IF NOT EXISTS %s ON %s (%s)" % ("UNIQUE " if unique else "", name, table, columns)
+    logger.debug("[PGAQuery] %s", query)
+    with sql.db_cursor(settings.PGA_DB) as cursor:
+        if unique:
+            cursor.execute(
+                "DELETE FROM %s WHERE id NOT IN (SELECT MAX(id) FROM %s GROUP BY %s)" % (table, table, columns)
+            )
+            if cursor.rowcount > 0:
+                logger.info("Removed %s duplicate rows from %s", cursor.rowcount, table)
+        cursor.execute(query)
+
+
+def create_fts_index(table, fields):
+    """Creates (or re-creates) a FTS5 index for the given fields of a table, along
+    with the triggers that keep it up to date, and fills it."""
+    fts_table = table + "_fts"
+    columns = ", ".join(fields)
+    new_values = ", ".join("new.%s" % field for field in fields)
+    old_values = ", ".join("old.%s" % field for field in fields)
+    insert_new = "INSERT INTO {0}(rowid, {1}) VALUES (new.id, {2});".format(fts_table, columns, new_values)
+    delete_old = "INSERT INTO {0}({0}, rowid, {1}) VALUES ('delete', old.id, {2});".format(
+        fts_table, columns, old_values
+    )
+    logger.info("Creating full-text search index for %s", table)
+    with sql.db_cursor(settings.PGA_DB) as cursor:
+        drop_fts_triggers(cursor, table)
+        cursor.execute("DROP TABLE IF EXISTS %s" % fts_table)
+        cursor.execute(
+            "CREATE VIRTUAL TABLE %s USING fts5(%s, content='%s', content_rowid='id', "
+            "tokenize='unicode61 remove_diacritics 2', prefix='1 2 3')" % (fts_table, columns, table)
+        )
+        cursor.execute("CREATE TRIGGER %s_insert AFTER INSERT ON %s BEGIN %s END" % (fts_table, table, insert_new))
+        cursor.execute("CREATE TRIGGER %s_delete AFTER DELETE ON %s BEGIN %s END" % (fts_table, table, delete_old))
+        cursor.execute(
+            "CREATE TRIGGER %s_update AFTER UPDATE OF %s ON %s BEGIN %s %s END"
+            % (fts_table, columns, table, delete_old, insert_new)
+        )
+        cursor.execute("INSERT INTO {0}({0}) VALUES ('rebuild')".format(fts_table))
+
+
+def drop_fts_triggers(cursor, table):
+    """Removes the triggers updating the full-text index of a table"""
+    for action in ("insert", "delete", "update"):
+        cursor.execute("DROP TRIGGER IF EXISTS %s_fts_%s" % (table, action))
+
+
+def sync_fts_indexes():
+    """Creates the missing full-text search indexes. If SQLite lacks the FTS5 module,
+    the triggers are removed instead so that the tables stay writable; searches
+    will then fall back to plain LIKE queries."""
+    fts5_available = sql.is_fts5_available()
+    for table, fields in FTS_INDEXES.items():
+        has_index = sql.has_fts_index(settings.PGA_DB, table)
+        if fts5_available and not has_index:
+            create_fts_index(table, fields)
+        elif has_index and not fts5_available:
+            logger.warning("SQLite has no FTS5 support, full-text search is disabled for %s", table)
+            with sql.db_cursor(settings.PGA_DB) as cursor:
+                drop_fts_triggers(cursor, table)
+
+
 def migrate(table, schema):
     """Compare a database table with the reference model and make necessary changes
 
@@ -236,3 +370,9 @@ def syncdb():
     for backwards compatibility."""
     for table_name, table_data in DATABASE.items():
         migrate(table_name, table_data)
+    games_db.update_missing_sort_keys()
+    existing_indexes = get_indexes()
+    for index in INDEXES:
+        if index["name"] not in existing_indexes:
+            create_index(**index)
+    sync_fts_indexes()
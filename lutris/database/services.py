@@ -11,22 +11,29 @@ class ServiceGameCollection:
         searches=None,
         filters=None,
         excludes=None,
-        sorts=None
+        sorts=None,
+        text_search=None
     ):
-        return sql.filtered_query(
+        return list(sql.iter_filtered_query(
             settings.PGA_DB,
             "service_games",
             searches=searches,
             filters=filters,
             excludes=excludes,
-            sorts=sorts
-        )
+            sorts=sorts,
+            text_search=text_search
+        ))
 
     @classmethod
-    def get_for_service(cls, service):
+    def get_for_service(cls, service, text_search=None):
         if not service:
             raise ValueError("No service provided")
-        return sql.filtered_query(settings.PGA_DB, "service_games", filters={"service": service})
+        return list(sql.iter_filtered_query(
+            settings.PGA_DB,
+            "service_games",
+            filters={"service": service},
+            text_search=text_search
+        ))
 
     @classmethod
     def get_game(cls, service, appid):
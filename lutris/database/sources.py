@@ -15,7 +15,7 @@ def delete_source(uri):
 
 
 def read_sources():
-    with sql.db_cursor(settings.PGA_DB) as cursor:
+    with sql.db_cursor(settings.PGA_DB, readonly=True) as cursor:
         rows = cursor.execute("select uri from sources")
         results = rows.fetchall()
     return [row[0] for row in results]
@@ -1,39 +1,195 @@
-
+import atexit
+import os
+import re
 import sqlite3
 import threading
+from contextlib import contextmanager
+from functools import lru_cache
 
 from lutris.util.log import logger
 
-# Prevent multiple access to the database (SQLite limitation)
+# SQLite only allows a single writer at a time, writes are serialized on this lock.
+# Readers don't need it: the database is in WAL mode and readers use their own connections.
 DB_LOCK = threading.RLock()
 
+# Seconds SQLite waits for a lock held by another connection (or process) before failing
+BUSY_TIMEOUT = 30
 
-class db_cursor(object):
+# Number of compiled statements each connection keeps around for reuse
+STATEMENT_CACHE_SIZE = 256
 
-    def __init__(self, db_path):
-        self.db_path = db_path
-        self.db_conn = None
+# Idle reader connections kept open per database
+MAX_IDLE_READERS = 8
 
-    def __enter__(self):
-        self.db_conn = sqlite3.connect(self.db_path)
-        cursor = self.db_conn.cursor()
-        return cursor
 
-    def __exit__(self, _type, value, traceback):
-        self.db_conn.commit()
-        self.db_conn.close()
+class ConnectionPool:
+    """Keep persistent connections to SQLite databases.
 
+    Each database gets one writer connection, only used while holding DB_LOCK,
+    and a pool of reader connections that threads check out for the duration
+    of a query. Connections are reopened if the database file gets deleted
+    or replaced behind our back.
+    """
 
-def cursor_execute(cursor, query, params=None):
-    """Execute a SQL query, run it in a lock block"""
-    params = params or ()
-    lock = DB_LOCK.acquire(timeout=1)  # pylint: disable=consider-using-with
-    if not lock:
-        logger.error("Database is busy. Not executing %s", query)
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._writers = {}
+        self._idle_readers = {}
+        self._file_ids = {}
+        self._generations = {}
+
+    @staticmethod
+    def _get_file_id(db_path):
+        try:
+            stat = os.stat(db_path)
+        except OSError:
+            return None
+        return stat.st_dev, stat.st_ino
+
+    def _validate(self, db_path):
+        """Drop existing connections if the file they point to is gone"""
+        known_id = self._file_ids.get(db_path)
+        if known_id and known_id != self._get_file_id(db_path):
+            logger.debug("Database %s has been replaced, reconnecting", db_path)
+            self.close(db_path)
+
+    def _connect(self, db_path):
+        connection = sqlite3.connect(
+            db_path,
+            timeout=BUSY_TIMEOUT,
+            isolation_level=None,
+            check_same_thread=False,
+            cached_statements=STATEMENT_CACHE_SIZE,
+        )
+        journal_mode = connection.execute("PRAGMA journal_mode=WAL").fetchone()[0]
+        if journal_mode.lower() == "wal":
+            connection.execute("PRAGMA synchronous=NORMAL")
+        else:
+            logger.debug("WAL journaling not available for %s (using %s)", db_path, journal_mode)
+        with self._lock:
+            self._file_ids[db_path] = self._get_file_id(db_path)
+        return connection
+
+    def get_writer(self, db_path, validate=True):
+        """Return the writer connection, the caller must hold DB_LOCK"""
+        if validate:
+            self._validate(db_path)
+        if db_path not in self._writers:
+            self._writers[db_path] = self._connect(db_path)
+        return self._writers[db_path]
+
+    def in_transaction(self, db_path):
+        """True if the current thread has a transaction open on db_path"""
+        return db_path in getattr(self._local, "transactions", ())
+
+    def set_in_transaction(self, db_path, active):
+        transactions = getattr(self._local, "transactions", None)
+        if transactions is None:
+            transactions = self._local.transactions = set()
+        if active:
+            transactions.add(db_path)
+        else:
+            transactions.discard(db_path)
+
+    def checkout_reader(self, db_path):
+        """Return a reader connection and the pool generation it belongs to"""
+        self._validate(db_path)
+        with self._lock:
+            generation = self._generations.get(db_path, 0)
+            idle_readers = self._idle_readers.get(db_path)
+            if idle_readers:
+                return idle_readers.pop(), generation
+        return self._connect(db_path), generation
+
+    def checkin_reader(self, db_path, connection, generation):
+        """Give back a connection obtained with checkout_reader"""
+        with self._lock:
+            idle_readers = self._idle_readers.setdefault(db_path, [])
+            if generation == self._generations.get(db_path, 0) and len(idle_readers) < MAX_IDLE_READERS:
+                idle_readers.append(connection)
+                return
+        connection.close()
+
+    def close(self, db_path=None):
+        """Close connections to db_path, or to every database if not given"""
+        with DB_LOCK:
+            with self._lock:
+                db_paths = [db_path] if db_path else list(set(self._writers) | set(self._idle_readers))
+                connections = []
+                for path in db_paths:
+                    self._generations[path] = self._generations.get(path, 0) + 1
+                    self._file_ids.pop(path, None)
+                    connections += self._idle_readers.pop(path, [])
+                    if path in self._writers:
+                        connections.append(self._writers.pop(path))
+            for connection in connections:
+                connection.close()
+
+
+_POOL = ConnectionPool()
+atexit.register(_POOL.close)
+
+
+def close_connections(db_path=None):
+    """Close the persistent connections to db_path (or all databases)"""
+    _POOL.close(db_path)
+
+
+@contextmanager
+def db_transaction(db_path):
+    """Run the enclosed statements in a single write transaction.
+
+    Everything is committed when the block exits, or rolled back if it raises.
+    Nested scopes join the outermost transaction.
+    """
+    with DB_LOCK:
+        if _POOL.in_transaction(db_path):
+            yield _POOL.get_writer(db_path, validate=False).cursor()
+            return
+        connection = _POOL.get_writer(db_path)
+        connection.execute("BEGIN IMMEDIATE")
+        _POOL.set_in_transaction(db_path, True)
+        try:
+            yield connection.cursor()
+        except BaseException:
+            connection.rollback()
+            raise
+        else:
+            connection.commit()
+        finally:
+            _POOL.set_in_transaction(db_path, False)
+
+
+@contextmanager
+def db_read_cursor(db_path):
+    """Return a cursor on a reader connection, which doesn't wait on writers.
+    Inside a transaction, the transaction's connection is used so that
+    uncommitted changes are visible."""
+    if _POOL.in_transaction(db_path):
+        with db_transaction(db_path) as cursor:
+            yield cursor
         return
-    results = cursor.execute(query, params)
-    DB_LOCK.release()
-    return results
+    connection, generation = _POOL.checkout_reader(db_path)
+    cursor = connection.cursor()
+    try:
+        yield cursor
+    finally:
+        cursor.close()
+        _POOL.checkin_reader(db_path, connection, generation)
+
+
+def db_cursor(db_path, readonly=False):
+    """Return a context manager yielding a cursor on the database. Unless readonly,
+    the statements run in a write transaction committed at the end of the block."""
+    if readonly:
+        return db_read_cursor(db_path)
+    return db_transaction(db_path)
+
+
+def cursor_execute(cursor, query, params=None):
+    """Execute a SQL query with the given parameters"""
+    return cursor.execute(query, params or ())
 
 
 def db_insert(db_path, table, fields):
@@ -50,6 +206,49 @@ def db_insert(db_path, table, fields):
     return inserted_id
 
 
+def db_insert_many(db_path, table, rows):
+    """Insert several rows in a single transaction.
+    The dicts must have an identical set of keys.
+
+    Returns:
+        list: The ids of the inserted rows
+    """
+    if not rows:
+        return []
+    columns = list(rows[0])
+    placeholders = ", ".join("?" * len(columns))
+    query = "insert into {0}({1}) values ({2})".format(table, ", ".join(columns), placeholders)
+    inserted_ids = []
+    with db_transaction(db_path) as cursor:
+        for row in rows:
+            cursor.execute(query, tuple(row[column] for column in columns))
+            inserted_ids.append(cursor.lastrowid)
+    return inserted_ids
+
+
+def db_upsert_many(db_path, table, rows, conflict_fields):
+    """Insert several rows in a single transaction, updating the existing rows
+    that have the same values for `conflict_fields` instead. Those fields must
+    be covered by a unique index. The dicts must have an identical set of keys.
+    """
+    if not rows:
+        return
+    columns = list(rows[0])
+    placeholders = ", ".join("?" * len(columns))
+    updated_columns = ", ".join(
+        "{0}=excluded.{0}".format(column) for column in columns if column not in conflict_fields
+    )
+    query = "INSERT INTO {0}({1}) VALUES ({2}) ON CONFLICT({3}) DO {4}".format(
+        table,
+        ", ".join(columns),
+        placeholders,
+        ", ".join(conflict_fields),
+        "UPDATE SET " + updated_columns if updated_columns else "NOTHING"
+    )
+    with db_transaction(db_path) as cursor:
+        cursor.executemany(query, [tuple(row[column] for column in columns) for row in rows])
+
+
 def db_update(db_path, table, updated_fields, conditions):
     """Update `table` with the values given in the dict `values` on the
        condition given with the `row` tuple.
@@ -76,7 +275,7 @@ def db_select(db_path, table, fields=None, condition=None):
         columns = ", ".join(fields)
     else:
         columns = "*"
-    with db_cursor(db_path) as cursor:
+    with db_cursor(db_path, readonly=True) as cursor:
         query = "SELECT {} FROM {}"
         if condition:
             condition_field, condition_value = condition
@@ -96,27 +295,70 @@ def db_select(db_path, table, fields=None, condition=None):
         cursor_execute(cursor, query, params)
         rows = cursor.fetchall()
         column_names = [column[0] for column in cursor.description]
-    results = []
-    for row in rows:
-        row_data = {}
-        for index, column in enumerate(column_names):
-            row_data[column] = row[index]
-        results.append(row_data)
-    return results
+    return [dict(zip(column_names, row)) for row in rows]
 
 
 def db_query(db_path, query, params=()):
-    with db_cursor(db_path) as cursor:
+    with db_cursor(db_path, readonly=True) as cursor:
         cursor_execute(cursor, query, params)
         rows = cursor.fetchall()
         column_names = [column[0] for column in cursor.description]
-    results = []
-    for row in rows:
-        row_data = {}
-        for index, column in enumerate(column_names):
-            row_data[column] = row[index]
-        results.append(row_data)
-    return results
+    return [dict(zip(column_names, row)) for row in rows]
+
+
+class Record(tuple):
+    """A read-only row of a query result. Values are kept in a tuple and the column
+    names are shared by all the rows of a query, which takes a lot less memory than
+    a dict per row. Values can be read by column name, like in a dict, or by index.
+    Use dict(record) to get a modifiable copy."""
+    __slots__ = ()
+    columns = {}
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            return tuple.__getitem__(self, self.columns[key])
+        return tuple.__getitem__(self, key)
+
+    def __contains__(self, key):
+        return key in self.columns
+
+    def __repr__(self):
+        return "Record(%s)" % dict(self.items())
+
+    def get(self, key, default=None):
+        index = self.columns.get(key)
+        if index is None:
+            return default
+        return tuple.__getitem__(self, index)
+
+    def keys(self):
+        return self.columns.keys()
+
+    def values(self):
+        return tuple(self)
+
+    def items(self):
+        return zip(self.columns, self)
+
+
+@lru_cache(maxsize=64)
+def get_record_class(column_names):
+    """Return a Record class for rows having the given columns"""
+    columns = {column: index for index, column in enumerate(column_names)}
+    return type("Record", (Record, ), {"__slots__": (), "columns": columns})
+
+
+def db_iter_query(db_path, query, params=(), batch_size=500):
+    """Run a query and yield its rows as Record objects. Rows are fetched in
+    batches rather than all at once."""
+    with db_cursor(db_path, readonly=True) as cursor:
+        cursor_execute(cursor, query, params)
+        record_class = get_record_class(tuple(column[0] for column in cursor.description))
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            yield from map(record_class, rows)
 
 
 def add_field(db_path, tablename, field):
@@ -129,17 +371,68 @@ def add_field(db_path, tablename, field):
         cursor.execute(query)
 
 
-def filtered_query(
+def is_fts5_available():
+    """Return whether the SQLite library has the FTS5 full-text search module"""
+    connection = sqlite3.connect(":memory:")
+    try:
+        connection.execute("CREATE VIRTUAL TABLE fts5_probe USING fts5(content)")
+    except sqlite3.OperationalError:
+        return False
+    finally:
+        connection.close()
+    return True
+
+
+def has_fts_index(db_path, table):
+    """Return whether `table` has a full-text search index kept in sync with it"""
+    with db_cursor(db_path, readonly=True) as cursor:
+        cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE type='trigger' AND name=?",
+            (table + "_fts_insert", )
+        )
+        return bool(cursor.fetchone())
+
+
+def get_fts_query(text):
+    """Turn search text into a FTS5 query that matches rows having words starting
+    with each of the words of the text"""
+    return " ".join('"%s"*' % word for word in re.findall(r"\w+", text))
+
+
+def build_filtered_query(
     db_path,
     table,
     searches=None,
     filters=None,
     excludes=None,
-    sorts=None
+    sorts=None,
+    text_search=None,
+    fields=None,
+    limit=None,
+    offset=None
 ):
-    query = "select * from %s" % table
+    """Build a query selecting rows from a table, see filtered_query()
+    for the arguments.
+
+    Returns:
+        tuple: the query and its parameters
+    """
+    columns = ", ".join(fields) if fields else "*"
+    query = "select %s from %s" % (columns, table)
     params = []
     sql_filters = []
+    ranked = False
+    if text_search:
+        fts_query = get_fts_query(text_search)
+        if fts_query and has_fts_index(db_path, table):
+            query = (
+                "WITH matches AS (SELECT rowid, rank FROM {0}_fts WHERE {0}_fts MATCH ?) "
+                "SELECT {1} FROM {0} JOIN matches ON matches.rowid = {0}.id"
+            ).format(table, ", ".join(fields) if fields else table + ".*")
+            params.append(fts_query)
+            ranked = True
+        else:
+            searches = dict(searches or {}, name=text_search)
     for field in searches or {}:
         sql_filters.append("%s LIKE ?" % field)
         params.append("%" + searches[field] + "%")
@@ -157,6 +450,59 @@ def filtered_query(
         query += " ORDER BY %s" % ", ".join(
             ["%s %s" % (sort[0], sort[1]) for sort in sorts]
         )
+    elif ranked:
+        query += " ORDER BY matches.rank"
     else:
         query += " ORDER BY slug ASC"
-    return db_query(db_path, query, tuple(params))
+    if limit is not None or offset:
+        query += " LIMIT ? OFFSET ?"
+        params += [-1 if limit is None else limit, offset or 0]
+    return query, tuple(params)
+
+
+def filtered_query(
+    db_path,
+    table,
+    searches=None,
+    filters=None,
+    excludes=None,
+    sorts=None,
+    text_search=None,
+    limit=None,
+    offset=None
+):
+    """Select rows from a table.
+
+    Args:
+        searches (dict): fields and the substring they must contain
+        filters (dict): fields and the value they must be equal to
+        excludes (dict): fields and a value they must not be equal to
+        sorts (list): tuples of field and sort order
+        text_search (str): words to look up in the table's full-text index, falls
+            back to a search by name if there is no index. Unless other sorts are
+            given, the results are ranked by relevance.
+        limit (int): maximum number of rows returned
+        offset (int): number of rows skipped, to fetch the rows one page at a time
+
+    Returns:
+        list: the rows, as dicts
+    """
+    query, params = build_filtered_query(
+        db_path,
+        table,
+        searches=searches,
+        filters=filters,
+        excludes=excludes,
+        sorts=sorts,
+        text_search=text_search,
+        limit=limit,
+        offset=offset
+    )
+    return db_query(db_path, query, params)
+
+
+def iter_filtered_query(db_path, table, fields=None, **kwargs):
+    """Same as filtered_query() but yield the rows as Record objects, optionally
+    selecting only the given fields."""
+    query, params = build_filtered_query(db_path, table, fields=fields, **kwargs)
+    return db_iter_query(db_path, query, params)
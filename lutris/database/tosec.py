@@ -0,0 +1,61 @@
+"""Offline index of the ROMs listed in TOSEC / No-Intro DAT files"""
+from lutris import settings
+from lutris.database import sql
+
+# Stay under the default SQLITE_MAX_VARIABLE_NUMBER of older SQLite versions
+LOOKUP_BATCH_SIZE = 500
+
+ROM_SET_QUERY = (
+    "SELECT * FROM tosec_roms WHERE (dat, game) IN "
+    "(SELECT dat, game FROM tosec_roms WHERE {0} IN ({1})) "
+    "ORDER BY dat, game, id"
+)
+
+
+def replace_dat_roms(dat, roms):
+    """Replace the ROMs indexed for the DAT file `dat` with `roms`, an iterable
+    of dicts with the category, game, name, size, crc, md5 and sha1 keys.
+
+    Returns:
+        int: The number of indexed ROMs
+    """
+    rows = [dict(rom, dat=dat) for rom in roms]
+    with sql.db_transaction(settings.PGA_DB) as cursor:
+        cursor.execute("DELETE FROM tosec_roms WHERE dat=?", (dat, ))
+        sql.db_insert_many(settings.PGA_DB, "tosec_roms", rows)
+    return len(rows)
+
+
+def delete_dat_roms(dat):
+    """Remove the ROMs of a DAT file from the index"""
+    sql.db_delete(settings.PGA_DB, "tosec_roms", "dat", dat)
+
+
+def get_dats():
+    """Return the indexed DAT files along with their number of ROMs"""
+    return sql.db_query(
+        settings.PGA_DB,
+        "SELECT dat, category, count(*) AS roms FROM tosec_roms GROUP BY dat ORDER BY category"
+    )
+
+
+def get_rom_sets(checksums, checksum_type="md5"):
+    """Return every ROM of the sets containing one of the given checksums.
+
+    Params:
+        checksums (iterable): md5, sha1 or crc checksums
+        checksum_type (str): md5, sha1 or crc
+
+    Returns:
+        list: Records of the matching sets' ROMs, grouped by DAT and game
+    """
+    if checksum_type not in ("md5", "sha1", "crc"):
+        raise ValueError("Invalid checksum type %s" % checksum_type)
+    checksums = sorted({checksum.lower() for checksum in checksums if checksum})
+    roms = {}
+    for index in range(0, len(checksums), LOOKUP_BATCH_SIZE):
+        batch = checksums[index:index + LOOKUP_BATCH_SIZE]
+        query = ROM_SET_QUERY.format(checksum_type, ", ".join("?" * len(batch)))
+        for rom in sql.db_iter_query(settings.PGA_DB, query, batch):
+            roms[rom["id"]] = rom
+    return sorted(roms.values(), key=lambda rom: (rom["dat"], rom["game"], rom["id"]))
@@ -18,7 +18,7 @@ from lutris.command import MonitoredCommand
 from lutris.config import LutrisConfig
 from lutris.database import categories as categories_db
 from lutris.database import games as games_db
-from lutris.database import sql
+from lutris.database import play_sessions, sql
 from lutris.exception_backstops import watch_game_errors
 from lutris.exceptions import GameConfigError, MissingExecutableError
 from lutris.runner_interpreter import export_bash_script, get_launch_parameters
@@ -31,8 +31,10 @@ from lutris.util.display import (
 from lutris.util.graphics.xephyr import get_xephyr_command
 from lutris.util.graphics.xrandr import turn_off_except
 from lutris.util.linux import LINUX_SYSTEM
-from lutris.util.log import LOG_BUFFERS, logger
-from lutris.util.process import Process
+from lutris.util.log import LOG_BUFFERS, LOG_STORES, logger
+from lutris.util.log_store import LogStore
+from lutris.util.process_tracker import ProcessTracker
+from lutris.util.resource_sampler import DEFAULT_SAMPLING_INTERVAL, ResourceSampler
 from lutris.util.steam.shortcut import remove_shortcut as remove_steam_shortcut
 from lutris.util.timer import Timer
 from lutris.util.yaml import write_yaml_to_file
@@ -108,6 +110,8 @@ class Game(GObject.Object):
         self.game_thread = None
         self.antimicro_thread = None
         self.prelaunch_pids = None
+        self.process_tracker = None
+        self.resource_sampler = None
         self.prelaunch_executor = None
         self.heartbeat = None
         self.killswitch = None
@@ -255,11 +259,20 @@ class Game(GObject.Object):
         _log_buffer = Gtk.TextBuffer()
         _log_buffer.create_tag("warning", foreground="red")
         if self.game_thread:
-            self.game_thread.set_log_buffer(self._log_buffer)
-            _log_buffer.set_text(self.game_thread.stdout)
+            _log_buffer.set_text(self.game_thread.log_store.get_recent_text())
+            self.game_thread.set_log_buffer(_log_buffer)
         LOG_BUFFERS[self.id] = _log_buffer
         return _log_buffer
 
+    @property
+    def log_store(self):
+        """Access the store of the whole output of the game, creating it if necessary"""
+        _log_store = LOG_STORES.get(self.id)
+        if not _log_store:
+            _log_store = LogStore()
+            LOG_STORES[self.id] = _log_store
+        return _log_store
+
     @property
     def formatted_playtime(self):
         """Return a human-readable formatted play time"""
@@ -388,6 +401,8 @@ class Game(GObject.Object):
         if self.id in LOG_BUFFERS:  # Reset game logs on removal
             log_buffer = LOG_BUFFERS[self.id]
             log_buffer.delete(log_buffer.get_start_iter(), log_buffer.get_end_iter())
+        if self.id in LOG_STORES:
+            LOG_STORES[self.id].clear()
 
         if not no_signal:
             self.emit("game-removed")
@@ -672,6 +687,8 @@ class Game(GObject.Object):
         if self.id in LOG_BUFFERS:  # Reset game logs on each launch
             log_buffer = LOG_BUFFERS[self.id]
             log_buffer.delete(log_buffer.get_start_iter(), log_buffer.get_end_iter())
+        if self.id in LOG_STORES:
+            LOG_STORES[self.id].clear()
 
         self.state = self.STATE_LAUNCHING
         self.prelaunch_pids = system.get_running_pid_list()
@@ -701,12 +718,18 @@ class Game(GObject.Object):
             env=self.game_runtime_config["env"],
             term=self.game_runtime_config["terminal"],
             log_buffer=self.log_buffer,
+            log_store=self.log_store,
             include_processes=self.game_runtime_config["include_processes"],
             exclude_processes=self.game_runtime_config["exclude_processes"],
         )
         if hasattr(self.runner, "stop"):
             self.game_thread.stop_func = self.runner.stop
         self.game_uuid = self.game_thread.env["LUTRIS_GAME_UUID"]
+        # Created before the heartbeat and the resource sampler, which both use it
+        if self.prelaunch_pids:
+            self.process_tracker = ProcessTracker(self.game_uuid, self.resolve_game_path(), self.prelaunch_pids)
+        else:
+            self.process_tracker = None
         self.game_thread.start()
         self.timer.start()
         self.state = self.STATE_RUNNING
@@ -720,9 +743,34 @@ class Game(GObject.Object):
                 pass
 
         self.heartbeat = GLib.timeout_add(HEARTBEAT_DELAY, self.beat)
+        self.start_resource_sampler()
         with open(self.now_playing_path, "w", encoding="utf-8") as np_file:
             np_file.write(self.name)
 
+    def start_resource_sampler(self):
+        """Start recording the resources used by the game, unless disabled
+        by setting the sampling interval to 0"""
+        interval = settings.read_setting("resource_sampling_interval", default=str(DEFAULT_SAMPLING_INTERVAL))
+        try:
+            interval = float(interval)
+        except ValueError:
+            logger.warning("Invalid resource sampling interval: %s", interval)
+            interval = DEFAULT_SAMPLING_INTERVAL
+        if interval <= 0:
+            return
+        self.resource_sampler = ResourceSampler(self.get_game_pids, interval)
+        self.resource_sampler.start()
+
+    def save_play_session(self):
+        """Stop the resource sampler and store the resource usage of the session"""
+        sampler = self.resource_sampler
+        if not sampler:
+            return
+        self.resource_sampler = None
+        sampler.stop()
+        if self.id and sampler.sample_count:
+            play_sessions.add_play_session(self.id, sampler.get_summary())
+
     def force_stop(self):
         # If force_stop_game fails, wait a few seconds and try SIGKILL on any survivors
 
@@ -790,29 +838,11 @@ class Game(GObject.Object):
             logger.error("No LUTRIS_GAME_UUID recorded. The game's PIDs cannot be computed.")
             return set()
 
-        new_pids = self.get_new_pids()
-
-        game_folder = self.resolve_game_path()
-        folder_pids = set()
-        for pid in new_pids:
-            cmdline = Process(pid).cmdline or ""
-            # pressure-vessel: This could potentially pick up PIDs not started by lutris?
-            if game_folder in cmdline or "pressure-vessel" in cmdline:
-                folder_pids.add(pid)
-
-        uuid_pids = set(
-            pid for pid in new_pids
-            if Process(pid).environ.get("LUTRIS_GAME_UUID") == self.game_uuid)
-
-        return folder_pids & uuid_pids
-
-    def get_new_pids(self):
-        """Return list of PIDs started since the game was launched"""
-        if self.prelaunch_pids:
-            return set(system.get_running_pid_list()) - set(self.prelaunch_pids)
+        if not self.process_tracker:
+            logger.error("No prelaunch PIDs recorded. The game's PIDs cannot be computed.")
+            return set()
 
-        logger.error("No prelaunch PIDs recorded. The game's PIDs cannot be computed.")
-        return set()
+        return self.process_tracker.get_pids()
 
     def stop_game(self):
         """Cleanup after a game as stopped"""
@@ -823,6 +853,7 @@ class Game(GObject.Object):
             # Inspect why it could have crashed
 
         self.state = self.STATE_STOPPED
+        self.save_play_session()
         self.emit("game-stop")
         if os.path.exists(self.now_playing_path):
             os.unlink(self.now_playing_path)
@@ -938,14 +969,14 @@ class Game(GObject.Object):
         if self.game_thread.return_code == 127:
             # Error missing shared lib
             error = "error while loading shared lib"
-            error_lines = strings.lookup_strings_in_text(error, self.game_thread.stdout)
+            error_lines = self.game_thread.log_store.find_lines(error)
             if error_lines:
                 raise RuntimeError(_("<b>Error: Missing shared library.</b>\n\n%s") % error_lines[0])
 
         if self.game_thread.return_code == 1:
             # Error Wine version conflict
             error = "maybe the wrong wineserver"
-            if strings.lookup_strings_in_text(error, self.game_thread.stdout):
+            if self.game_thread.log_store.find_lines(error):
                 raise RuntimeError(_("<b>Error: A different Wine version is already using the same Wine prefix.</b>"))
 
     def write_script(self, script_path, launch_ui_delegate):
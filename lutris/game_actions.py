@@ -275,7 +275,8 @@ class GameActions(BaseGameActions):
             return LogWindow(
                 game=game,
                 buffer=_buffer,
-                application=self.application
+                application=self.application,
+                log_store=game.log_store
             )
 
     def on_update_clicked(self, _widget):
@@ -16,6 +16,8 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+import csv
+import io
 import json
 import logging
 import os
@@ -39,6 +41,8 @@ from lutris import settings
 from lutris.api import parse_installer_url, get_runners
 from lutris.command import exec_command
 from lutris.database import games as games_db
+from lutris.database import play_sessions
+from lutris.database.explain import explain_standard_queries
 from lutris.game import Game, export_game, import_game
 from lutris.installer import get_installers
 from lutris.gui.config.preferences_dialog import PreferencesDialog
@@ -48,11 +52,13 @@ from lutris.gui.dialogs.delegates import LaunchUIDelegate, InstallUIDelegate, Co
 from lutris.gui.installerwindow import InstallerWindow, InstallationKind
 from lutris.gui.widgets.status_icon import LutrisStatusIcon
 from lutris.migrations import migrate
-from lutris.startup import init_lutris, run_all_checks
+from lutris.scanners import tosec
+from lutris.startup import init_lutris, run_all_checks, run_library_checks, run_system_checks
 from lutris.style_manager import StyleManager
 from lutris.util import datapath, log, system
 from lutris.util.http import HTTPError, Request
 from lutris.util.log import logger
+from lutris.util.profiling import STARTUP_TIMELINE, phase
 from lutris.util.steam.appmanifest import AppManifest, get_appmanifests
 from lutris.util.steam.config import get_steamapps_dirs
 from lutris.util.savesync import show_save_stats, upload_save, save_check
@@ -64,6 +70,7 @@ from lutris.exception_backstops import init_exception_backstops
 from .lutriswindow import LutrisWindow
 
 LUTRIS_EXPERIMENTAL_FEATURES_ENABLED = os.environ.get("LUTRIS_EXPERIMENTAL_FEATURES_ENABLED") == "1"
+STARTUP_PROFILE_PATH = os.path.join(settings.CACHE_DIR, "startup-profile.json")
 
 
 class Application(Gtk.Application):
@@ -320,6 +327,62 @@ class Application(Gtk.Application):
             _("Reinstall game"),
             None,
         )
+        self.add_main_option(
+            "db-explain",
+            0,
+            GLib.OptionFlags.NONE,
+            GLib.OptionArg.NONE,
+            _("Show the query plans of the main database queries"),
+            None,
+        )
+        self.add_main_option(
+            "export-play-sessions",
+            0,
+            GLib.OptionFlags.NONE,
+            GLib.OptionArg.NONE,
+            _("Export the resource usage of the play sessions as CSV, or JSON with --json"),
+            None,
+        )
+        self.add_main_option(
+            "import-dat",
+            0,
+            GLib.OptionFlags.NONE,
+            GLib.OptionArg.STRING,
+            _("Add the ROMs of a TOSEC or No-Intro DAT file to the offline index"),
+            None,
+        )
+        self.add_main_option(
+            "scan-roms",
+            0,
+            GLib.OptionFlags.NONE,
+            GLib.OptionArg.STRING,
+            _("Rename the ROMs of a folder after their TOSEC names"),
+            None,
+        )
+        self.add_main_option(
+            "dry-run",
+            0,
+            GLib.OptionFlags.NONE,
+            GLib.OptionArg.NONE,
+            _("With --scan-roms, only show the files that would be renamed"),
+            None,
+        )
+        self.add_main_option(
+            "offline",
+            0,
+            GLib.OptionFlags.NONE,
+            GLib.OptionArg.NONE,
+            _("With --scan-roms, only look up the DAT files added with --import-dat"),
+            None,
+        )
+        self.add_main_option(
+            "profile-startup",
+            0,
+            GLib.OptionFlags.NONE,
+            GLib.OptionArg.NONE,
+            _("Save a timeline of the startup phases to a Chrome trace file in the cache folder"),
+            None,
+        )
         self.add_main_option("submit-issue", 0, GLib.OptionFlags.NONE, GLib.OptionArg.NONE, _("Submit an issue"), None)
         self.add_main_option(
             GLib.OPTION_REMAINING,
@@ -344,10 +407,21 @@ class Application(Gtk.Application):
 
     def do_activate(self):  # pylint: disable=arguments-differ
         if not self.window:
+            STARTUP_TIMELINE.begin("main_window")
             self.window = LutrisWindow(application=self)
+            if STARTUP_TIMELINE.enabled:
+                self.window.connect("draw", self.on_first_window_draw)
             screen = self.window.props.screen  # pylint: disable=no-member
             Gtk.StyleContext.add_provider_for_screen(screen, self.css_provider, Gtk.STYLE_PROVIDER_PRIORITY_APPLICATION)
 
+    def on_first_window_draw(self, window, _cairo_context):
+        window.disconnect_by_func(self.on_first_window_draw)
+        STARTUP_TIMELINE.end("main_window")
+        STARTUP_TIMELINE.mark("first_paint")
+        STARTUP_TIMELINE.save()
+        logger.info("Startup timeline saved to %s", STARTUP_TIMELINE.path)
+        return False
+
     def start_runtime_updates(self) -> None:
         if os.environ.get("LUTRIS_SKIP_INIT"):
             logger.debug("Skipping initialization")
@@ -454,6 +528,8 @@ class Application(Gtk.Application):
         argc = len(sys.argv) - 1
         if "-d" in sys.argv or "--debug" in sys.argv:
             argc -= 1
+        if "--profile-startup" in sys.argv:
+            argc -= 1
         if not argc:
             # Switch back the log output to stderr (the default in Python)
             # to avoid messing with any output from command line options.
@@ -467,8 +543,13 @@ class Application(Gtk.Application):
         if options.contains("force"):
             self.force_updates = True
 
+        if options.contains("profile-startup"):
+            STARTUP_TIMELINE.start()
+            STARTUP_TIMELINE.path = STARTUP_PROFILE_PATH
+
         logger.info("Starting Lutris %s", settings.VERSION)
-        init_lutris()
+        with phase("init_lutris"):
+            init_lutris()
 
         # Perform migrations early if any command line options
         # might require it to be done, just in case. We migrate
@@ -478,9 +559,15 @@ class Application(Gtk.Application):
         # This way, in typical lutris usage, you get to see the
         # init dialog when migration is happening.
         if argc:
-            migrate()
-
-        run_all_checks()
+            with phase("migrate"):
+                migrate()
+            with phase("run_all_checks"):
+                run_all_checks()
+        else:
+            # Probing the system can take a while, the library is shown without waiting for it
+            with phase("run_library_checks"):
+                run_library_checks()
+            AsyncCall(run_system_checks, None)
         if options.contains("dest"):
             dest_dir = options.lookup_value("dest").get_string()
         else:
@@ -501,7 +588,7 @@ class Application(Gtk.Application):
         if options.contains("list-service-games"):
             service = options.lookup_value("list-service-games").get_string()
             game_list = games_db.get_games(filters={"installed": 1, "service": service})
-            service_game_list = ServiceGameCollection.get_for_service(service)
+            service_game_list = [dict(game) for game in ServiceGameCollection.get_for_service(service)]
             for game in service_game_list:
                 game['installed'] = any(('service_id', game['appid']) in item.items() for item in game_list)
             if options.contains("installed"):
@@ -515,7 +602,7 @@ class Application(Gtk.Application):
         # List all service games
         if options.contains("list-all-service-games"):
             game_list = games_db.get_games(filters={"installed": 1})
-            service_game_list = ServiceGameCollection.get_service_games()
+            service_game_list = [dict(game) for game in ServiceGameCollection.get_service_games()]
             for game in service_game_list:
                 game['installed'] = any(('service_id', game['appid']) in item.items() for item in game_list if
                                         item['service'] == game['service'])
@@ -527,6 +614,24 @@ class Application(Gtk.Application):
                 self.print_service_game_list(command_line, service_game_list)
             return 0
 
+        if options.contains("db-explain"):
+            return self.print_query_plans(command_line)
+
+        if options.contains("export-play-sessions"):
+            self.print_play_sessions(command_line, options.contains("json"))
+            return 0
+
+        if options.contains("import-dat"):
+            return self.import_dat(command_line, options.lookup_value("import-dat").get_string())
+
+        if options.contains("scan-roms"):
+            return self.print_rom_renames(
+                command_line,
+                options.lookup_value("scan-roms").get_string(),
+                dry_run=options.contains("dry-run"),
+                offline=options.contains("offline"),
+            )
+
         # List Steam games
         if options.contains("list-steam-games"):
             self.print_steam_list(command_line)
@@ -942,6 +1047,37 @@ class Application(Gtk.Application):
         ]
         self._print(command_line, json.dumps(games, indent=2))
 
+    def print_play_sessions(self, command_line, as_json=False):
+        sessions = play_sessions.get_play_sessions()
+        if as_json:
+            self._print(command_line, json.dumps(sessions, indent=2))
+            return
+        fields = ["game_id", "slug", "name"] + list(play_sessions.PLAY_SESSION_FIELDS)
+        output = io.StringIO()
+        writer = csv.DictWriter(output, fieldnames=fields, extrasaction="ignore", lineterminator="\n")
+        writer.writeheader()
+        writer.writerows(sessions)
+        self._print(command_line, output.getvalue().rstrip("\n"))
+
+    def import_dat(self, command_line, dat_path):
+        """Index the ROMs of a DAT file, returns 1 if it can't be read"""
+        try:
+            rom_count = tosec.import_dat(dat_path)
+        except (OSError, ValueError) as ex:
+            self._print(command_line, str(ex))
+            return 1
+        self._print(command_line, _("%s ROMs indexed from %s") % (rom_count, dat_path))
+        return 0
+
+    def print_rom_renames(self, command_line, folder, dry_run=False, offline=False):
+        """Rename the ROMs of a folder, or only list the renames with dry_run"""
+        if not os.path.isdir(folder):
+            self._print(command_line, _("%s is not a folder") % folder)
+            return 1
+        for source, dest in tosec.scan_folder(folder, dry_run=dry_run, offline=offline):
+            self._print(command_line, "%s -> %s" % (source, dest))
+        return 0
+
     def print_service_game_list(self, command_line, game_list):
         for game in game_list:
             self._print(
@@ -969,6 +1105,19 @@ class Application(Gtk.Application):
         ]
         self._print(command_line, json.dumps(games, indent=2))
 
+    def print_query_plans(self, command_line):
+        """Print the query plans of the standard queries, returns 1 if some do table scans"""
+        query_reports = explain_standard_queries()
+        for query_report in query_reports:
+            self._print(
+                command_line,
+                "%s [%s]" % (query_report["description"], "SCAN" if query_report["unexpected_scans"] else "OK")
+            )
+            self._print(command_line, "    " + query_report["query"])
+            for step in query_report["plan"]:
+                self._print(command_line, "    -> " + step)
+        return 1 if any(query_report["unexpected_scans"] for query_report in query_reports) else 0
+
     def print_steam_list(self, command_line):
         steamapps_paths = get_steamapps_dirs()
         for path in steamapps_paths if steamapps_paths else []:
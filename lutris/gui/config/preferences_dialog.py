@@ -87,8 +87,10 @@ class PreferencesDialog(GameDialogCommon):
             "sysinfo-stack"
         )
 
+        storage_box = StorageBox()
+        self.page_generators["storage-stack"] = storage_box.populate_disk_usage
         self.stack.add_named(
-            self.build_scrolled_window(StorageBox()),
+            self.build_scrolled_window(storage_box),
             "storage-stack"
         )
 
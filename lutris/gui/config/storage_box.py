@@ -1,13 +1,18 @@
 import os
 from gettext import gettext as _
 
-from gi.repository import Gtk
+from gi.repository import Gtk, Pango
 
 from lutris.cache import get_cache_path, has_custom_cache_path, save_custom_cache_path
 from lutris.config import LutrisConfig
+from lutris.database.games import get_games
 from lutris.gui.config.base_config_box import BaseConfigBox
 from lutris.gui.widgets.common import FileChooserEntry, Label
 from lutris.runners.runner import Runner
+from lutris.util.disk_size import DISK_SIZE_INDEX
+from lutris.util.jobs import AsyncCall, schedule_at_idle
+from lutris.util.log import logger
+from lutris.util.strings import get_natural_sort_key, gtk_safe, human_size
 
 
 class StorageBox(BaseConfigBox):
@@ -16,6 +21,82 @@ class StorageBox(BaseConfigBox):
         self.add(self.get_section_label(_("Paths")))
         path_widgets = self.get_path_widgets()
         self.pack_start(self._get_framed_options_list_box(path_widgets), False, False, 0)
+        self.size_labels = {}
+        self.disk_usage_box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=12, visible=True)
+        self.pack_start(self.disk_usage_box, False, False, 0)
+
+    def populate_disk_usage(self):
+        """Lists the disk usage of the installed games, as last indexed, then
+        refreshes the sizes in the background"""
+        AsyncCall(self.get_game_folders, self.on_game_folders_loaded)
+
+    @staticmethod
+    def get_game_folders():
+        """Return the name, folder and Wine prefix of the installed games"""
+        game_folders = []
+        DISK_SIZE_INDEX.load()  # Read the index off the main thread
+        for db_game in get_games(filters={"installed": 1}):
+            if not db_game["directory"]:
+                continue
+            prefix = None
+            if db_game["runner"] == "wine" and db_game["configpath"]:
+                game_config = LutrisConfig(runner_slug="wine", game_config_id=db_game["configpath"]).game_config
+                if game_config.get("prefix"):
+                    prefix = os.path.expanduser(game_config["prefix"])
+            if prefix == db_game["directory"]:
+                prefix = None
+            game_folders.append((db_game["name"], db_game["directory"], prefix))
+        return sorted(game_folders, key=lambda folders: get_natural_sort_key(folders[0]))
+
+    def on_game_folders_loaded(self, game_folders, error):
+        if error:
+            logger.error("Unable to list the game folders: %s", error)
+            return
+        if not game_folders:
+            return
+        self.disk_usage_box.add(self.get_section_label(_("Disk usage")))
+        rows = []
+        for name, directory, prefix in game_folders:
+            rows.append(self.get_disk_usage_row(name, directory, prefix))
+        self.disk_usage_box.add(self._get_framed_options_list_box(rows))
+        AsyncCall(self.refresh_sizes, None, list(self.size_labels))
+
+    def get_disk_usage_row(self, name, directory, prefix):
+        row = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=4, visible=True)
+        row.set_margin_top(8)
+        row.set_margin_bottom(8)
+        row.set_margin_start(16)
+        row.set_margin_end(16)
+        name_label = Gtk.Label(visible=True, xalign=0)
+        name_label.set_markup("<b>%s</b>" % gtk_safe(name))
+        row.pack_start(name_label, False, False, 0)
+        folders = [(directory, _("Game files"))]
+        if prefix:
+            folders.append((prefix, _("Wine prefix")))
+        for path, description in folders:
+            folder_box = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=12, visible=True)
+            path_label = Gtk.Label(visible=True, xalign=0, ellipsize=Pango.EllipsizeMode.MIDDLE)
+            path_label.set_markup("<span font_desc='8'>%s: %s</span>" % (description, gtk_safe(path)))
+            folder_box.pack_start(path_label, True, True, 0)
+            size_label = Gtk.Label(visible=True, halign=Gtk.Align.END)
+            self.show_size(size_label, DISK_SIZE_INDEX.get_cached_size(path))
+            folder_box.pack_end(size_label, False, False, 0)
+            self.size_labels.setdefault(path, []).append(size_label)
+            row.pack_start(folder_box, False, False, 0)
+        return row
+
+    @staticmethod
+    def show_size(size_label, size):
+        size_label.set_text(human_size(size) if size is not None else "…")
+
+    def refresh_sizes(self, paths):
+        """Update the disk size index for each folder, runs in a thread"""
+        for path in paths:
+            schedule_at_idle(self.on_size_refreshed, path, DISK_SIZE_INDEX.get_size(path))
+
+    def on_size_refreshed(self, path, size):
+        for size_label in self.size_labels.get(path, []):
+            self.show_size(size_label, size)
 
     def get_path_widgets(self):
         widgets = []
@@ -12,6 +12,7 @@ from lutris.scanners.default_installers import DEFAULT_INSTALLERS
 from lutris.scanners.lutris import get_path_cache
 from lutris.scanners.tosec import clean_rom_name, guess_platform, search_tosec_by_md5
 from lutris.services.lutris import download_lutris_media
+from lutris.util.hashing import save_hash_cache
 from lutris.util.jobs import AsyncCall
 from lutris.util.log import logger
 from lutris.util.strings import gtk_safe, slugify
@@ -163,6 +164,7 @@ class ImportGameDialog(ModelessDialog):
             if result:
                 results[filename] = result
 
+        save_hash_cache()
         return results
 
     def search_result_finished(self, results, error):
@@ -13,7 +13,7 @@ from lutris.util import datapath
 
 class LogWindow(GObject.Object):
 
-    def __init__(self, game, buffer, application=None):
+    def __init__(self, game, buffer, application=None, log_store=None):
         super().__init__()
         ui_filename = os.path.join(datapath.get(), "ui/log-window.ui")
         builder = Gtk.Builder()
@@ -26,7 +26,8 @@ class LogWindow(GObject.Object):
         self.window.set_title(self.title)
 
         self.buffer = buffer
-        self.logtextview = LogTextView(self.buffer)
+        self.log_store = log_store
+        self.logtextview = LogTextView(self.buffer, log_store=log_store)
 
         scrolled_window = builder.get_object("scrolled_window")
         scrolled_window.add(self.logtextview)
@@ -39,6 +40,17 @@ class LogWindow(GObject.Object):
         save_button = builder.get_object("save_button")
         save_button.connect("clicked", self.on_save_clicked)
 
+        if log_store:
+            header_bar = builder.get_object("header_bar")
+            for icon_name, tooltip, handler in (
+                ("go-down-symbolic", _("Newer output"), self.on_next_page_clicked),
+                ("go-up-symbolic", _("Older output"), self.on_previous_page_clicked),
+            ):
+                page_button = Gtk.Button.new_from_icon_name(icon_name, Gtk.IconSize.BUTTON)
+                page_button.set_tooltip_text(tooltip)
+                page_button.connect("clicked", handler)
+                header_bar.pack_end(page_button)
+
         self.window.connect("key-press-event", self.on_key_press_event)
         self.window.connect("destroy", self.on_destroy)
         self.game_removed_hook_id = GObject.add_emission_hook(Game, "game-removed", self.on_game_removed)
@@ -56,6 +68,12 @@ class LogWindow(GObject.Object):
         if self.game_id == game.id:
             self.window.destroy()
 
+    def on_previous_page_clicked(self, _button):
+        self.logtextview.show_previous_page()
+
+    def on_next_page_clicked(self, _button):
+        self.logtextview.show_next_page()
+
     def on_save_clicked(self, _button):
         """Handler to save log to a file"""
         now = datetime.now()
@@ -69,13 +87,16 @@ class LogWindow(GObject.Object):
         if not log_path:
             return
 
-        text = self.buffer.get_text(
-            self.buffer.get_start_iter(),
-            self.buffer.get_end_iter(),
-            True
-        )
         with open(log_path, "w", encoding='utf-8') as log_file:
-            log_file.write(text)
+            if self.log_store:
+                for text in self.log_store.iter_text():
+                    log_file.write(text)
+            else:
+                log_file.write(self.buffer.get_text(
+                    self.buffer.get_start_iter(),
+                    self.buffer.get_end_iter(),
+                    True
+                ))
 
     def on_destroy(self, widget):
         GObject.remove_emission_hook(Game, "game-removed", self.game_removed_hook_id)
@@ -10,10 +10,11 @@ from lutris.game import Game
 from lutris.gui.dialogs import QuestionDialog
 from lutris.gui.widgets.gi_composites import GtkTemplate
 from lutris.util import datapath
+from lutris.util.disk_size import DISK_SIZE_INDEX
 from lutris.util.jobs import AsyncCall
 from lutris.util.log import logger
 from lutris.util.strings import get_natural_sort_key, gtk_safe, human_size
-from lutris.util.system import get_disk_size, is_removeable
+from lutris.util.system import is_removeable
 
 
 @GtkTemplate(ui=os.path.join(datapath.get(), "ui", "uninstall-dialog.ui"))
@@ -101,6 +102,10 @@ class UninstallMultipleGamesDialog(Gtk.Dialog):
                 if game.directory not in folders_seen:
                     folders_seen.add(game.directory)
                     folders_to_size.append(game.directory)
+                # Show the size from the index right away, and update it once refreshed
+                cached_size = DISK_SIZE_INDEX.get_cached_size(game.directory)
+                if cached_size is not None:
+                    row.show_folder_size(cached_size)
                 row.show_folder_size_spinner()
 
         if folders_to_size:
@@ -274,7 +279,7 @@ class UninstallMultipleGamesDialog(Gtk.Dialog):
         directories; the _get_next_folder_size_cb will run this again if required,
         until all directories have been sized."""
         directory = directories.pop(0)
-        size = get_disk_size(directory)
+        size = DISK_SIZE_INDEX.get_size(directory)
         return directory, size, directories
 
     def _get_next_folder_size_cb(self, result, error):
@@ -1,14 +1,17 @@
 # pylint: disable=no-member
 import os
+from gettext import gettext as _
 from typing import Any, Callable, Dict, Iterable, List, Set
 
 from gi.repository import Gtk
 
 from lutris.gui.widgets.gi_composites import GtkTemplate
-from lutris.gui.widgets.progress_box import ProgressBox
+from lutris.gui.widgets.progress_box import ProgressBox, ProgressInfo
 from lutris.util import datapath
+from lutris.util.download_scheduler import BACKGROUND_PRIORITIES, get_scheduler
 from lutris.util.jobs import AsyncCall
 from lutris.util.log import logger
+from lutris.util.strings import human_size
 
 
 @GtkTemplate(ui=os.path.join(datapath.get(), "ui", "download-queue.ui"))
@@ -80,6 +83,22 @@ class DownloadQueue(Gtk.ScrolledWindow):
         self.revealer.set_reveal_child(True)
         return progress_box
 
+    def add_scheduler_progress_box(self) -> ProgressBox:
+        """Adds a progress box summarizing the background downloads run by the download
+        scheduler; it is removed once the scheduler has none of them left to do."""
+        return self.add_progress_box(self.get_scheduler_progress)
+
+    @staticmethod
+    def get_scheduler_progress() -> ProgressInfo:
+        stats = get_scheduler().get_stats(BACKGROUND_PRIORITIES)
+        if not stats["active"] and not stats["queued"]:
+            return ProgressInfo.ended()
+        label = _("Downloading %s files, %s queued") % (stats["active"], stats["queued"])
+        if stats["full_size"]:
+            label += " (%s / %s)" % (human_size(stats["downloaded_size"]), human_size(stats["full_size"]))
+            return ProgressInfo(stats["downloaded_size"] / stats["full_size"], label)
+        return ProgressInfo(None, label)
+
     def remove_progress_box(self, progress_function: ProgressBox.ProgressFunction) -> None:
         """Removes and destroys the progress box created for the progress_function given,
         if any is present."""
@@ -1,6 +1,7 @@
 """Main window for the Lutris interface."""
 # pylint:disable=too-many-lines
 import os
+import time
 from collections import namedtuple
 from gettext import gettext as _
 from typing import List
@@ -33,12 +34,27 @@ from lutris.scanners.lutris import add_to_path_cache, get_missing_game_ids, remo
 from lutris.services.base import BaseService
 from lutris.services.lutris import LutrisService
 from lutris.util import datapath
-from lutris.util.jobs import AsyncCall
+from lutris.util.download_scheduler import BACKGROUND_PRIORITIES, get_scheduler
+from lutris.util.jobs import AsyncCall, QueryWorker, schedule_at_idle
 from lutris.util.log import logger
-from lutris.util.strings import get_natural_sort_key
 from lutris.util.system import update_desktop_icons
 from lutris.util.wine.wine import esync_display_limit_warning, fsync_display_support_warning
 
+# Value used for the games with no value for the sort field
+VIEW_SORT_DEFAULTS = {
+    "name": "",
+    "year": 0,
+    "lastplayed": 0.0,
+    "installed_at": 0.0,
+    "playtime": 0.0,
+}
+
+# Longest time, in seconds, spent applying a query result to the store before letting the main loop run
+STORE_UPDATE_SLICE = 0.01
+
+# The rows to show, computed by the view query worker for a game store, and the time each stage took
+StoreSnapshot = namedtuple("StoreSnapshot", ("game_store", "rows", "timings"))
+
 
 @GtkTemplate(ui=os.path.join(datapath.get(), "ui", "lutris-window.ui"))
 class LutrisWindow(Gtk.ApplicationWindow,
@@ -86,6 +102,9 @@ class LutrisWindow(Gtk.ApplicationWindow,
         self.maximized = settings.read_setting("maximized") == "True"
         self.service = None
         self.search_timer_id = None
+        self.query_worker = QueryWorker("view-query")
+        self.store_changes = None
+        self.store_update_id = None
         self.filters = self.load_filters()
         self.set_service(self.filters.get("service"))
         self.icon_type = self.load_icon_type()
@@ -146,6 +165,7 @@ class LutrisWindow(Gtk.ApplicationWindow,
         GObject.add_emission_hook(Game, "game-removed", self.on_game_removed)
         GObject.add_emission_hook(Game, "game-unhandled-error", self.on_game_unhandled_error)
         GObject.add_emission_hook(PreferencesDialog, "settings-changed", self.on_settings_changed)
+        get_scheduler().add_listener(self.on_downloads_scheduled, BACKGROUND_PRIORITIES)
 
         # Finally trigger the initialization of the view here
         selected_category = settings.read_setting("selected_category", default="runner:all")
@@ -325,28 +345,23 @@ class LutrisWindow(Gtk.ApplicationWindow,
 
     @property
     def sort_params(self):
-        """This provides a list of sort options for SQL generation; this isn't
-        exactly a match for what self.apply_view_sort does, but it is as close
-        as may be, in the hope that a faster DB sort will get is close and result
-        in a faster sort overall."""
+        """This provides a list of sort options for SQL generation, matching what
+        self.apply_view_sort does; names are sorted by the natural sort key stored
+        in the sort_key column, and the game ID breaks ties, so the results can be
+        paged through."""
 
         params = []
 
         if self.view_sorting_installed_first:
             params.append(("installed", "COLLATE NOCASE DESC"))
 
-        if self.view_sorting == "name":
-            key = "CASE WHEN sortname <> '' THEN sortname ELSE name END"
+        order = "ASC" if self.view_sorting_ascending else "DESC"
+        if self.view_sorting in VIEW_SORT_DEFAULTS and self.view_sorting != "name":
+            params.append(("IFNULL(%s, 0)" % self.view_sorting, order))
+            params.append(("sort_key", "ASC"))
         else:
-            key = self.view_sorting
-
-        params.append((
-            key,
-            "COLLATE NOCASE ASC"
-            if self.view_sorting_ascending
-            else "COLLATE NOCASE DESC"
-        ))
-
+            params.append(("sort_key", order))
+        params.append(("id", "ASC"))
         return params
 
     @property
@@ -364,17 +379,11 @@ class LutrisWindow(Gtk.ApplicationWindow,
         the sort is set to descending.
 
         This treats 'name' sorting specially, applying a natural sort so that
-        'Mega slap battler 20' comes after 'Mega slap battler 3'. For this reason,
-        we can't just accept the sort the database gives us via self.sort_params;
-        that'll get us close, but we must resort to get it right."""
+        'Mega slap battler 20' comes after 'Mega slap battler 3'. Lutris games are
+        sorted this way by the database, via self.sort_params; this is needed for
+        service games, which are combined with the Lutris games after the query."""
         view_sorting = self.view_sorting
-        sort_defaults = {
-            "name": "",
-            "year": 0,
-            "lastplayed": 0.0,
-            "installed_at": 0.0,
-            "playtime": 0.0,
-        }
+        sort_defaults = VIEW_SORT_DEFAULTS
 
         def get_sort_value(item):
             db_game = resolver(item)
@@ -384,17 +393,15 @@ class LutrisWindow(Gtk.ApplicationWindow,
             else:
                 installation_flag = bool(db_game.get("installed"))
 
-                # When sorting by name, check for a valid sortname first, then fall back
-                # on name if valid sortname is not available.
-                sortname = db_game.get("sortname")
-                if view_sorting == "name" and sortname:
-                    value = sortname
+                # When sorting by name, use the sort key stored with Lutris games, service
+                # games have none.
+                if view_sorting == "name":
+                    value = db_game.get("sort_key") or games_db.get_sort_key(
+                        db_game.get("name"), db_game.get("sortname")
+                    )
                 else:
                     value = db_game.get(view_sorting)
 
-                if view_sorting == "name":
-                    value = get_natural_sort_key(value)
-
             # Users may have obsolete view_sorting settings, so
             # we must tolerate them. We treat them all as blank.
             value = value or sort_defaults.get(view_sorting, "")
@@ -420,23 +427,29 @@ class LutrisWindow(Gtk.ApplicationWindow,
             logger.error(str(error))
             return
         self.get_missing_games(missing_ids)
+        # The views draw the missing badges from the status found by this check
+        self.current_view.queue_draw()
 
     def get_missing_games(self, missing_ids: list = None) -> list:
         if missing_ids is None:
             missing_ids = get_missing_game_ids()
         missing_games = games_db.get_games_by_ids(missing_ids)
-        if missing_games:
+        if not missing_games and missing_ids:
+            logger.warning("Path cache out of date? (%s IDs missing)", len(missing_ids))
+        # This also runs in the view query worker
+        schedule_at_idle(self.show_missing_row, bool(missing_games))
+        return missing_games
+
+    def show_missing_row(self, visible):
+        if visible:
             self.sidebar.missing_row.show()
         else:
-            if missing_ids:
-                logger.warning("Path cache out of date? (%s IDs missing)", len(missing_ids))
             self.sidebar.missing_row.hide()
-        return missing_games
 
     def get_recent_games(self):
         """Return a list of currently running games"""
-        searches, _filters, excludes = self.get_sql_filters()
-        games = games_db.get_games(searches=searches, filters={'installed': '1'}, excludes=excludes)
+        text_search, _filters, excludes = self.get_sql_filters()
+        games = games_db.get_games(text_search=text_search, filters={'installed': '1'}, excludes=excludes)
         return sorted(
             games,
             key=lambda game: max(game["installed_at"] or 0, game["lastplayed"] or 0),
@@ -447,9 +460,7 @@ class LutrisWindow(Gtk.ApplicationWindow,
         if self.filters.get("installed"):
             if game["appid"] not in games_db.get_service_games(self.service.id):
                 return False
-        if not self.filters.get("text"):
-            return True
-        return self.filters["text"] in game["name"].lower()
+        return True
 
     def set_service(self, service_name):
         if self.service and self.service.id == service_name:
@@ -468,13 +479,14 @@ class LutrisWindow(Gtk.ApplicationWindow,
     def combine_games(service_game, lutris_game):
         """Inject lutris game information into a service game"""
         if lutris_game and service_game["appid"] == lutris_game["service_id"]:
+            service_game = dict(service_game)
             for field in ("platform", "runner", "year", "installed_at", "lastplayed", "playtime", "installed"):
                 service_game[field] = lutris_game[field]
         return service_game
 
     def get_service_games(self, service_id):
         """Return games for the service indicated."""
-        service_games = ServiceGameCollection.get_for_service(service_id)
+        service_games = ServiceGameCollection.get_for_service(service_id, text_search=self.filters.get("text"))
         if service_id == "lutris":
             lutris_games = {g["slug"]: g for g in games_db.get_games()}
         else:
@@ -491,7 +503,6 @@ class LutrisWindow(Gtk.ApplicationWindow,
         service_id = self.filters.get("service")
         if service_id in services.SERVICES:
             if self.service.online and not self.service.is_authenticated():
-                self.show_label(_("Connect your %s account to access your games") % self.service.name)
                 return []
             return self.get_service_games(service_id)
         if self.filters.get("dynamic_category") in self.dynamic_categories_game_factories:
@@ -500,19 +511,19 @@ class LutrisWindow(Gtk.ApplicationWindow,
             game_ids = categories_db.get_game_ids_for_category(self.filters["category"])
         else:
             game_ids = None
-        searches, filters, excludes = self.get_sql_filters()
+        text_search, filters, excludes = self.get_sql_filters()
         games = games_db.get_games(
-            searches=searches,
             filters=filters,
             excludes=excludes,
-            sorts=self.sort_params
+            sorts=self.sort_params,
+            text_search=text_search
         )
         if game_ids is not None:
             return [game for game in games if game["id"] in game_ids]
-        return self.apply_view_sort(games)
+        return games
 
     def get_sql_filters(self):
-        """Return the current filters for the view"""
+        """Return the current search text, filters and excludes for the view"""
         sql_filters = {}
         sql_excludes = {}
         if self.filters.get("runner"):
@@ -521,13 +532,9 @@ class LutrisWindow(Gtk.ApplicationWindow,
             sql_filters["platform"] = self.filters["platform"]
         if self.filters.get("installed"):
             sql_filters["installed"] = "1"
-        if self.filters.get("text"):
-            searches = {"name": self.filters["text"]}
-        else:
-            searches = None
         if not self.filters.get("hidden"):
             sql_excludes["hidden"] = 1
-        return searches, sql_filters, sql_excludes
+        return self.filters.get("text") or None, sql_filters, sql_excludes
 
     def get_service_media(self, icon_type):
         """Return the ServiceMedia class used for this view"""
@@ -560,6 +567,10 @@ class LutrisWindow(Gtk.ApplicationWindow,
 
     def show_empty_label(self):
         """Display a label when the view is empty"""
+        if self.filters.get("service") in services.SERVICES:
+            if self.service.online and not self.service.is_authenticated():
+                self.show_label(_("Connect your %s account to access your games") % self.service.name)
+                return
         filter_text = self.filters.get("text")
         has_uninstalled_games = games_db.get_game_count("installed", "0")
         has_hidden_games = games_db.get_game_count("hidden", "1")
@@ -592,25 +603,73 @@ class LutrisWindow(Gtk.ApplicationWindow,
                 self.show_label(_("No games found"))
 
     def update_store(self, *_args, **_kwargs):
-        self.game_store.store.clear()
-        self.hide_overlay()
+        """Query the games to show in the query worker; the store is updated once the
+        result is ready, unless the store was updated again meanwhile."""
+        self.search_timer_id = None
+        self.query_worker.submit(self.query_store_rows, self.on_store_rows_ready, self.game_store)
+        return False
+
+    def query_store_rows(self, generation, game_store):
+        """Return a StoreSnapshot of the games matching the filters; this runs in the
+        query worker, and gives up if another query is submitted meanwhile."""
+        timings = {}
+        start_time = time.perf_counter()
         games = self.get_games_from_filters()
-        if games:
-            if len(games) > 1:
-                self.search_entry.set_placeholder_text(_("Search %s games") % len(games))
-            else:
-                self.search_entry.set_placeholder_text(_("Search 1 game"))
+        timings["query"] = time.perf_counter() - start_time
+        if not self.query_worker.is_current(generation):
+            return None
+        start_time = time.perf_counter()
+        rows = game_store.get_rows(games, self.filters.get("service"))
+        timings["rows"] = time.perf_counter() - start_time
+        return StoreSnapshot(game_store, rows, timings)
+
+    def on_store_rows_ready(self, snapshot, error):
+        if error or not snapshot or snapshot.game_store is not self.game_store:
+            return
+        self.hide_overlay()
+        game_count = len(snapshot.rows)
+        if game_count > 1:
+            self.search_entry.set_placeholder_text(_("Search %s games") % game_count)
+        elif game_count:
+            self.search_entry.set_placeholder_text(_("Search 1 game"))
         else:
             self.search_entry.set_placeholder_text(_("Search games"))
         for view in self.views.values():
             view.service = self.service
         GLib.idle_add(self.update_revealer)
 
-        service_id = self.filters.get("service")
-        self.game_store.add_preloaded_games(games, service_id)
-        if not games:
+        if self.store_update_id:
+            GLib.source_remove(self.store_update_id)
+            self.store_update_id = None
+        if self.store_changes:
+            self.store_changes.close()  # Superseded, the store is left as it is
+        self.store_changes = snapshot.game_store.iter_apply_rows(snapshot.rows)
+        snapshot.timings.update(apply=0, slices=0)
+        if self.apply_store_changes(snapshot):
+            self.store_update_id = GLib.idle_add(self.apply_store_changes, snapshot)
+
+    def apply_store_changes(self, snapshot):
+        """Apply changes to the store for up to STORE_UPDATE_SLICE; return True if
+        some changes remain to be applied."""
+        start_time = time.perf_counter()
+        snapshot.timings["slices"] += 1
+        for _change in self.store_changes:
+            if time.perf_counter() - start_time > STORE_UPDATE_SLICE:
+                snapshot.timings["apply"] += time.perf_counter() - start_time
+                return True
+        snapshot.timings["apply"] += time.perf_counter() - start_time
+        self.store_changes = None
+        self.store_update_id = None
+        if not snapshot.rows:
             self.show_empty_label()
-        self.search_timer_id = None
+        logger.debug(
+            "View updated with %s games: query %.1fms, rows %.1fms, store %.1fms in %s slices",
+            len(snapshot.rows),
+            snapshot.timings["query"] * 1000,
+            snapshot.timings["rows"] * 1000,
+            snapshot.timings["apply"] * 1000,
+            snapshot.timings["slices"],
+        )
         return False
 
     def _bind_zoom_adjustment(self):
@@ -874,6 +933,7 @@ class LutrisWindow(Gtk.ApplicationWindow,
         # Stop cancellable running threads
         for stopper in self.threads_stoppers:
             stopper()
+        get_scheduler().remove_listener(self.on_downloads_scheduled)
 
     @GtkTemplate.Callback
     def on_hide(self, *_args):
@@ -900,7 +960,7 @@ class LutrisWindow(Gtk.ApplicationWindow,
         if self.search_timer_id:
             GLib.source_remove(self.search_timer_id)
         self.filters["text"] = entry.get_text().lower().strip()
-        self.search_timer_id = GLib.timeout_add(500, self.update_store)
+        self.search_timer_id = GLib.timeout_add(250, self.update_store)
 
     @GtkTemplate.Callback
     def on_search_entry_key_press(self, widget, event):
@@ -1107,6 +1167,10 @@ class LutrisWindow(Gtk.ApplicationWindow,
             self.download_revealer.add(queue)
         return queue
 
+    def on_downloads_scheduled(self):
+        """Show the progress of the downloads in the background"""
+        self.download_queue.add_scheduler_progress_box()
+
     def start_runtime_updates(self, force_updates: bool) -> None:
         """Starts the process of applying runtime updates, asynchronously. No UI appears until
         we can determine that there are updates to perform."""
@@ -7,10 +7,14 @@ from lutris.database.games import get_game_for_service
 from lutris.database.services import ServiceGameCollection
 from lutris.game import Game
 from lutris.game_actions import BaseGameActions, get_game_actions
+from lutris.gui.views import COL_MEDIA_PATH
 from lutris.gui.widgets.contextual_menu import ContextualMenu
 from lutris.gui.widgets.utils import MEDIA_CACHE_INVALIDATED
 from lutris.util.log import logger
 
+# Rows whose media is loaded ahead of scrolling, before and after the viewport, in viewport heights
+MEDIA_PRELOAD_PAGES = 1
+
 
 class GameView:
     # pylint: disable=no-member
@@ -24,6 +28,7 @@ class GameView:
         self.cache_notification_id = None
         self.game_start_hook_id = None
         self.image_renderer = None
+        self.media_window = None
 
     def connect_signals(self):
         """Signal handlers common to all views"""
@@ -32,12 +37,49 @@ class GameView:
         self.connect("destroy", self.on_destroy)
         self.connect("button-press-event", self.popup_contextual_menu)
         self.connect("key-press-event", self.handle_key_press)
+        self.connect_after("draw", self.on_draw_after)
 
         self.game_start_hook_id = GObject.add_emission_hook(Game, "game-start", self.on_game_start)
 
+    def on_bulk_update_started(self, game_store):
+        """Detach the model while many rows change, so the view doesn't
+        process every single change"""
+        if self.get_model() is game_store.store:
+            self.set_model(None)
+
+    def on_bulk_update_finished(self, game_store):
+        if self.game_store is game_store:
+            self.set_model(game_store.store)
+
     def on_media_cache_invalidated(self):
+        self.media_window = None
         self.queue_draw()
 
+    def on_draw_after(self, _widget, _cr):
+        """Loads the media around the viewport once the view has scrolled or changed"""
+        model = self.get_model()
+        visible_range = self.get_visible_range()
+        if not self.image_renderer or not model or not visible_range:
+            return
+        first, last = (path.get_indices()[0] for path in visible_range)
+        media_window = first, last, len(model), self.image_renderer.media_width, self.get_scale_factor()
+        if media_window != self.media_window:
+            self.media_window = media_window
+            self.preload_media(model, first, last)
+
+    def preload_media(self, model, first, last):
+        """Starts loading the media of the rows from a viewport height before the visible rows
+        to a viewport height after them, the nearest rows first, and cancels the loading of
+        other media."""
+        preload_count = (last - first + 1) * MEDIA_PRELOAD_PAGES
+        media_paths = []
+        for index in range(max(first - preload_count, 0), min(last + preload_count + 1, len(model))):
+            media_path = model[index][COL_MEDIA_PATH]
+            if media_path:
+                distance = first - index if index < first else max(index - last, 0)
+                media_paths.append((media_path, distance))
+        self.image_renderer.preload_media(self, media_paths)
+
     def on_destroy(self, _widget):
         if self.cache_notification_id:
             MEDIA_CACHE_INVALIDATED.unregister(self.cache_notification_id)
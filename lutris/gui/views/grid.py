@@ -52,10 +52,14 @@ class GameGridView(Gtk.IconView, GameView):
         self.service_media = game_store.service_media
         self.model = game_store.store
         self.set_model(self.model)
+        game_store.connect("bulk-update-started", self.on_bulk_update_started)
+        game_store.connect("bulk-update-finished", self.on_bulk_update_finished)
 
         images = [Path(self.service_media.dest_path) / (self.service_media.file_pattern % game['slug']) for game in get_games()]
-        images = [GdkPixbuf.Pixbuf.new_from_file(str(image)) for image in images if image.exists()]
-        max_size = reduce(lambda a, b: a if (a[0] / a[1]) > (b[0] / b[1]) else b, [(image.get_width(), image.get_height()) for image in images]) if images else None
+        # Only the image headers are read, the views mustn't decode every image up front
+        image_sizes = [GdkPixbuf.Pixbuf.get_file_info(str(image))[1:] for image in images if image.exists()]
+        image_sizes = [image_size for image_size in image_sizes if image_size[1]]
+        max_size = reduce(lambda a, b: a if (a[0] / a[1]) > (b[0] / b[1]) else b, image_sizes) if image_sizes else None
         size = (max_size[0] * self.service_media.size[1] / max_size[1], self.service_media.size[1]) if max_size else self.service_media.size
 
         if self.image_renderer:
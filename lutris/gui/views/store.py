@@ -1,20 +1,17 @@
 """Store object for a list of games"""
 # pylint: disable=not-an-iterable
 import time
+from contextlib import contextmanager
 
 from gi.repository import GLib, GObject, Gtk
 
 from lutris import settings
 from lutris.database import sql
-from lutris.database.games import get_all_installed_game_for_service, get_games
+from lutris.database.games import get_all_installed_game_for_service, iter_games
 from lutris.gui.views.store_item import StoreItem
 from lutris.util.strings import gtk_safe
 
-from . import (
-    COL_ID, COL_INSTALLED, COL_INSTALLED_AT, COL_INSTALLED_AT_TEXT, COL_LASTPLAYED, COL_LASTPLAYED_TEXT, COL_MEDIA_PATH,
-    COL_NAME, COL_PLATFORM, COL_PLAYTIME, COL_PLAYTIME_TEXT, COL_RUNNER, COL_RUNNER_HUMAN_NAME, COL_SLUG, COL_SORTNAME,
-    COL_YEAR
-)
+from . import COL_ID, COL_RUNNER_HUMAN_NAME, COL_SLUG, COL_SORTNAME
 
 
 def try_lower(value):
@@ -54,9 +51,15 @@ def sort_func(model, row1, row2, sort_col):
         return 0
 
 
+# Above this many added or removed rows, the views are detached from the store while it changes
+BULK_UPDATE_THRESHOLD = 200
+
+
 class GameStore(GObject.Object):
     __gsignals__ = {
         "icons-changed": (GObject.SIGNAL_RUN_FIRST, None, ()),
+        "bulk-update-started": (GObject.SIGNAL_RUN_FIRST, None, ()),
+        "bulk-update-finished": (GObject.SIGNAL_RUN_FIRST, None, ()),
     }
 
     def __init__(self, service, service_media):
@@ -66,6 +69,9 @@ class GameStore(GObject.Object):
         self._installed_games = []
         self._installed_games_accessed = False
         self._icon_updates = {}
+        # Game ID -> Gtk.TreeIter of its row. ListStore iters stay valid for as long as
+        # their row exists, unlike row references they cost nothing to maintain.
+        self._iters = {}
 
         self.store = Gtk.ListStore(
             str,
@@ -91,7 +97,7 @@ class GameStore(GObject.Object):
         previous_access = self._installed_games_accessed or 0
         self._installed_games_accessed = time.time()
         if self._installed_games_accessed - previous_access > 1:
-            self._installed_games = [g["slug"] for g in get_games(filters={"installed": "1"})]
+            self._installed_games = [g["slug"] for g in iter_games(filters={"installed": "1"}, fields=("slug", ))]
         return self._installed_games
 
     def get_row_by_slug(self, slug):
@@ -102,18 +108,15 @@ class GameStore(GObject.Object):
     def get_row_by_id(self, _id):
         if not _id:
             return
-        for model_row in self.store:
-            try:
-                if model_row[COL_ID] == str(_id):
-                    return model_row
-            except TypeError:
-                return
+        model_iter = self._iters.get(str(_id))
+        if model_iter:
+            return self.store[model_iter]
 
     def remove_game(self, _id):
         """Remove a game from the view."""
-        row = self.get_row_by_id(_id)
-        if row:
-            self.store.remove(row.iter)
+        model_iter = self._iters.pop(str(_id), None)
+        if model_iter:
+            self.store.remove(model_iter)
 
     def update(self, db_game):
         """Update game information
@@ -126,22 +129,10 @@ class GameStore(GObject.Object):
             row = self.get_row_by_id(db_game["service_id"])
         if not row:
             return False
-        row[COL_ID] = str(store_item.id)
-        row[COL_SLUG] = store_item.slug
-        row[COL_NAME] = store_item.name
-        row[COL_SORTNAME] = store_item.sortname if store_item.sortname else store_item.name
-        row[COL_MEDIA_PATH] = store_item.get_media_path() if settings.SHOW_MEDIA else None
-        row[COL_YEAR] = store_item.year
-        row[COL_RUNNER] = store_item.runner
-        row[COL_RUNNER_HUMAN_NAME] = store_item.runner_text
-        row[COL_PLATFORM] = store_item.platform
-        row[COL_LASTPLAYED] = store_item.lastplayed
-        row[COL_LASTPLAYED_TEXT] = store_item.lastplayed_text
-        row[COL_INSTALLED] = store_item.installed
-        row[COL_INSTALLED_AT] = store_item.installed_at
-        row[COL_INSTALLED_AT_TEXT] = store_item.installed_at_text
-        row[COL_PLAYTIME] = store_item.playtime
-        row[COL_PLAYTIME_TEXT] = store_item.playtime_text
+        previous_id = row[COL_ID]
+        self.store.set(row.iter, list(range(self.store.get_n_columns())), self.get_row_values(store_item))
+        if previous_id != store_item.id:
+            self._iters[store_item.id] = self._iters.pop(previous_id)
         return True
 
     def add_game(self, db_game):
@@ -149,45 +140,111 @@ class GameStore(GObject.Object):
         store_item = StoreItem(db_game, self.service_media)
         self.add_item(store_item)
 
-    def add_item(self, store_item):
-        self.store.append(
-            (
-                store_item.id,
-                store_item.slug,
-                store_item.name,
-                store_item.sortname if store_item.sortname else store_item.name,
-                store_item.get_media_path() if settings.SHOW_MEDIA else None,
-                store_item.year,
-                store_item.runner,
-                store_item.runner_text,
-                gtk_safe(store_item.platform),
-                store_item.lastplayed,
-                store_item.lastplayed_text,
-                store_item.installed,
-                store_item.installed_at,
-                store_item.installed_at_text,
-                store_item.playtime,
-                store_item.playtime_text,
-            )
+    @staticmethod
+    def get_row_values(store_item):
+        """Return the values of the store columns for a game"""
+        return (
+            store_item.id,
+            store_item.slug,
+            store_item.name,
+            store_item.sortname if store_item.sortname else store_item.name,
+            store_item.get_media_path() if settings.SHOW_MEDIA else None,
+            store_item.year,
+            store_item.runner,
+            store_item.runner_text,
+            gtk_safe(store_item.platform),
+            store_item.lastplayed,
+            store_item.lastplayed_text,
+            store_item.installed,
+            store_item.installed_at,
+            store_item.installed_at_text,
+            store_item.playtime,
+            store_item.playtime_text,
         )
 
+    def add_item(self, store_item):
+        self._iters[store_item.id] = self.store.append(self.get_row_values(store_item))
+
+    def get_store_items(self, db_games, service_id):
+        """Yield a StoreItem for each game, preloading the installed-game data of
+        service games all at once."""
+        installed_db_games = None  # Loaded when the first service game comes up
+        for db_game in db_games:
+            store_item = StoreItem(db_game, self.service_media)
+            if "appid" in db_game:
+                if installed_db_games is None:
+                    installed_db_games = get_all_installed_game_for_service(service_id) if service_id else {}
+                store_item.apply_installed_game_data(installed_db_games.get(db_game["appid"]))
+            yield store_item
+
     def add_preloaded_games(self, db_games, service_id):
         """Add games to the store, but preload their installed-game data
         all at once, for faster database access. This should be used if all or almost all
-        games are being loaded."""
+        games are being loaded. db_games can be any iterable of rows, including the records
+        yielded by games.iter_games()."""
+        with self.bulk_update(BULK_UPDATE_THRESHOLD + 1):
+            for store_item in self.get_store_items(db_games, service_id):
+                self.add_item(store_item)
 
-        installed_db_games = {}
-        if service_id and db_games:
-            installed_db_games = get_all_installed_game_for_service(service_id)
+    def apply_games(self, db_games, service_id):
+        """Make the store show db_games, in that order, by removing, adding and
+        updating only the rows that differ from what is displayed."""
+        for _change in self.iter_apply_rows(self.get_rows(db_games, service_id)):
+            pass
 
-        for db_game in db_games:
-            if installed_db_games is not None and "appid" in db_game:
-                appid = db_game["appid"]
-                store_item = StoreItem(db_game, self.service_media)
-                store_item.apply_installed_game_data(installed_db_games.get(appid))
-                self.add_item(store_item)
-            else:
-                self.add_game(db_game)
+    def get_rows(self, db_games, service_id):
+        """Return the values of the rows showing db_games, by game ID and in display
+        order; this doesn't access the store, and can run in a worker thread."""
+        new_rows = {}
+        for store_item in self.get_store_items(db_games, service_id):
+            if store_item.id not in new_rows:
+                new_rows[store_item.id] = self.get_row_values(store_item)
+        return new_rows
+
+    def iter_apply_rows(self, new_rows):
+        """Make the store show the rows returned by get_rows(), changing only the rows
+        that differ from what is displayed. This yields after each change, so the caller
+        can spread the changes over several iterations of the main loop."""
+        removed_ids = [game_id for game_id in self._iters if game_id not in new_rows]
+        added_count = sum(1 for game_id in new_rows if game_id not in self._iters)
+        with self.bulk_update(len(removed_ids) + added_count):
+            for game_id in removed_ids:
+                model_iter = self._iters.pop(game_id, None)
+                if model_iter:
+                    self.store.remove(model_iter)
+                    yield
+            columns = list(range(self.store.get_n_columns()))
+            for game_id, row_values in new_rows.items():
+                model_iter = self._iters.get(game_id)
+                if model_iter is None:
+                    self._iters[game_id] = self.store.append(row_values)
+                    yield
+                elif tuple(self.store[model_iter]) != row_values:
+                    self.store.set(model_iter, columns, row_values)
+                    yield
+            self.reorder(list(new_rows))
+
+    def reorder(self, game_ids):
+        """Move the rows in the order of game_ids, unless the store is sorted by a column"""
+        sort_column_id, _order = self.store.get_sort_column_id()
+        if sort_column_id is not None or len(game_ids) != len(self.store):
+            return
+        positions = {row[COL_ID]: position for position, row in enumerate(self.store)}
+        new_order = [positions[game_id] for game_id in game_ids]
+        if any(position != index for index, position in enumerate(new_order)):
+            self.store.reorder(new_order)
+
+    @contextmanager
+    def bulk_update(self, change_count):
+        """Let the views detach from the store while a large number of rows change"""
+        is_bulk = change_count > BULK_UPDATE_THRESHOLD
+        if is_bulk:
+            self.emit("bulk-update-started")
+        try:
+            yield
+        finally:
+            if is_bulk:
+                self.emit("bulk-update-finished")
 
     def on_game_updated(self, game):
         if self.service:
@@ -15,6 +15,20 @@ from lutris.gui.widgets.utils import (
     MEDIA_CACHE_INVALIDATED, get_default_icon_path, get_runtime_icon_path, get_scaled_surface_by_path, get_surface_size
 )
 from lutris.scanners.lutris import is_game_missing
+from lutris.util.log import logger
+from lutris.util.lru_cache import LRUCache
+from lutris.util.prioritized_loader import PrioritizedLoader
+
+# Memory budget of the surfaces cached by each image renderer
+MAX_CACHED_SURFACES_SIZE = 128 * 1024 * 1024
+MEDIA_LOADER = PrioritizedLoader(max_workers=4, name="media-loader")
+
+
+def get_surface_memory_size(surface):
+    """Return the size in bytes of the pixels of a surface"""
+    if not surface:
+        return 0
+    return surface.get_stride() * surface.get_height()
 
 
 class GridViewCellRendererText(Gtk.CellRendererText):
@@ -103,11 +117,10 @@ class GridViewCellRendererImage(Gtk.CellRenderer):
         self._show_badges = True
         self._platform = None
         self._is_installed = True
-        self.cached_surfaces_new = {}
-        self.cached_surfaces_old = {}
-        self.cached_surfaces_loaded = 0
-        self.cycle_cache_idle_id = None
+        self.cached_surfaces = LRUCache(MAX_CACHED_SURFACES_SIZE, get_surface_memory_size)
         self.cached_surface_generation = 0
+        self.cache_epoch = 0
+        self.loading_surfaces = set()
         self.badge_size = 0, 0
         self.badge_alpha = 0.6
         self.badge_fore_color = 1, 1, 1
@@ -218,9 +231,10 @@ class GridViewCellRendererImage(Gtk.CellRenderer):
         alpha = 1 if self.is_installed else 100 / 255
 
         if media_width > 0 and media_height > 0 and path:
-            surface = self._get_cached_surface_by_path(widget, path)
+            surface = self._get_cached_surface_by_path(widget, path, asynchronous=True)
             if not surface:
-                # The default icon needs to be scaled to fill the cell space.
+                # The default icon needs to be scaled to fill the cell space; it is
+                # also shown while the media is loading.
                 path = get_default_icon_path((media_width, media_height))
                 surface = self._get_cached_surface_by_path(widget, path,
                                                            preserve_aspect_ratio=False)
@@ -259,11 +273,6 @@ class GridViewCellRendererImage(Gtk.CellRenderer):
                     cr.paint_with_alpha(alpha)
                 cr.restore()
 
-            # Idle time will wait until the widget has drawn whatever it wants to;
-            # we can then discard surfaces we aren't using anymore.
-            if not self.cycle_cache_idle_id:
-                self.cycle_cache_idle_id = GLib.idle_add(self.cycle_cache)
-
     def select_badge_metrics(self, surface):
         """Updates fields holding data about the appearance of the badges;
         this sets self.badge_size to None if no badges should be shown at all."""
@@ -463,56 +472,86 @@ class GridViewCellRendererImage(Gtk.CellRenderer):
 
     def clear_cache(self):
         """Discards all cached surfaces; used when some properties are changed."""
-        self.cached_surfaces_old.clear()
-        self.cached_surfaces_new.clear()
-
-    def cycle_cache(self):
-        """Is the key cache size control trick. When called, the surfaces cached or used
-        since the last call are preserved, but those not touched are discarded.
-
-        We call this at idle time after rendering a cell; this should keep all the surfaces
-        rendered at that time, so during scrolling the visible media are kept and scrolling is smooth.
-        At other times we may discard almost all surfaces, saving memory.
-
-        We skip clearing anything if no surfaces have been loaded; this happens if drawing was
-        serviced entirely from cache. GTK may have redrawn just one image or something, so
-        let's not disturb the cache for that."""
-        if self.cached_surfaces_loaded > 0:
-            self.cached_surfaces_old = self.cached_surfaces_new
-            self.cached_surfaces_new = {}
-            self.cached_surfaces_loaded = 0
-        self.cycle_cache_idle_id = None
-
-    def _get_cached_surface_by_path(self, widget, path, size=None, preserve_aspect_ratio=True):
+        self.cached_surfaces.clear()
+        # Surfaces still loading are discarded when ready
+        MEDIA_LOADER.cancel_if(lambda key: key in self.loading_surfaces)
+        self.cache_epoch += 1
+        self.loading_surfaces.clear()
+
+    def _get_cached_surface_by_path(self, widget, path, size=None, preserve_aspect_ratio=True, asynchronous=False):
         """This obtains the scaled surface to rander for a given media path; this is cached
         in this render, but we'll clear that cache when the media generation number is changed,
-        or certain properties are. We also age surfaces from the cache at idle time after
-        rendering."""
+        or certain properties are. The least recently used surfaces are discarded once the
+        cache exceeds its memory budget.
+
+        If asynchronous is True and the surface isn't cached, it is loaded by the media loader
+        threads and this returns None; the widget is redrawn once it is ready."""
+        self._check_cache_generation()
+        key = self._get_surface_key(widget, path, size, preserve_aspect_ratio)
+
+        if key in self.cached_surfaces:
+            return self.cached_surfaces[key]
+
+        if asynchronous:
+            self._load_surface_async(key, priority=0)
+            return None
+
+        try:
+            surface = get_scaled_surface_by_path(path, key[2], key[3], preserve_aspect_ratio=preserve_aspect_ratio)
+        except MissingMediaError:
+            # We cache missing surfaces too
+            surface = None
+        self.cached_surfaces[key] = surface
+        return surface
+
+    def preload_media(self, widget, media_paths):
+        """Loads the media of the rows in and around the viewport of a widget, in the
+        background; media_paths is a list of (path, priority) tuples, the priority being
+        the distance in rows from the viewport. Loading of media not in the list is cancelled,
+        so this is called with the new list as the widget scrolls."""
+        self._check_cache_generation()
+        priorities = {}
+        for path, priority in media_paths:
+            key = self._get_surface_key(widget, path)
+            priorities[key] = min(priority, priorities.get(key, priority))
+
+        cancelled_keys = MEDIA_LOADER.cancel_if(lambda key: key[0] is widget and key not in priorities)
+        self.loading_surfaces.difference_update(cancelled_keys)
+        for key, priority in priorities.items():
+            if key not in self.cached_surfaces:
+                self._load_surface_async(key, priority)
+
+    def _check_cache_generation(self):
         if self.cached_surface_generation != MEDIA_CACHE_INVALIDATED.generation_number:
             self.cached_surface_generation = MEDIA_CACHE_INVALIDATED.generation_number
             self.clear_cache()
 
-        key = widget, path, size, preserve_aspect_ratio
+    def _get_surface_key(self, widget, path, size=None, preserve_aspect_ratio=True):
+        cell_size = size or (self.media_width, self.media_height)
+        scale_factor = widget.get_scale_factor() if widget else 1
+        return widget, path, cell_size, scale_factor, preserve_aspect_ratio
 
-        if key in self.cached_surfaces_new:
-            return self.cached_surfaces_new[key]
+    def _load_surface_async(self, key, priority):
+        if key in self.loading_surfaces and not MEDIA_LOADER.is_queued(key):
+            return  # Being loaded already
+        self.loading_surfaces.add(key)
+        epoch = self.cache_epoch
+        _widget, path, cell_size, scale_factor, preserve_aspect_ratio = key
 
-        if key in self.cached_surfaces_old:
-            surface = self.cached_surfaces_old[key]
-        else:
-            try:
-                surface = self._get_surface_by_path(widget, path, size, preserve_aspect_ratio)
-                # We cache missing surfaces too, but only a successful load trigger
-                # cache cycling
-                self.cached_surfaces_loaded += 1
-            except MissingMediaError:
-                surface = None
+        def on_loaded(_key, surface, error):
+            GLib.idle_add(self._on_surface_loaded, key, epoch, surface, error)
 
-        self.cached_surfaces_new[key] = surface
-        return surface
+        MEDIA_LOADER.submit(key, priority, get_scaled_surface_by_path, on_loaded,
+                            path, cell_size, scale_factor, preserve_aspect_ratio)
 
-    def _get_surface_by_path(self, widget, path, size=None, preserve_aspect_ratio=True):
-        cell_size = size or (self.media_width, self.media_height)
-        scale_factor = widget.get_scale_factor() if widget else 1
-        return get_scaled_surface_by_path(path, cell_size, scale_factor,
-                                          preserve_aspect_ratio=preserve_aspect_ratio)
+    def _on_surface_loaded(self, key, epoch, surface, error):
+        if epoch != self.cache_epoch:
+            return False
+        self.loading_surfaces.discard(key)
+        if error and not isinstance(error, MissingMediaError):
+            logger.error("Unable to load %s: %s", key[1], error)
+        self.cached_surfaces[key] = surface
+        widget = key[0]
+        if surface and widget:
+            widget.queue_draw()
+        return False
@@ -1,21 +1,15 @@
-import time
 from gettext import gettext as _
 
 from gi.repository import GLib, GObject, Gtk, Pango
 
-from lutris.util.downloader import Downloader
+from lutris.util.collection_downloader import CollectionDownloader
 from lutris.util.log import logger
 from lutris.util.strings import gtk_safe, human_size
 
-# Same reason as Downloader
-get_time = time.monotonic
-
 
 class DownloadCollectionProgressBox(Gtk.Box):
     """Progress bar used to monitor a collection of files download."""
 
-    max_retries = 3
-
     __gsignals__ = {
         "complete": (GObject.SignalFlags.RUN_LAST, None, (GObject.TYPE_PYOBJECT,)),
         "cancel": (GObject.SignalFlags.RUN_LAST, None, ()),
@@ -25,21 +19,12 @@ class DownloadCollectionProgressBox(Gtk.Box):
     def __init__(self, file_collection, cancelable=True, downloader=None):
         super().__init__(orientation=Gtk.Orientation.VERTICAL)
 
-        self.downloader = downloader
+        self.downloader = downloader  # A CollectionDownloader
         self.is_complete = False
-        self._file_queue = file_collection.files_list.copy()
-        self._file_download = None  # file being downloaded
+        self._files = file_collection.files_list.copy()
         self.title = file_collection.human_url
-        self.num_files_downloaded = 0
         self.num_files_to_download = file_collection.num_files
-        self.num_retries = 0
         self.full_size = file_collection.full_size
-        self.current_size = 0
-        self.time_left = "00:00:00"
-        self.time_left_check_time = 0
-        self.last_size = 0
-        self.avg_speed = 0
-        self.speed_list = []
 
         top_box = Gtk.Box()
         self.main_label = Gtk.Label(self.title)
@@ -86,43 +71,17 @@ class DownloadCollectionProgressBox(Gtk.Box):
         """Update file label to file being downloaded"""
         self.file_name_label.set_text(file_name)
 
-    def get_next_file_from_queue(self):
-        """Returns the file to download; if there isn't one this will pull the next one
-        from the queue and return that. If there are none there, this returns None."""
-        if not self._file_download:
-            if not self._file_queue:
-                return None
-
-            self._file_download = self._file_queue.pop()
-            self.num_retries = 0
-
-        return self._file_download
-
     def start(self):
-        """Start downloading a file."""
-        file = self.get_next_file_from_queue()
-        if not file:
-            self.cancel_button.set_sensitive(False)
-            self.is_complete = True
-            self.emit("complete", {})
-            return
-
-        self.update_download_file_label(file.filename)
+        """Start downloading the files."""
         if not self.downloader:
-            try:
-                self.downloader = Downloader(file.url, file.dest_file, referer=file.referer, overwrite=True)
-            except RuntimeError as ex:
-                from lutris.gui.dialogs import ErrorDialog
-
-                ErrorDialog(ex.args[0])
-                self.emit("cancel")
-                return
+            self.downloader = CollectionDownloader(self._files, full_size=self.full_size)
+        if self.downloader.state == self.downloader.DOWNLOADING:
+            return
 
         GLib.timeout_add(500, self._progress)
         self.cancel_button.show()
         self.cancel_button.set_sensitive(True)
-        if not self.downloader.state == self.downloader.DOWNLOADING:
-            self.downloader.start()
+        self.downloader.start()
 
     def set_retry_button(self):
         """Transform the cancel button into a retry button"""
@@ -132,12 +91,11 @@ class DownloadCollectionProgressBox(Gtk.Box):
         self.cancel_button.set_sensitive(True)
 
     def on_retry_clicked(self, button):
-        """Retry current download."""
+        """Retry the downloads; the files already downloaded are kept."""
         logger.debug("Retrying download")
         button.set_label(_("Cancel"))
         button.disconnect(self.cancel_cb_id)
         self.cancel_cb_id = button.connect("clicked", self.on_cancel_clicked)
-        self.downloader.reset()
         self.start()
 
     def on_cancel_clicked(self, _widget=None):
@@ -149,80 +107,40 @@ class DownloadCollectionProgressBox(Gtk.Box):
         self.emit("cancel")
 
     def _progress(self):
-        """Show download progress of current file."""
-        if self.downloader.state in [self.downloader.CANCELLED, self.downloader.ERROR]:
+        """Show download progress of the files."""
+        if self.downloader.state == self.downloader.CANCELLED:
+            self.progressbar.set_fraction(0)
+            self._set_text(_("Download interrupted"))
+            return False
+        if self.downloader.state == self.downloader.ERROR:
             self.progressbar.set_fraction(0)
-            if self.downloader.state == self.downloader.CANCELLED:
-                self._set_text(_("Download interrupted"))
-                self.emit("cancel")
-            else:
-                if self.num_retries > self.max_retries:
-                    self._set_text(str(self.downloader.error)[:80])
-                    self.emit("error")
-                    return False
-                self.num_retries += 1
-                if self.downloader:
-                    self.downloader.reset()
-                    self.start()
+            self._set_text(str(self.downloader.error)[:80])
+            self.set_retry_button()
+            self.emit("error", self.downloader.error)
             return False
-        downloaded_size = self.current_size + self.downloader.downloaded_size
-        progress = 0
-        if self.full_size > 0:
-            progress = min(downloaded_size / self.full_size, 1)
-        self.progressbar.set_fraction(progress)
-        self.update_speed_and_time()
+        self.progressbar.set_fraction(self.downloader.check_progress())
+        current_files = self.downloader.current_files
+        if current_files:
+            self.update_download_file_label(current_files[0].filename)
         megabytes = 1024 * 1024
         progress_text = _(
-            "{downloaded} / {size} ({speed:0.2f}MB/s), {time} remaining"
+            "{downloaded} / {size} ({speed:0.2f}MB/s), {time} remaining, {files} / {num_files} files"
         ).format(
-            downloaded=human_size(downloaded_size),
+            downloaded=human_size(self.downloader.downloaded_size),
             size=human_size(self.full_size),
-            speed=float(self.avg_speed) / megabytes,
-            time=self.time_left,
+            speed=float(self.downloader.average_speed) / megabytes,
+            time=self.downloader.time_left,
+            files=self.downloader.num_files_downloaded,
+            num_files=self.num_files_to_download,
         )
         self._set_text(progress_text)
         if self.downloader.state == self.downloader.COMPLETED:
-            self.num_files_downloaded += 1
-            self.current_size += self.downloader.downloaded_size
-            # set file to None to get next one
-            self._file_download = None
-            self.downloader = None
-            # start the downloader to a new file or finish
-            self.start()
+            self.cancel_button.set_sensitive(False)
+            self.is_complete = True
+            self.emit("complete", {})
             return False
         return True
 
-    def update_speed_and_time(self):
-        """Update time left and average speed."""
-        elapsed_time = get_time() - self.time_left_check_time
-        if elapsed_time < 1:  # Minimum delay
-            return
-
-        if not self.downloader:
-            self.time_left = "???"
-            return
-
-        downloaded_size = self.current_size + self.downloader.downloaded_size
-        elapsed_size = downloaded_size - self.last_size
-        self.last_size = downloaded_size
-
-        speed = elapsed_size / elapsed_time
-        # last 20 speeds
-        if len(self.speed_list) >= 20:
-            self.speed_list.pop(0)
-        self.speed_list.append(speed)
-
-        self.avg_speed = sum(self.speed_list) / len(self.speed_list)
-        if self.avg_speed == 0:
-            self.time_left = "???"
-            return
-
-        average_time_left = (self.full_size - downloaded_size) / self.avg_speed
-        minutes, seconds = divmod(average_time_left, 60)
-        hours, minutes = divmod(minutes, 60)
-        self.time_left_check_time = get_time()
-        self.time_left = "%d:%02d:%02d" % (hours, minutes, seconds)
-
     def _set_text(self, text):
         markup = "<span size='10000'>{}</span>".format(gtk_safe(text))
         self.progress_label.set_markup(markup)
@@ -1,15 +1,31 @@
 # Third Party Libraries
 from gi.repository import Gtk
 
+# Lutris Modules
+from lutris.util.jobs import AsyncCall
+from lutris.util.log_store import BLOCK_LINES
+
+# Lines of older output shown at once, when the view pages through a log store
+PAGE_LINES = BLOCK_LINES
+
 
 class LogTextView(Gtk.TextView):
     # pylint: disable=no-member
 
-    def __init__(self, buffer=None, autoscroll=True, wrap_mode=Gtk.WrapMode.CHAR):
+    def __init__(self, buffer=None, autoscroll=True, wrap_mode=Gtk.WrapMode.CHAR, log_store=None):
+        """Show a log buffer. If the buffer holds the most recent lines of a log
+        store, older lines are shown a page at a time and searches go through
+        the whole store."""
         super().__init__(visible=True)
 
         if buffer:
             self.set_buffer(buffer)
+        self.log_store = log_store
+        self.live_buffer = self.props.buffer
+        self.page_buffer = Gtk.TextBuffer()
+        self.page_start = None  # First line of the page shown, None when showing the live buffer
+        self.search_line = None  # Line of the match highlighted by the last search
+        self.search_count = 0
         self.set_editable(False)
         self.set_cursor_visible(False)
         self.set_monospace(True)
@@ -24,6 +40,8 @@ class LogTextView(Gtk.TextView):
             self.connect("size-allocate", self.autoscroll)
 
     def autoscroll(self, *args):  # pylint: disable=unused-argument
+        if self.page_start is not None:
+            return
         adj = self.get_vadjustment()
         if adj.get_value() == self.scroll_max or self.scroll_max == 0:
             adj.set_value(adj.get_upper() - adj.get_page_size())
@@ -39,11 +57,90 @@ class LogTextView(Gtk.TextView):
         self.mark = self.create_new_mark(self.props.buffer.get_start_iter())
         self.props.buffer.place_cursor(self.props.buffer.get_iter_at_mark(self.mark))
 
+    def get_live_start(self):
+        """Return the line of the log store at the start of the live buffer"""
+        return self.log_store.line_count + 1 - self.live_buffer.get_line_count()
+
+    def show_buffer(self, buffer):
+        if buffer == self.props.buffer:
+            return
+        self.props.buffer.delete_mark(self.mark)
+        self.set_buffer(buffer)
+        self.mark = self.create_new_mark(buffer.get_start_iter())
+
+    def show_live_buffer(self):
+        if self.page_start is None:
+            return
+        self.page_start = None
+        self.show_buffer(self.live_buffer)
+
+    def show_page(self, start):
+        """Show the older lines of the log store from a line, up to the start
+        of the live buffer; the live buffer is shown instead from there."""
+        live_start = self.get_live_start()
+        if start >= live_start:
+            self.show_live_buffer()
+            return
+        self.page_start = max(start, 0)
+        count = min(PAGE_LINES, live_start - self.page_start)
+        self.page_buffer.set_text("\n".join(self.log_store.get_lines(self.page_start, count)))
+        self.show_buffer(self.page_buffer)
+
+    def show_previous_page(self):
+        start = self.get_live_start() if self.page_start is None else self.page_start
+        if start > 0:
+            self.show_page(start - PAGE_LINES)
+            self.scroll_to_iter(self.page_buffer.get_end_iter(), 0, False, 0, 0)
+
+    def show_next_page(self):
+        if self.page_start is not None:
+            self.show_page(self.page_start + PAGE_LINES)
+            self.scroll_to_iter(self.props.buffer.get_start_iter(), 0, False, 0, 0)
+
+    def search_store(self, searched_entry, start_line, backward=False):
+        """Search the whole log store in the background, then show the matching line"""
+        self.search_count += 1
+        search_count = self.search_count
+        text = searched_entry.get_text()
+
+        def on_store_searched(line, error):
+            if not error and line is not None and search_count == self.search_count:
+                self.show_search_result(line, text)
+
+        AsyncCall(self.log_store.search, on_store_searched, text, start_line, backward)
+
+    def show_search_result(self, line, text):
+        """Show and highlight a line of the log store found by a search"""
+        live_start = self.get_live_start()
+        if line >= live_start:
+            self.show_live_buffer()
+            buffer_line = line - live_start
+        else:
+            if self.page_start is None or not self.page_start <= line < self.page_start + PAGE_LINES:
+                self.show_page(line - PAGE_LINES // 2)
+            buffer_line = line - self.page_start
+        self.search_line = line
+        line_start = self.props.buffer.get_iter_at_line(buffer_line)
+        line_end = line_start.copy()
+        line_end.forward_to_line_end()
+        occurence = line_start.forward_search(text, Gtk.TextSearchFlags.CASE_INSENSITIVE, line_end)
+        if occurence is not None:
+            self.highlight(occurence[0], occurence[1])
+        else:
+            self.highlight(line_start, line_end)
+
     def find_first(self, searched_entry):
+        if self.log_store:
+            self.search_store(searched_entry, 0)
+            return
         self.reset_search()
         self.find_next(searched_entry)
 
     def find_next(self, searched_entry):
+        if self.log_store:
+            start_line = 0 if self.search_line is None else self.search_line + 1
+            self.search_store(searched_entry, start_line)
+            return
         buffer_iter = self.props.buffer.get_iter_at_mark(self.mark)
         next_occurence = buffer_iter.forward_search(
             searched_entry.get_text(), Gtk.TextSearchFlags.CASE_INSENSITIVE, None
@@ -61,6 +158,10 @@ class LogTextView(Gtk.TextView):
             self.mark = self.create_new_mark(next_occurence[1])
 
     def find_previous(self, searched_entry):
+        if self.log_store:
+            start_line = self.log_store.line_count + 1 if self.search_line is None else self.search_line
+            self.search_store(searched_entry, start_line, backward=True)
+            return
         # First go to the beginning of searched_entry string
         buffer_iter = self.props.buffer.get_iter_at_mark(self.mark)
         buffer_iter.backward_chars(len(searched_entry.get_text()))
@@ -82,5 +183,6 @@ class LogTextView(Gtk.TextView):
 
     def highlight(self, range_start, range_end):
         self.props.buffer.select_range(range_start, range_end)
+        self.props.buffer.move_mark(self.mark, range_end)
         # Focus
         self.scroll_mark_onscreen(self.mark)
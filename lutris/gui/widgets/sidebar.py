@@ -541,7 +541,7 @@ class LutrisSidebar(Gtk.ListBox):
 
         self.used_categories = {c["name"] for c in categories}
         self.active_services = services.get_enabled_services()
-        self.installed_runners = [runner.name for runner in runners.get_installed()]
+        self.installed_runners = runners.get_installed_names()
         self.active_platforms = games_db.get_used_platforms()
 
         for service_name, service_class in self.active_services.items():
@@ -555,11 +555,10 @@ class LutrisSidebar(Gtk.ListBox):
         for runner_name in self.installed_runners:
             if runner_name not in self.runner_rows:
                 icon_name = runner_name.lower().replace(" ", "") + "-symbolic"
-                runner = runners.import_runner(runner_name)()
                 runner_row = RunnerSidebarRow(
                     runner_name,
                     "runner",
-                    runner.human_name,
+                    runners.get_runner_human_name(runner_name),
                     self.get_sidebar_icon(icon_name),
                     application=self.application
                 )
@@ -1,6 +1,8 @@
 """Various utilities using the GObject framework"""
 import array
+import hashlib
 import os
+import threading
 
 import cairo
 from gi.repository import Gdk, GdkPixbuf, Gio, GLib, Gtk
@@ -18,8 +20,13 @@ except ImportError:
 
 ICON_SIZE = (32, 32)
 BANNER_SIZE = (184, 69)
+THUMBNAIL_CACHE_PATH = os.path.join(settings.CACHE_DIR, "thumbnails")
+MAX_THUMBNAIL_CACHE_SIZE = 200 * 1024 * 1024  # Pruned down to 3/4 of this when exceeded
 MEDIA_CACHE_INVALIDATED = NotificationSource()
 
+_thumbnail_cache_size = None  # Bytes, measured on the first write
+_thumbnail_cache_lock = threading.Lock()
+
 
 def get_main_window(widget):
     """Return the application's main window from one of its widget"""
@@ -76,8 +83,15 @@ def get_scaled_surface_by_path(path, size, device_scale, preserve_aspect_ratio=T
     If you pass True for preserve_aspect_ratio, the aspect ratio of the image is preserved,
     but will be no larger than the size (times the device_scale).
 
-    If the path cannot be read, this returns None.
+    The scaled image is kept in the thumbnail cache, and read back from there
+    as long as the image file is not modified.
+
+    If the path cannot be read, this raises MissingMediaError.
     """
+    surface = read_thumbnail(path, size, device_scale, preserve_aspect_ratio)
+    if surface:
+        return surface
+
     pixbuf = get_pixbuf_by_path(path)
     pixbuf_width = pixbuf.get_width()
     pixbuf_height = pixbuf.get_height()
@@ -99,9 +113,85 @@ def get_scaled_surface_by_path(path, size, device_scale, preserve_aspect_ratio=T
     cr.get_source().set_extend(cairo.Extend.PAD)  # pylint: disable=no-member
     cr.paint()
     surface.set_device_scale(device_scale, device_scale)
+    write_thumbnail(surface, path, size, device_scale, preserve_aspect_ratio)
+    return surface
+
+
+def get_thumbnail_path(path, size, device_scale, preserve_aspect_ratio=True):
+    """Returns the path of the thumbnail of an image at a given size"""
+    key = "%s\0%sx%s@%s\0%s" % (os.path.abspath(path), size[0], size[1], device_scale, preserve_aspect_ratio)
+    return os.path.join(THUMBNAIL_CACHE_PATH, hashlib.sha1(key.encode()).hexdigest() + ".png")
+
+
+def read_thumbnail(path, size, device_scale, preserve_aspect_ratio=True):
+    """Returns a Cairo surface with the cached thumbnail of an image, or None if
+    there is no thumbnail or the image was modified since it was made. A thumbnail
+    has the modification time of the image it was made from."""
+    thumbnail_path = get_thumbnail_path(path, size, device_scale, preserve_aspect_ratio)
+    try:
+        if os.stat(thumbnail_path).st_mtime_ns != os.stat(path).st_mtime_ns:
+            return None
+        surface = cairo.ImageSurface.create_from_png(thumbnail_path)  # pylint:disable=no-member
+    except (OSError, TypeError, cairo.Error):  # pylint:disable=no-member
+        return None
+    surface.set_device_scale(device_scale, device_scale)
     return surface
 
 
+def write_thumbnail(surface, path, size, device_scale, preserve_aspect_ratio=True):
+    """Saves a scaled image to the thumbnail cache"""
+    thumbnail_path = get_thumbnail_path(path, size, device_scale, preserve_aspect_ratio)
+    temp_path = "%s.%s.tmp" % (thumbnail_path, threading.get_ident())
+    try:
+        mtime = os.stat(path).st_mtime_ns
+        os.makedirs(THUMBNAIL_CACHE_PATH, exist_ok=True)
+        surface.write_to_png(temp_path)
+        os.utime(temp_path, ns=(mtime, mtime))
+        os.replace(temp_path, thumbnail_path)
+        _add_thumbnail_cache_size(os.path.getsize(thumbnail_path))
+    except (OSError, cairo.Error) as ex:  # pylint:disable=no-member
+        logger.debug("Unable to write the thumbnail of %s: %s", path, ex)
+
+
+def _add_thumbnail_cache_size(size):
+    """Accounts for a new thumbnail, and prunes the cache once it is over its maximum size"""
+    global _thumbnail_cache_size
+    with _thumbnail_cache_lock:
+        if _thumbnail_cache_size is None:
+            _thumbnail_cache_size = prune_thumbnail_cache(MAX_THUMBNAIL_CACHE_SIZE)
+        else:
+            _thumbnail_cache_size += size
+        if _thumbnail_cache_size > MAX_THUMBNAIL_CACHE_SIZE:
+            _thumbnail_cache_size = prune_thumbnail_cache(MAX_THUMBNAIL_CACHE_SIZE * 3 // 4)
+
+
+def prune_thumbnail_cache(max_size):
+    """Deletes the thumbnails written longest ago until the cache takes at most
+    max_size bytes; they are made again when next needed. A thumbnail's
+    modification time is its image's, so the change time is when it was written.
+    Returns the size of the cache left."""
+    thumbnails = []
+    try:
+        with os.scandir(THUMBNAIL_CACHE_PATH) as entries:
+            for entry in entries:
+                if entry.is_file(follow_symlinks=False):
+                    stat = entry.stat(follow_symlinks=False)
+                    thumbnails.append((stat.st_ctime_ns, stat.st_size, entry.path))
+    except OSError as ex:
+        logger.debug("Unable to list the thumbnails in %s: %s", THUMBNAIL_CACHE_PATH, ex)
+        return 0
+    cache_size = sum(size for _ctime, size, _path in thumbnails)
+    for _ctime, size, thumbnail_path in sorted(thumbnails):
+        if cache_size <= max_size:
+            break
+        try:
+            os.remove(thumbnail_path)
+        except OSError:
+            continue
+        cache_size -= size
+    return cache_size
+
+
 def get_default_icon_path(size):
     """Returns the path to the default icon for the size given; it's
     a Lutris icon for a square size, and a gradient for other sizes."""
@@ -6,7 +6,7 @@ from urllib.parse import urlparse
 from lutris.cache import get_cache_path, has_custom_cache_path, save_to_cache
 from lutris.gui.widgets.download_progress_box import DownloadProgressBox
 from lutris.installer.errors import ScriptingError
-from lutris.util import system
+from lutris.util import hashing, system
 from lutris.util.log import logger
 from lutris.util.strings import gtk_safe_urls
 
@@ -221,7 +221,11 @@ class InstallerFile:
         except ValueError as err:
             raise ScriptingError(_("Invalid checksum, expected format (type:hash) "), self.checksum) from err
 
-        if system.get_file_checksum(self.dest_file, hash_type) != expected_hash:
+        try:
+            file_hash = hashing.get_file_hash(self.dest_file, hash_type)
+        except ValueError as err:
+            raise ScriptingError(_("Unsupported checksum type "), hash_type) from err
+        if file_hash != expected_hash.lower():
             raise ScriptingError(hash_type.capitalize() + _(" checksum mismatch "), self.checksum)
 
     @property
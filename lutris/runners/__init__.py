@@ -88,14 +88,21 @@ def import_task(runner, task):
     return getattr(runner_module, task)
 
 
+def get_installed_names():
+    """Return the names of the installed runners; runners are only imported
+    when their installation can't be checked from their cached metadata."""
+    from lutris.runners import metadata  # pylint: disable=import-outside-toplevel
+    installed = [runner_name for runner_name in __all__ if metadata.is_runner_installed(runner_name, save=False)]
+    metadata.RUNNER_METADATA.save()
+    return installed
+
+
 def get_installed(sort=True):
     """Return a list of installed runners (class instances)."""
-    installed = []
-    for runner_name in __all__:
-        runner = import_runner(runner_name)()
-        if runner.is_installed():
-            installed.append(runner)
-    return sorted(installed) if sort else installed
+    runner_names = get_installed_names()
+    if sort:
+        runner_names = sorted(runner_names)
+    return [import_runner(runner_name)() for runner_name in runner_names]
 
 
 def inject_runners(runners):
@@ -116,8 +123,9 @@ def get_runner_human_name(runner_name):
     names."""
     if runner_name:
         if runner_name not in _cached_runner_human_names:
+            from lutris.runners.metadata import get_runner_metadata  # pylint: disable=import-outside-toplevel
             try:
-                _cached_runner_human_names[runner_name] = import_runner(runner_name)().human_name
+                _cached_runner_human_names[runner_name] = get_runner_metadata(runner_name)["human_name"]
             except InvalidRunnerError:
                 _cached_runner_human_names[runner_name] = runner_name  # an obsolete runner
         return _cached_runner_human_names[runner_name]
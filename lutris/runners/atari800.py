@@ -6,6 +6,7 @@ from lutris.config import LutrisConfig
 from lutris.exceptions import MissingBiosError, MissingGameExecutableError
 from lutris.runners.runner import Runner
 from lutris.util import display, extract, system
+from lutris.util.hashing import save_hash_cache
 
 
 def get_resolutions():
@@ -111,6 +112,7 @@ class atari800(Runner):
                 if real_hash == checksum:
                     logging.debug("%s Checksum : OK", filename)
                     good_bios[bios_file] = filename
+        save_hash_cache()
         return good_bios
 
     def play(self):
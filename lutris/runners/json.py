@@ -34,6 +34,7 @@ class JsonRunner(Runner):
         self.download_url = self._json_data.get("download_url")
         self.runnable_alone = self._json_data.get("runnable_alone")
         self.flatpak_id = self._json_data.get("flatpak_id")
+        self.metadata_paths = [self.json_path]
 
     def play(self):
         """Return a launchable command constructed from the options"""
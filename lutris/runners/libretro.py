@@ -1,4 +1,5 @@
 """libretro runner"""
+import json
 import os
 from gettext import gettext as _
 from operator import itemgetter
@@ -10,6 +11,7 @@ from lutris import settings
 from lutris.exceptions import GameConfigError, MissingGameExecutableError, UnspecifiedVersionError
 from lutris.runners.runner import Runner
 from lutris.util import system
+from lutris.util.hashing import save_hash_cache
 from lutris.util.libretro import RetroConfig
 from lutris.util.log import logger
 
@@ -18,29 +20,40 @@ def get_default_config_path(path=""):
     return os.path.join(settings.RUNNER_DIR, "retroarch", path)
 
 
-def get_libretro_cores():
-    cores = []
-    runner_path = get_default_config_path()
-    if not os.path.exists(runner_path):
-        return []
+LIBRETRO_CORES_CACHE_PATH = os.path.join(settings.CACHE_DIR, "libretro-cores.json")
+_libretro_cores = {"signature": None, "cores": []}
 
-    # Get core identifiers from info dir
-    info_path = get_default_config_path("info")
-    if not os.path.exists(info_path):
-        req = requests.get(
-            "http://buildbot.libretro.com/assets/frontend/info.zip",
-            allow_redirects=True,
-            timeout=5
-        )
-        if req.status_code == requests.codes.ok:  # pylint: disable=no-member
-            with open(get_default_config_path('info.zip'), 'wb') as info_zip:
-                info_zip.write(req.content)
-            with ZipFile(get_default_config_path('info.zip'), 'r') as info_zip:
-                info_zip.extractall(info_path)
-        else:
-            logger.error("Error retrieving libretro info archive from server: %s - %s", req.status_code, req.reason)
-            return []
-    # Parse info files to fetch display name and platform/system
+
+def download_info_files(info_path):
+    """Download the core info files from the libretro buildbot, return whether it succeeded"""
+    req = requests.get(
+        "http://buildbot.libretro.com/assets/frontend/info.zip",
+        allow_redirects=True,
+        timeout=5
+    )
+    if req.status_code != requests.codes.ok:  # pylint: disable=no-member
+        logger.error("Error retrieving libretro info archive from server: %s - %s", req.status_code, req.reason)
+        return False
+    with open(get_default_config_path('info.zip'), 'wb') as info_zip:
+        info_zip.write(req.content)
+    with ZipFile(get_default_config_path('info.zip'), 'r') as info_zip:
+        info_zip.extractall(info_path)
+    return True
+
+
+def get_info_files_signature(info_path):
+    """Return a value changing whenever core info files are added, removed or updated"""
+    info_files = [entry for entry in os.scandir(info_path) if entry.name.endswith("_libretro.info")]
+    return "%s:%s:%s" % (
+        os.stat(info_path).st_mtime_ns,
+        len(info_files),
+        max((entry.stat().st_mtime_ns for entry in info_files), default=0),
+    )
+
+
+def parse_info_files(info_path):
+    """Parse info files to fetch display name and platform/system"""
+    cores = []
     for info_file in os.listdir(info_path):
         if "_libretro.info" not in info_file:
             continue
@@ -54,15 +67,57 @@ def get_libretro_cores():
     return cores
 
 
-# List of supported libretro cores
-# First element is the human readable name for the core with the platform's short name
-# Second element is the core identifier
-# Third element is the platform's long name
-LIBRETRO_CORES = get_libretro_cores()
+def read_cores_cache(signature):
+    """Return the cores saved for the info files with the given signature, if any"""
+    if not os.path.exists(LIBRETRO_CORES_CACHE_PATH):
+        return None
+    try:
+        with open(LIBRETRO_CORES_CACHE_PATH, encoding="utf-8") as cache_file:
+            cache = json.load(cache_file)
+    except (OSError, ValueError) as ex:
+        logger.warning("Unable to read libretro cores cache: %s", ex)
+        return None
+    if cache.get("signature") != signature:
+        return None
+    return [tuple(core) for core in cache["cores"]]
+
+
+def write_cores_cache(signature, cores):
+    try:
+        with open(LIBRETRO_CORES_CACHE_PATH, "w", encoding="utf-8") as cache_file:
+            json.dump({"signature": signature, "cores": cores}, cache_file)
+    except OSError as ex:
+        logger.warning("Unable to write libretro cores cache: %s", ex)
+
+
+def get_libretro_cores():
+    """Return the supported libretro cores. Each core is a tuple of the human
+    readable name of the core with the platform's short name, the core
+    identifier and the platform's long name.
+
+    The info files are only parsed again when they change; the parsed cores
+    are kept in memory and in the cache dir.
+    """
+    runner_path = get_default_config_path()
+    if not os.path.exists(runner_path):
+        return []
+
+    # Get core identifiers from info dir
+    info_path = get_default_config_path("info")
+    if not os.path.exists(info_path) and not download_info_files(info_path):
+        return []
+    signature = get_info_files_signature(info_path)
+    if signature != _libretro_cores["signature"]:
+        cores = read_cores_cache(signature)
+        if cores is None:
+            cores = parse_info_files(info_path)
+            write_cores_cache(signature, cores)
+        _libretro_cores.update(signature=signature, cores=cores)
+    return _libretro_cores["cores"]
 
 
 def get_core_choices():
-    return [(core[0], core[1]) for core in LIBRETRO_CORES]
+    return [(core[0], core[1]) for core in get_libretro_cores()]
 
 
 class libretro(Runner):
@@ -72,6 +127,7 @@ class libretro(Runner):
     runner_executable = "retroarch/retroarch"
     flatpak_id = "org.libretro.RetroArch"
     has_runner_versions = True
+    metadata_paths = [get_default_config_path("info")]
 
     game_options = [
         {
@@ -83,7 +139,7 @@ class libretro(Runner):
             "option": "core",
             "type": "choice",
             "label": _("Core"),
-            "choices": get_core_choices(),
+            "choices": get_core_choices,
         },
     ]
 
@@ -114,14 +170,14 @@ class libretro(Runner):
 
     @property
     def platforms(self):
-        return [core[2] for core in LIBRETRO_CORES]
+        return [core[2] for core in get_libretro_cores()]
 
     def get_platform(self):
         game_core = self.game_config.get("core")
         if not game_core:
             logger.warning("Game don't have a core set")
             return
-        for core in LIBRETRO_CORES:
+        for core in get_libretro_cores():
             if core[1] == game_core:
                 return core[2]
         logger.warning("'%s' not found in Libretro cores", game_core)
@@ -258,6 +314,7 @@ class libretro(Runner):
                 # firmware is missing
                 # TODO Add dialog for copying the firmware in the correct
                 # location
+            save_hash_cache()
 
     def get_runner_parameters(self):
         parameters = []
@@ -0,0 +1,162 @@
+"""Cached metadata of the runners
+
+Reading the name, platforms or executable of a runner requires importing its
+module, and listing the installed runners imported all of them. This metadata
+is kept in a JSON file in the cache dir instead, and read again from the runner
+when one of the files it comes from changes.
+"""
+import inspect
+import json
+import os
+import threading
+
+from lutris import __version__, settings
+from lutris.runners import import_runner
+from lutris.runners.runner import Runner
+from lutris.util.log import logger
+from lutris.util.yaml import read_yaml_from_file
+
+RUNNER_METADATA_PATH = os.path.join(settings.CACHE_DIR, "runners.json")
+METADATA_FIELDS = (
+    "human_name",
+    "description",
+    "platforms",
+    "runner_executable",
+    "flatpak_id",
+    "runnable_alone",
+    "entry_point_option",
+)
+
+
+def get_locale():
+    """Return the locale the runner names and descriptions are translated to"""
+    for variable in ("LANGUAGE", "LC_ALL", "LC_MESSAGES", "LANG"):
+        if os.environ.get(variable):
+            return os.environ[variable]
+    return ""
+
+
+def get_mtimes(paths):
+    """Return the modification time of each path, None for missing ones"""
+    mtimes = {}
+    for path in paths:
+        try:
+            mtimes[path] = os.stat(path).st_mtime_ns
+        except OSError:
+            mtimes[path] = None
+    return mtimes
+
+
+def read_runner_metadata(runner_name):
+    """Import a runner and return its metadata, along with the modification
+    times of the files it depends on"""
+    runner = import_runner(runner_name)()
+    runner_class = type(runner)
+    metadata = {field: getattr(runner, field) for field in METADATA_FIELDS}
+    metadata["default_install_check"] = (
+        runner_class.is_installed is Runner.is_installed and runner_class.get_executable is Runner.get_executable
+    )
+    paths = [inspect.getfile(cls) for cls in runner_class.__mro__ if cls is not object]
+    metadata["mtimes"] = get_mtimes(paths + list(runner.metadata_paths))
+    return metadata
+
+
+class RunnerMetadataCache:
+    """Persistent map of runner names to their metadata, stored as JSON in the cache dir"""
+
+    def __init__(self, path=RUNNER_METADATA_PATH):
+        self.path = path
+        self._entries = None
+        self._dirty = False
+        self._lock = threading.RLock()
+
+    @property
+    def entries(self):
+        if self._entries is None:
+            self._entries = self._load()
+        return self._entries
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, encoding="utf-8") as cache_file:
+                cache = json.load(cache_file)
+        except (OSError, ValueError) as ex:
+            logger.warning("Unable to read runner metadata %s: %s", self.path, ex)
+            return {}
+        if not isinstance(cache, dict) or cache.get("version") != __version__ or cache.get("locale") != get_locale():
+            return {}
+        return cache.get("runners") or {}
+
+    def get(self, runner_name, save=True):
+        """Return the metadata of a runner, importing it if the cached
+        metadata is missing or outdated. Raises InvalidRunnerError for
+        unknown runners."""
+        with self._lock:
+            metadata = self.entries.get(runner_name)
+            if metadata and get_mtimes(metadata["mtimes"]) == metadata["mtimes"]:
+                return metadata
+            metadata = read_runner_metadata(runner_name)
+            self.entries[runner_name] = metadata
+            self._dirty = True
+            if save:
+                self.save()
+            return metadata
+
+    def save(self):
+        with self._lock:
+            if not self._dirty:
+                return
+            temp_path = self.path + ".tmp"
+            try:
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                with open(temp_path, "w", encoding="utf-8") as cache_file:
+                    json.dump({"version": __version__, "locale": get_locale(), "runners": self.entries}, cache_file)
+                os.replace(temp_path, self.path)
+            except OSError as ex:
+                logger.warning("Unable to write runner metadata %s: %s", self.path, ex)
+                return
+            self._dirty = False
+
+    def clear(self):
+        with self._lock:
+            self._entries = {}
+            self._dirty = True
+
+
+RUNNER_METADATA = RunnerMetadataCache()
+
+
+def get_runner_metadata(runner_name):
+    """Return the cached metadata of a runner"""
+    return RUNNER_METADATA.get(runner_name)
+
+
+class MetadataRunner(Runner):
+    """Stand-in for a runner, built from its metadata, for runners relying
+    on the base class to check their installation"""
+
+    name = None
+
+    def __init__(self, runner_name, metadata):
+        super().__init__()
+        self.name = runner_name
+        for field in METADATA_FIELDS:
+            setattr(self, field, metadata[field])
+
+    @property
+    def runner_config(self):
+        """The runner configuration, without the defaults of the runner's
+        options: those would import the runner, and the custom executable
+        checked by is_installed() has no default."""
+        config_path = os.path.join(settings.RUNNERS_CONFIG_DIR, "%s.yml" % self.name)
+        return read_yaml_from_file(config_path).get(self.name) or {}
+
+
+def is_runner_installed(runner_name, save=True):
+    """Return whether a runner is installed, without importing it when possible"""
+    metadata = RUNNER_METADATA.get(runner_name, save)
+    if metadata["default_install_check"]:
+        return MetadataRunner(runner_name, metadata).is_installed()
+    return import_runner(runner_name)().is_installed()
@@ -35,6 +35,8 @@ class Runner:  # pylint: disable=too-many-public-methods
     arch = None  # If the runner is only available for an architecture that isn't x86_64
     flatpak_id = None
     has_runner_versions = False
+    # Files other than the runner's source code its metadata (name, platforms...) depends on
+    metadata_paths = []
 
     def __init__(self, config=None):
         """Initialize runner."""
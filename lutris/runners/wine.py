@@ -912,9 +912,13 @@ class wine(Runner):
         )
         return True
 
-    def set_regedit_keys(self):
+    def set_regedit_keys(self, prefix_manager=None):
         """Reset regedit keys according to config."""
-        prefix_manager = WinePrefixManager(self.prefix_path)
+        prefix_manager = prefix_manager or WinePrefixManager(self.prefix_path)
+        with prefix_manager.edit_registry():
+            self._set_regedit_keys(prefix_manager)
+
+    def _set_regedit_keys(self, prefix_manager):
         # Those options are directly changed with the prefix manager and skip
         # any calls to regedit.
         managed_keys = {
@@ -971,11 +975,13 @@ class wine(Runner):
                 create_prefix(prefix_path, wine_path=self.get_executable(), arch=self.wine_arch, runner=self)
 
             prefix_manager = WinePrefixManager(prefix_path)
-            if self.runner_config.get("autoconf_joypad", False):
-                prefix_manager.configure_joypads()
-            prefix_manager.create_user_symlinks()
-            self.sandbox(prefix_manager)
-            self.set_regedit_keys()
+            # Parse the registry files once for all the settings below
+            with prefix_manager.edit_registry():
+                if self.runner_config.get("autoconf_joypad", False):
+                    prefix_manager.configure_joypads()
+                prefix_manager.create_user_symlinks()
+                self.sandbox(prefix_manager)
+                self.set_regedit_keys(prefix_manager)
 
             for manager, enabled in self.get_dll_managers().items():
                 manager.setup(enabled)
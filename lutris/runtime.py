@@ -1,5 +1,4 @@
 """Runtime handling module"""
-import concurrent.futures
 import os
 import threading
 import time
@@ -13,6 +12,7 @@ from lutris.api import (
 from lutris.gui.widgets.progress_box import ProgressInfo
 from lutris.settings import UPDATE_CHANNEL_STABLE
 from lutris.util import http, system
+from lutris.util.download_scheduler import PRIORITY_RUNTIME, get_scheduler
 from lutris.util.downloader import Downloader
 from lutris.util.extract import extract_archive
 from lutris.util.jobs import AsyncCall
@@ -334,7 +334,7 @@ class RuntimeExtractedComponentUpdater(RuntimeComponentUpdater):
         self.complete_event.clear()
 
         archive_path = os.path.join(settings.RUNTIME_DIR, os.path.basename(self.url))
-        self.downloader = Downloader(self.url, archive_path, overwrite=True)
+        self.downloader = Downloader(self.url, archive_path, overwrite=True, priority=PRIORITY_RUNTIME)
         self.downloader.start()
         self.downloader.join()
         self.downloader = None
@@ -409,15 +409,12 @@ class RuntimeFilesComponentUpdater(RuntimeComponentUpdater):
                 continue
             downloads.append(component)
 
-        with concurrent.futures.ThreadPoolExecutor(max_workers=8) as executor:
-            future_downloads = {
-                executor.submit(self._download_component, component): component["filename"]
-                for component in downloads
-            }
-            for future in concurrent.futures.as_completed(future_downloads):
-                if not future.cancelled() and future.exception():
-                    expected_filename = future_downloads[future]
-                    logger.warning("Failed to get '%s': %s", expected_filename, future.exception())
+        futures = get_scheduler().map(
+            self._download_component, downloads, url=lambda component: component["url"], priority=PRIORITY_RUNTIME
+        )
+        for component, future in zip(downloads, futures):
+            if not future.cancelled() and future.exception():
+                logger.warning("Failed to get '%s': %s", component["filename"], future.exception())
         self.state = ComponentUpdater.COMPLETED
 
     def _should_update_component(self, filename: str, remote_modified_at: time.struct_time) -> bool:
@@ -480,7 +477,7 @@ class RunnerComponentUpdater(ComponentUpdater):
         url = self.upstream_runner["url"]
         archive_download_path = os.path.join(settings.TMP_DIR, os.path.basename(url))
         self.state = ComponentUpdater.DOWNLOADING
-        self.downloader = Downloader(self.upstream_runner["url"], archive_download_path)
+        self.downloader = Downloader(self.upstream_runner["url"], archive_download_path, priority=PRIORITY_RUNTIME)
         self.downloader.start()
         self.downloader.join()
         if self.downloader.state == self.downloader.COMPLETED:
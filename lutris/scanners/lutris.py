@@ -1,19 +1,25 @@
-import json
 import os
 import time
+from concurrent.futures import ThreadPoolExecutor
 
 from lutris import settings
 from lutris.api import get_api_games, get_game_installers
-from lutris.database.games import get_games
-from lutris.game import Game
+from lutris.database import game_paths as game_paths_db
+from lutris.database.games import get_games, iter_games
 from lutris.installer.errors import MissingGameDependencyError
 from lutris.installer.interpreter import ScriptInterpreter
 from lutris.services.lutris import download_lutris_media
 from lutris.util import cache_single
 from lutris.util.log import logger
 from lutris.util.strings import slugify
+from lutris.util.yaml import read_yaml_from_file
 
-GAME_PATH_CACHE_PATH = os.path.join(settings.CACHE_DIR, "game-paths.json")
+# The path cache used to be kept in this file, it is now in the game_paths table
+LEGACY_GAME_PATH_CACHE_PATH = os.path.join(settings.CACHE_DIR, "game-paths.json")
+# Seconds the result of a check for the existence of a game's file is reused
+PATH_CHECK_TTL = 60
+PATH_CHECK_WORKERS = 8
+_path_checks = {}  # Path to whether it exists and the time it was checked
 
 
 def get_game_slugs_and_folders(dirname):
@@ -109,10 +115,13 @@ def get_path_from_config(game):
     if not game.config:
         logger.warning("Game %s has no configuration", game)
         return ""
-    game_config = game.config.game_config
+    return get_path_from_game_config(game.runner_name, game.directory, game.config.game_config)
 
+
+def get_path_from_game_config(runner_name, directory, game_config):
+    """Return the path of the main entry point for a game, given the game section of its configuration"""
     # Skip MAME roms referenced by their ID
-    if game.runner_name == "mame":
+    if runner_name == "mame":
         if "main_file" in game_config and "." not in game_config["main_file"]:
             return ""
 
@@ -125,35 +134,40 @@ def get_path_from_config(game):
             if path:
                 path = os.path.expanduser(path)
                 if not path.startswith("/"):
-                    path = os.path.join(game.directory, path)
+                    path = os.path.join(directory or "", path)
                 return path
 
-    logger.warning("No path found in %s", game.config)
+    logger.warning("No path found in the configuration of game %s", game_config)
     return ""
 
 
 def get_game_paths():
+    """Return the paths of the installed games, by game ID; only the game
+    section of their configuration file is read."""
     game_paths = {}
-    all_games = get_games(filters={'installed': 1})
-    for db_game in all_games:
-        game = Game(db_game["id"])
-        if game.runner_name in ("steam", "web"):
-            continue
-        path = get_path_from_config(game)
-        if not path:
+    fields = ("id", "runner", "directory", "configpath")
+    for db_game in iter_games(filters={"installed": 1}, fields=fields):
+        if db_game["runner"] in ("steam", "web") or not db_game["configpath"]:
             continue
-        game_paths[db_game["id"]] = path
+        config_path = os.path.join(settings.GAME_CONFIG_DIR, "%s.yml" % db_game["configpath"])
+        game_config = (read_yaml_from_file(config_path) or {}).get("game") or {}
+        path = get_path_from_game_config(db_game["runner"], db_game["directory"], game_config)
+        if path:
+            game_paths[db_game["id"]] = path
     return game_paths
 
 
 def build_path_cache(recreate=False):
-    """Generate a new cache path"""
-    if os.path.exists(GAME_PATH_CACHE_PATH) and not recreate:
+    """Fill the path cache, unless it is filled already"""
+    if os.path.exists(LEGACY_GAME_PATH_CACHE_PATH):
+        os.remove(LEGACY_GAME_PATH_CACHE_PATH)
+        recreate = True
+    if game_paths_db.has_game_paths() and not recreate:
         return
     start_time = time.time()
-    with open(GAME_PATH_CACHE_PATH, "w", encoding="utf-8") as cache_file:
-        game_paths = get_game_paths()
-        json.dump(game_paths, cache_file, indent=2)
+    game_paths = get_game_paths()
+    game_paths_db.clear_game_paths()
+    game_paths_db.set_game_paths(game_paths)
     end_time = time.time()
     get_path_cache.cache_clear()
     logger.debug("Game path cache built in %0.2f seconds", end_time - start_time)
@@ -166,52 +180,61 @@ def add_to_path_cache(game):
     if not path:
         logger.warning("No path for %s", game)
         return
-    current_cache = read_path_cache()
-    current_cache[game.id] = path
-    with open(GAME_PATH_CACHE_PATH, "w", encoding="utf-8") as cache_file:
-        json.dump(current_cache, cache_file, indent=2)
-    get_path_cache.cache_clear()
+    if get_path_cache().get(str(game.id)) != path:
+        game_paths_db.set_game_paths({game.id: path})
+        get_path_cache.cache_clear()
 
 
 def remove_from_path_cache(game):
     logger.debug("Removing %s from path cache", game)
-    current_cache = read_path_cache()
-    if game.id not in current_cache:
+    if str(game.id) not in get_path_cache():
         logger.warning("Game %s (id=%s) not in cache path", game, game.id)
         return
-    del current_cache[game.id]
-    with open(GAME_PATH_CACHE_PATH, "w", encoding="utf-8") as cache_file:
-        json.dump(current_cache, cache_file, indent=2)
+    game_paths_db.delete_game_path(game.id)
     get_path_cache.cache_clear()
 
 
 @cache_single
 def get_path_cache():
-    """Return the contents of the path cache file; this
+    """Return the paths of the games, by game ID as a string; this
     dict is cached, so do not modify it."""
-    return read_path_cache()
-
-
-def read_path_cache():
-    """Read the contents of the path cache file, and does not cache it."""
-    with open(GAME_PATH_CACHE_PATH, encoding="utf-8") as cache_file:
-        try:
-            return json.load(cache_file)
-        except json.JSONDecodeError:
-            return {}
+    return game_paths_db.get_game_paths()
+
+
+def check_paths(paths):
+    """Return which of the paths exist, checking in parallel those not checked in the
+    last PATH_CHECK_TTL seconds; a slow or sleeping drive then holds up only the
+    checks of the paths it holds."""
+    now = time.monotonic()
+    unchecked_paths = {
+        path for path in paths
+        if path not in _path_checks or now - _path_checks[path][1] > PATH_CHECK_TTL
+    }
+    if unchecked_paths:
+        with ThreadPoolExecutor(max_workers=PATH_CHECK_WORKERS, thread_name_prefix="path-check") as executor:
+            for path, exists in zip(unchecked_paths, executor.map(path_exists, unchecked_paths)):
+                _path_checks[path] = exists, time.monotonic()
+    return {path: _path_checks[path][0] for path in paths}
+
+
+def path_exists(path):
+    try:
+        os.stat(os.path.expanduser(path))
+    except (OSError, ValueError):
+        return False
+    return True
 
 
 def get_missing_game_ids():
     """Return a list of IDs for games that can't be found"""
     logger.debug("Checking for missing games")
-    missing_ids = []
-    for game_id, path in get_path_cache().items():
-        if not os.path.exists(path):
-            missing_ids.append(game_id)
-    return missing_ids
+    game_paths = get_path_cache()
+    path_checks = check_paths(set(game_paths.values()))
+    return [game_id for game_id, path in game_paths.items() if not path_checks[path]]
 
 
 def is_game_missing(game_id):
-    cache = get_path_cache()
-    path = cache.get(str(game_id))
-    return path and not os.path.exists(os.path.expanduser(path))
+    """Whether a game was missing when last checked by get_missing_game_ids();
+    this doesn't access the disk, so it is fast enough to call while drawing."""
+    path = get_path_cache().get(str(game_id))
+    return bool(path) and not _path_checks.get(path, (True, 0))[0]
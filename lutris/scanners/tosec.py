@@ -1,13 +1,19 @@
+import concurrent.futures
 import os
+from collections import defaultdict
+from xml.etree import ElementTree
 
 from lutris import settings
+from lutris.database import tosec as tosec_db
 from lutris.util import http
 from lutris.util.extract import extract_archive
+from lutris.util.hashing import hash_files
 from lutris.util.log import logger
-from lutris.util.system import get_md5_hash
 
 archive_formats = [".zip", ".7z", ".rar", ".gz"]
 save_formats = [".srm"]
+DAT_GAME_TAGS = ("game", "machine")
+MAX_LOOKUP_WORKERS = 8
 PLATFORM_PATTERNS = {
     "3DO": "3do",
     "Amiga CD32": "amiga-cd32",
@@ -61,10 +67,67 @@ PLATFORM_PATTERNS = {
 }
 
 
-def search_tosec_by_md5(md5sum):
+def parse_dat(dat_path):
+    """Yield the ROMs listed in a TOSEC or No-Intro (Logiqx XML) DAT file"""
+    category = ""
+    for _event, element in ElementTree.iterparse(dat_path):
+        if element.tag == "name" and not category:
+            # The header's name comes before any game
+            category = (element.text or "").strip()
+        elif element.tag in DAT_GAME_TAGS:
+            game = element.get("name") or element.findtext("description") or ""
+            for rom in element.iter("rom"):
+                yield {
+                    "category": category,
+                    "game": game,
+                    "name": rom.get("name"),
+                    "size": int(rom.get("size") or 0),
+                    "crc": (rom.get("crc") or "").lower(),
+                    "md5": (rom.get("md5") or "").lower(),
+                    "sha1": (rom.get("sha1") or "").lower(),
+                }
+            element.clear()
+
+
+def import_dat(dat_path):
+    """Add the ROMs of a DAT file to the offline index, replacing a previous
+    import of the same file. Returns the number of ROMs indexed."""
+    dat_path = os.path.abspath(dat_path)
+    try:
+        rom_count = tosec_db.replace_dat_roms(dat_path, parse_dat(dat_path))
+    except ElementTree.ParseError as ex:
+        raise ValueError("Invalid DAT file %s: %s" % (dat_path, ex)) from ex
+    logger.info("Indexed %s ROMs from %s", rom_count, dat_path)
+    return rom_count
+
+
+def search_offline_by_md5s(md5sums):
+    """Look up checksums in the offline DAT index.
+
+    Returns:
+        dict: The games containing each checksum found, in the format of the Lutris API
+    """
+    games = {}
+    for rom in tosec_db.get_rom_sets(md5sums):
+        key = (rom["dat"], rom["game"])
+        if key not in games:
+            games[key] = {"name": rom["game"], "category": {"name": rom["category"]}, "roms": []}
+        games[key]["roms"].append({
+            "name": rom["name"],
+            "size": rom["size"],
+            "crc": rom["crc"],
+            "md5": rom["md5"],
+            "sha1": rom["sha1"],
+        })
+    results = defaultdict(list)
+    for game in games.values():
+        for md5sum in {game_rom["md5"] for game_rom in game["roms"]}:
+            results[md5sum].append(game)
+    return {md5sum.lower(): results[md5sum.lower()] for md5sum in md5sums if md5sum and md5sum.lower() in results}
+
+
+def search_online_by_md5(md5sum):
     """Retrieve a lutris bundle from the API"""
-    if not md5sum:
-        return []
     url = settings.SITE_URL + "/api/tosec/games?md5=" + md5sum
     response = http.Request(url, headers={"Content-Type": "application/json"})
     try:
@@ -76,25 +139,104 @@ def search_tosec_by_md5(md5sum):
     return response_data["results"]
 
 
-def scan_folder(folder, extract_archives=False):
-    roms = {}
-    archives = []
-    saves = {}
-    checksums = {}
+def search_tosec_by_md5(md5sum):
+    """Return the games containing a ROM, from the offline index or the API"""
+    if not md5sum:
+        return []
+    return search_tosec_by_md5s([md5sum]).get(md5sum) or []
+
+
+def search_tosec_by_md5s(md5sums, offline=False, max_workers=MAX_LOOKUP_WORKERS):
+    """Look up several checksums at once. The offline index is queried first
+    and the remaining checksums are sent to the API concurrently, unless
+    `offline` is set.
+
+    Returns:
+        dict: The list of matching games for each checksum, None if the lookup failed
+    """
+    md5sums = [md5sum for md5sum in dict.fromkeys(md5sums) if md5sum]
+    offline_results = search_offline_by_md5s(md5sums)
+    results = {md5sum: offline_results.get(md5sum.lower(), []) for md5sum in md5sums}
+    missing = [md5sum for md5sum, games in results.items() if not games]
+    if offline or not missing:
+        return results
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for md5sum, games in zip(missing, executor.map(search_online_by_md5, missing)):
+            results[md5sum] = games
+    return results
+
+
+def get_rom_set_renames(rom_files, games_by_md5):
+    """Resolve the ROM sets found in a folder in one pass.
+
+    Returns:
+        list: (source, destination) file names for the sets completely present
+    """
+    checksums = {md5sum: filename for filename, md5sum in rom_files.items()}
+    renames = []
+    resolved_sets = set()
+    for filename, md5sum in rom_files.items():
+        games = games_by_md5.get(md5sum)
+        if not games:
+            logger.info("No result for %s", filename)
+            continue
+        if len(games) > 1:
+            logger.info("More than 1 match for %s", filename)
+            continue
+        game = games[0]
+        set_key = (game["category"]["name"], game["name"])
+        if set_key in resolved_sets:
+            continue
+        resolved_sets.add(set_key)
+        missing_roms = [game_rom["name"] for game_rom in game["roms"] if game_rom["md5"] not in checksums]
+        if missing_roms:
+            logger.info("Incomplete set %s, missing %s", game["name"], ", ".join(missing_roms))
+            continue
+        logger.info("Found: %s", game["name"])
+        renames += [
+            (checksums[game_rom["md5"]], game_rom["name"])
+            for game_rom in game["roms"]
+            if checksums[game_rom["md5"]] != game_rom["name"]
+        ]
+    return renames
+
+
+def extract_rom_archives(folder):
+    """Extract the archives of a folder, each to a folder named after it.
+
+    Returns:
+        list: The extracted files, relative to the folder
+    """
     archive_contents = []
-    if extract_archives:
-        for filename in os.listdir(folder):
-            basename, ext = os.path.splitext(filename)
-            if ext not in archive_formats:
-                continue
-            extract_archive(
-                os.path.join(folder, filename),
-                os.path.join(folder, basename),
-                merge_single=False
-            )
-            for archive_file in os.listdir(os.path.join(folder, basename)):
-                archive_contents.append("%s/%s" % (basename, archive_file))
+    for filename in os.listdir(folder):
+        basename, ext = os.path.splitext(filename)
+        if ext not in archive_formats:
+            continue
+        extract_archive(
+            os.path.join(folder, filename),
+            os.path.join(folder, basename),
+            merge_single=False
+        )
+        for archive_file in os.listdir(os.path.join(folder, basename)):
+            archive_contents.append("%s/%s" % (basename, archive_file))
+    return archive_contents
+
+
+def scan_folder(folder, extract_archives=False, dry_run=False, offline=False):
+    """Identify the ROMs of a folder and rename them after their TOSEC names,
+    along with their save files.
 
+    Params:
+        dry_run (bool): Only report the renames that would be done
+        offline (bool): Only use the offline DAT index
+
+    Returns:
+        list: The (source, destination) file names, relative to the folder
+    """
+    archives = []
+    saves = {}
+    archive_contents = extract_rom_archives(folder) if extract_archives else []
+    rom_files = []
     for filename in os.listdir(folder) + archive_contents:
         basename, ext = os.path.splitext(filename)
         if ext in archive_formats:
@@ -105,44 +247,36 @@ def scan_folder(folder, extract_archives=False):
             continue
         if os.path.isdir(os.path.join(folder, filename)):
             continue
+        rom_files.append(filename)
 
-        md5sum = get_md5_hash(os.path.join(folder, filename))
-        roms[filename] = search_tosec_by_md5(md5sum)
-        checksums[md5sum] = filename
+    hashes = hash_files([os.path.join(folder, filename) for filename in rom_files], ("md5", ))
+    rom_md5s = {
+        filename: hashes[os.path.join(folder, filename)]["md5"]
+        for filename in rom_files
+        if os.path.join(folder, filename) in hashes
+    }
+    games_by_md5 = search_tosec_by_md5s(rom_md5s.values(), offline=offline)
 
-    for rom, result in roms.items():
-        if not result:
-            print("no result for %s" % rom)
-            continue
-        if len(result) > 1:
-            print("More than 1 match for %s", rom)
-            continue
-        print("Found: %s" % result[0]["name"])
-        roms_matched = 0
-        renames = {}
-        for game_rom in result[0]["roms"]:
-            source_file = checksums[game_rom["md5"]]
-            dest_file = game_rom["name"]
-            renames[source_file] = dest_file
-            roms_matched += 1
-        if roms_matched == len(result[0]["roms"]):
-            for source, dest in renames.items():
-                base_name, _ext = os.path.splitext(source)
-                dest_base_name, _ext = os.path.splitext(dest)
-                if base_name in saves:
-                    save_file = saves[base_name]
-                    _base_name, ext = os.path.splitext(save_file)
-                    os.rename(
-                        os.path.join(folder, save_file),
-                        os.path.join(folder, dest_base_name + ext)
-                    )
-                try:
-                    os.rename(
-                        os.path.join(folder, source),
-                        os.path.join(folder, dest)
-                    )
-                except FileNotFoundError:
-                    logger.error("Failed to rename %s to %s", source, dest)
+    renames = []
+    for source, dest in get_rom_set_renames(rom_md5s, games_by_md5):
+        base_name, _ext = os.path.splitext(source)
+        dest_base_name, _ext = os.path.splitext(dest)
+        if base_name in saves:
+            save_file = saves[base_name]
+            _base_name, ext = os.path.splitext(save_file)
+            renames.append((save_file, dest_base_name + ext))
+        renames.append((source, dest))
+
+    for source, dest in renames:
+        logger.info("%s %s -> %s", "Would rename" if dry_run else "Renaming", source, dest)
+    if dry_run:
+        return renames
+    for source, dest in renames:
+        try:
+            os.rename(os.path.join(folder, source), os.path.join(folder, dest))
+        except FileNotFoundError:
+            logger.error("Failed to rename %s to %s", source, dest)
+    return renames
 
 
 def guess_platform(game):
@@ -20,7 +20,7 @@ from lutris.installer import AUTO_WIN32_EXE
 from lutris.installer.installer_file import InstallerFile
 from lutris.installer.installer_file_collection import InstallerFileCollection
 from lutris.services.base import OnlineService
-from lutris.services.service_game import ServiceGame
+from lutris.services.service_game import ServiceGame, save_service_games
 from lutris.services.service_media import ServiceMedia
 from lutris.util import system
 from lutris.util.amazon.sds_proto2 import CompressionAlgorithm, HashAlgorithm, Manifest, ManifestHeader
@@ -158,8 +158,7 @@ class AmazonService(OnlineService):
             logger.error("User not connected to Amazon")
             return
         games = [AmazonGame.new_from_amazon_game(game) for game in self.get_library()]
-        for game in games:
-            game.save()
+        save_service_games(games)
         return games
 
     def save_user_data(self, user_data):
@@ -534,15 +533,21 @@ class AmazonService(OnlineService):
         for __, package in enumerate(manifest.packages):
             for __, file in enumerate(package.files):
                 file_hash = file.hash.value.hex()
+                hash_algorithm = HashAlgorithm.get_name(file.hash.algorithm)
 
                 hashes.append(file_hash)
-                files.append({"path": file.path.decode().replace("\\", "/"), "size": file.size, "url": None})
+                files.append({
+                    "path": file.path.decode().replace("\\", "/"),
+                    "size": file.size,
+                    "url": None,
+                    "hash_algorithm": hash_algorithm,
+                })
 
                 hashpairs.append({
                     'sourceHash': None,
                     'targetHash': {
                         'value': file_hash,
-                        'algorithm': HashAlgorithm.get_name(file.hash.algorithm)
+                        'algorithm': hash_algorithm
                     }
                 })
             for __, directory in enumerate(package.dirs):
@@ -631,11 +636,16 @@ class AmazonService(OnlineService):
         files = []
         for file_hash, file in file_dict.items():
             file_name = os.path.basename(file["path"])
-            files.append(InstallerFile(installer.game_slug, file_hash, {
+            file_meta = {
                 "url": file["url"],
                 "filename": file_name,
                 "size": file["size"]
-            }))
+            }
+            # Files are checked as they are downloaded; SHAKE128 digests have no
+            # fixed length, those files are not checked.
+            if file.get("hash_algorithm") == "SHA256":
+                file_meta["checksum"] = "sha256:%s" % file_hash
+            files.append(InstallerFile(installer.game_slug, file_hash, file_meta))
         # return should be a list of files, so we return a list containing a InstallerFileCollection
         file_collection = InstallerFileCollection(installer.game_slug, "amazongame", files)
         return [file_collection], []
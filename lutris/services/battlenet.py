@@ -12,7 +12,7 @@ from lutris.database.services import ServiceGameCollection
 from lutris.game import Game
 from lutris.services.base import BaseService
 from lutris.services.lutris import sync_media
-from lutris.services.service_game import ServiceGame
+from lutris.services.service_game import ServiceGame, save_service_games
 from lutris.services.service_media import ServiceMedia
 from lutris.util.battlenet.definitions import ProductDbInfo
 from lutris.util.log import logger
@@ -108,8 +108,7 @@ class BattleNetService(BaseService):
 
     def load(self):
         games = [BattleNetGame.create(game) for game in GAME_IDS.values()]
-        for game in games:
-            game.save()
+        save_service_games(games)
         return games
 
     def add_installed_games(self):
@@ -8,7 +8,7 @@ from PIL import Image
 from lutris import settings
 from lutris.runners.dolphin import PLATFORMS
 from lutris.services.base import BaseService
-from lutris.services.service_game import ServiceGame
+from lutris.services.service_game import ServiceGame, save_service_games
 from lutris.services.service_media import ServiceMedia
 from lutris.util import system
 from lutris.util.dolphin.cache_reader import DOLPHIN_GAME_CACHE_FILE, DolphinCacheReader
@@ -39,8 +39,7 @@ class DolphinService(BaseService):
             return
         cache_reader = DolphinCacheReader()
         dolphin_games = [DolphinGame.new_from_cache(game) for game in cache_reader.get_games()]
-        for game in dolphin_games:
-            game.save()
+        save_service_games(dolphin_games)
         return dolphin_games
 
     def generate_installer(self, db_game):
@@ -18,7 +18,7 @@ from lutris.game import Game
 from lutris.installer import get_installers
 from lutris.services.base import OnlineService
 from lutris.services.lutris import sync_media
-from lutris.services.service_game import ServiceGame
+from lutris.services.service_game import ServiceGame, save_service_games
 from lutris.services.service_media import ServiceMedia
 from lutris.util.log import logger
 from lutris.util.strings import slugify
@@ -261,9 +261,8 @@ class EAAppService(OnlineService):
         logger.info("Retrieved %s games from EA library", len(games))
         ea_games = []
         for game in games:
-            ea_game = EAAppGame.new_from_api(game)
-            ea_game.save()
-            ea_games.append(ea_game)
+            ea_games.append(EAAppGame.new_from_api(game))
+        save_service_games(ea_games)
         return ea_games
 
     def get_library(self, user_id):
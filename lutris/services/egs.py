@@ -15,7 +15,7 @@ from lutris.gui.widgets.utils import Image, paste_overlay, thumbnail_image
 from lutris.installer import get_installers
 from lutris.services.base import AuthTokenExpiredError, OnlineService
 from lutris.services.lutris import sync_media
-from lutris.services.service_game import ServiceGame
+from lutris.services.service_game import ServiceGame, save_service_games
 from lutris.services.service_media import ServiceMedia
 from lutris.util import system
 from lutris.util.egs.egs_launcher import EGSLauncher
@@ -317,9 +317,8 @@ class EpicGamesStoreService(OnlineService):
             raise AuthTokenExpiredError("EGS Token expired") from ex
         egs_games = []
         for game in library:
-            egs_game = EGSGame.new_from_api(game)
-            egs_game.save()
-            egs_games.append(egs_game)
+            egs_games.append(EGSGame.new_from_api(game))
+        save_service_games(egs_games)
         return egs_games
 
     def install_from_egs(self, egs_game, manifest):
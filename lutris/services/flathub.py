@@ -11,7 +11,7 @@ from gi.repository import Gio
 from lutris import settings
 from lutris.exceptions import MissingExecutableError
 from lutris.services.base import BaseService
-from lutris.services.service_game import ServiceGame
+from lutris.services.service_game import ServiceGame, save_service_games
 from lutris.services.service_media import ServiceMedia
 from lutris.util import system
 from lutris.util.log import logger
@@ -98,8 +98,7 @@ class FlathubService(BaseService):
         flathub_games = []
         for game in entries:
             flathub_games.append(FlathubGame.new_from_flathub_game(game))
-        for game in flathub_games:
-            game.save()
+        save_service_games(flathub_games)
         return flathub_games
 
     def install(self, db_game):
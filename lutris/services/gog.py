@@ -15,7 +15,7 @@ from lutris.installer import AUTO_ELF_EXE, AUTO_WIN32_EXE
 from lutris.installer.installer_file import InstallerFile
 from lutris.installer.installer_file_collection import InstallerFileCollection
 from lutris.services.base import OnlineService
-from lutris.services.service_game import ServiceGame
+from lutris.services.service_game import ServiceGame, save_service_games
 from lutris.services.service_media import ServiceMedia
 from lutris.util import i18n, system
 from lutris.util.http import HTTPError, Request, UnauthorizedAccessError
@@ -135,8 +135,7 @@ class GOGService(OnlineService):
             logger.error("User not connected to GOG")
             return
         games = [GOGGame.new_from_gog_game(game) for game in self.get_library()]
-        for game in games:
-            game.save()
+        save_service_games(games)
         self.match_games()
         return games
 
@@ -1,5 +1,4 @@
 """Manage Humble Bundle libraries"""
-import concurrent.futures
 import json
 import os
 from gettext import gettext as _
@@ -12,9 +11,10 @@ from lutris.gui.dialogs import HumbleBundleCookiesDialog, QuestionDialog
 from lutris.installer import AUTO_ELF_EXE, AUTO_WIN32_EXE
 from lutris.installer.installer_file import InstallerFile
 from lutris.services.base import OnlineService
-from lutris.services.service_game import ServiceGame
+from lutris.services.service_game import ServiceGame, save_service_games
 from lutris.services.service_media import ServiceMedia
 from lutris.util import linux
+from lutris.util.download_scheduler import PRIORITY_SERVICE, get_scheduler
 from lutris.util.http import HTTPError, Request
 from lutris.util.log import logger
 
@@ -121,8 +121,7 @@ class HumbleBundleService(OnlineService):
                 continue
             humble_games.append(HumbleBundleGame.new_from_humble_game(game))
             seen.add(game["human_name"])
-        for game in humble_games:
-            game.save()
+        save_service_games(humble_games)
         return humble_games
 
     def make_api_request(self, url):
@@ -183,13 +182,13 @@ class HumbleBundleService(OnlineService):
         orders = []
         if not gamekeys:
             gamekeys = self.make_api_request(self.api_url + "api/v1/user/order")
-        with concurrent.futures.ThreadPoolExecutor(max_workers=8) as executor:
-            future_orders = [
-                executor.submit(self.get_order, gamekey["gamekey"])
-                for gamekey in gamekeys
-            ]
-            for order in future_orders:
-                orders.append(order.result())
+        scheduler = get_scheduler()
+        future_orders = [
+            scheduler.submit(self.get_order, gamekey["gamekey"], url=self.api_url, priority=PRIORITY_SERVICE)
+            for gamekey in gamekeys
+        ]
+        for order in future_orders:
+            orders.append(order.result())
         logger.info("Loaded %s Humble Bundle orders", len(orders))
         return orders
 
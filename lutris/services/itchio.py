@@ -12,7 +12,7 @@ from lutris.exceptions import UnavailableGameError
 from lutris.installer import AUTO_ELF_EXE, AUTO_WIN32_EXE
 from lutris.installer.installer_file import InstallerFile
 from lutris.services.base import OnlineService
-from lutris.services.service_game import ServiceGame
+from lutris.services.service_game import ServiceGame, save_service_games
 from lutris.services.service_media import ServiceMedia
 from lutris.util import linux
 from lutris.util.downloader import Downloader
@@ -149,10 +149,9 @@ class ItchIoService(OnlineService):
         for game in library:
             if game["title"] in seen:
                 continue
-            _game = ItchIoGame.new(game)
-            games.append(_game)
-            _game.save()
+            games.append(ItchIoGame.new(game))
             seen.add(game["title"])
+        save_service_games(games)
         return games
 
     def make_api_request(self, path, query=None):
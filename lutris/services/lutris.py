@@ -14,7 +14,7 @@ from lutris.game import Game
 from lutris.gui import dialogs
 from lutris.gui.views.media_loader import download_media
 from lutris.services.base import LutrisBanner, LutrisCoverart, LutrisCoverartMedium, LutrisIcon, OnlineService
-from lutris.services.service_game import ServiceGame
+from lutris.services.service_game import ServiceGame, save_service_games
 from lutris.util import http
 from lutris.util.log import logger
 
@@ -100,9 +100,7 @@ class LutrisService(OnlineService):
     def load(self):
         lutris_games = self.get_library()
         logger.debug("Loaded %s games from Lutris library", len(lutris_games))
-        for game in lutris_games:
-            lutris_game = LutrisGame.new_from_api(game)
-            lutris_game.save()
+        save_service_games([LutrisGame.new_from_api(game) for game in lutris_games])
         logger.debug("Matching with already installed games")
         self.match_games()
         logger.debug("Lutris games loaded")
@@ -19,7 +19,7 @@ from lutris.game import Game
 from lutris.installer import get_installers
 from lutris.services.base import OnlineService
 from lutris.services.lutris import sync_media
-from lutris.services.service_game import ServiceGame
+from lutris.services.service_game import ServiceGame, save_service_games
 from lutris.services.service_media import ServiceMedia
 from lutris.util.log import logger
 from lutris.util.strings import slugify
@@ -252,9 +252,8 @@ class OriginService(OnlineService):
         logger.info("Retrieved %s games from Origin library", len(games))
         origin_games = []
         for game in games:
-            origin_game = OriginGame.new_from_api(game)
-            origin_game.save()
-            origin_games.append(origin_game)
+            origin_games.append(OriginGame.new_from_api(game))
+        save_service_games(origin_games)
         return origin_games
 
     def get_library(self, user_id):
@@ -6,7 +6,7 @@ from gettext import gettext as _
 
 from lutris import settings
 from lutris.services.base import BaseService
-from lutris.services.service_game import ServiceGame
+from lutris.services.service_game import ServiceGame, save_service_games
 from lutris.services.service_media import ServiceMedia
 from lutris.util import system
 from lutris.util.strings import slugify
@@ -41,6 +41,7 @@ class ScummvmService(BaseService):
         config.read(SCUMMVM_CONFIG_FILE)
         config_sections = config.sections()
 
+        scummvm_games = []
         for section in config_sections:
             if section == "scummvm":
                 continue
@@ -53,7 +54,8 @@ class ScummvmService(BaseService):
             game.details = json.dumps({
                 "path": config[section]["path"]
             })
-            game.save()
+            scummvm_games.append(game)
+        save_service_games(scummvm_games)
 
     def generate_installer(self, db_game):
         details = json.loads(db_game["details"])
@@ -1,7 +1,6 @@
 """Service game module"""
 from lutris import settings
 from lutris.database import sql
-from lutris.database.services import ServiceGameCollection
 from lutris.services.service_media import ServiceMedia
 
 PGA_DB = settings.PGA_DB
@@ -25,9 +24,9 @@ class ServiceGame:
         self.icon = None  # Game icon
         self.details = None  # Additional details for the game
 
-    def save(self):
-        """Save this game to database"""
-        game_data = {
+    def get_db_fields(self):
+        """Return the fields stored in the service_games table"""
+        return {
             "service": self.service,
             "appid": self.appid,
             "name": self.name,
@@ -37,8 +36,18 @@ class ServiceGame:
             "logo": self.logo,
             "details": str(self.details),
         }
-        existing_game = ServiceGameCollection.get_game(self.service, self.appid)
-        if existing_game:
-            sql.db_update(PGA_DB, "service_games", game_data, {"id": existing_game["id"]})
-        else:
-            sql.db_insert(PGA_DB, "service_games", game_data)
+
+    def save(self):
+        """Save this game to database"""
+        save_service_games([self])
+
+
+def save_service_games(service_games):
+    """Save a list of service games to the database in a single transaction,
+    updating the games already stored for the same service and appid."""
+    sql.db_upsert_many(
+        PGA_DB,
+        "service_games",
+        [service_game.get_db_fields() for service_game in service_games],
+        conflict_fields=("service", "appid"),
+    )
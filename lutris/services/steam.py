@@ -14,7 +14,7 @@ from lutris.game import Game
 from lutris.installer.installer_file import InstallerFile
 from lutris.services.base import BaseService
 from lutris.services.lutris import sync_media
-from lutris.services.service_game import ServiceGame
+from lutris.services.service_game import ServiceGame, save_service_games
 from lutris.services.service_media import ServiceMedia
 from lutris.util.log import logger
 from lutris.util.steam.appmanifest import AppManifest, get_appmanifests
@@ -99,11 +99,11 @@ class SteamService(BaseService):
         steam_games = get_steam_library(steamid)
         if not steam_games:
             raise RuntimeError(_("Failed to load games. Check that your profile is set to public during the sync."))
-        for steam_game in steam_games:
-            if steam_game["appid"] in self.excluded_appids:
-                continue
-            game = self.game_class.new_from_steam_game(steam_game)
-            game.save()
+        save_service_games([
+            self.game_class.new_from_steam_game(steam_game)
+            for steam_game in steam_games
+            if steam_game["appid"] not in self.excluded_appids
+        ])
         self.match_games()
         return steam_games
 
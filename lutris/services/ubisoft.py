@@ -15,7 +15,7 @@ from lutris.game import Game
 from lutris.installer import get_installers
 from lutris.services.base import OnlineService
 from lutris.services.lutris import sync_media
-from lutris.services.service_game import ServiceGame
+from lutris.services.service_game import ServiceGame, save_service_games
 from lutris.services.service_media import ServiceMedia
 from lutris.util.log import logger
 from lutris.util.strings import slugify
@@ -156,15 +156,12 @@ class UbisoftConnectService(OnlineService):
                             is_pc = True
                 if not is_pc:
                     continue
-            ubi_game = UbisoftGame.new_from_api(game)
-            ubi_game.save()
-            ubi_games.append(ubi_game)
+            ubi_games.append(UbisoftGame.new_from_api(game))
         configuration_data = self.get_configurations()
         config_parser = UbisoftParser()
         for game in config_parser.parse_games(configuration_data):
-            ubi_game = UbisoftGame.new_from_api(game)
-            ubi_game.save()
-            ubi_games.append(ubi_game)
+            ubi_games.append(UbisoftGame.new_from_api(game))
+        save_service_games(ubi_games)
         return ubi_games
 
     def store_credentials(self, credentials):
@@ -11,7 +11,7 @@ from gi.repository import Gio
 from lutris import settings
 from lutris.database.games import get_games_where
 from lutris.services.base import BaseService
-from lutris.services.service_game import ServiceGame
+from lutris.services.service_game import ServiceGame, save_service_games
 from lutris.services.service_media import ServiceMedia
 from lutris.util import system
 from lutris.util.log import logger
@@ -102,8 +102,7 @@ class XDGService(BaseService):
     def load(self):
         """Return the list of games stored in the XDG menu."""
         xdg_games = [XDGGame.new_from_xdg_app(app) for app in self.iter_xdg_games()]
-        for game in xdg_games:
-            game.save()
+        save_service_games(xdg_games)
         return xdg_games
 
     def generate_installer(self, db_game):
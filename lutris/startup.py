@@ -1,5 +1,6 @@
 """Check to run at program start"""
 import sqlite3
+from concurrent.futures import ThreadPoolExecutor
 from gettext import gettext as _
 
 import gi
@@ -20,6 +21,7 @@ from lutris.util.display import display_gpu_info, get_gpus_info
 from lutris.util.graphics import drivers, vkquery
 from lutris.util.linux import LINUX_SYSTEM
 from lutris.util.log import logger
+from lutris.util.profiling import phase
 from lutris.util.system import create_folder, load_vulkan_gpu_names
 from lutris.util.wine.dxvk import REQUIRED_VULKAN_API_VERSION
 
@@ -135,18 +137,48 @@ def fill_missing_platforms():
             game.save_platform()
 
 
+def run_system_checks() -> None:
+    """Probe the system and report on its capabilities; the probes run
+    concurrently and their results are cached until the system changes, so
+    this can be called from a worker thread without holding up the UI."""
+    with ThreadPoolExecutor(thread_name_prefix="startup-check") as executor:
+        gpus_future = executor.submit(run_check, "get_gpus_info", get_gpus_info)
+        check_futures = [
+            executor.submit(run_check, name, check)
+            for name, check in (
+                ("get_drivers", get_drivers),  # drivers dict is not used, but may log information
+                ("check_libs", check_libs),
+                ("check_vulkan", check_vulkan),
+                ("check_gnome", check_gnome),
+            )
+        ]
+        gpus_info = gpus_future.result()
+        for gpu_id, gpu_info in gpus_info.items():
+            display_gpu_info(gpu_id, gpu_info)
+        for future in check_futures:
+            future.result()
+    with phase("load_vulkan_gpu_names"):
+        load_vulkan_gpu_names(len(gpus_info) > 1)
+
+
+def run_library_checks() -> None:
+    """Fix up the games library; this must run on the main thread since
+    updated games emit signals the UI is connected to."""
+    with phase("fill_missing_platforms"):
+        fill_missing_platforms()
+    with phase("build_path_cache"):
+        build_path_cache()
+
+
+def run_check(name, check):
+    with phase(name):
+        return check()
+
+
 def run_all_checks() -> None:
     """Run all startup checks"""
-    get_drivers()  # drivers dict is not used, but may log information
-    gpus_info = get_gpus_info()
-    for gpu_id, gpu_info in gpus_info.items():
-        display_gpu_info(gpu_id, gpu_info)
-    check_libs()
-    check_vulkan()
-    check_gnome()
-    load_vulkan_gpu_names(len(gpus_info) > 1)
-    fill_missing_platforms()
-    build_path_cache()
+    run_system_checks()
+    run_library_checks()
 
 
 def init_lutris():
@@ -154,7 +186,8 @@ def init_lutris():
     runners.inject_runners(load_json_runners())
     init_dirs()
     try:
-        syncdb()
+        with phase("syncdb"):
+            syncdb()
     except sqlite3.DatabaseError as err:
         raise RuntimeError(
             _("Failed to open database file in %s. Try renaming this file and relaunch Lutris") %
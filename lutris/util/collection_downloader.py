@@ -0,0 +1,216 @@
+"""Parallel download of a collection of files
+
+Some installers, Amazon games in particular, are made of thousands of small
+files. Downloading them one after the other leaves the connection idle while
+each request is sent and each file is written. The collection downloader runs
+several downloads at once, each through the download scheduler, which keeps
+the number of connections per host bounded, and the shared requests session,
+which keeps them alive from one file to the next. A file that fails is retried
+with an increasing delay before the whole collection is failed.
+"""
+import threading
+import time
+from collections import deque
+
+from lutris.settings import read_setting
+from lutris.util.download_scheduler import MAX_CONNECTIONS_PER_HOST
+from lutris.util.downloader import Downloader
+from lutris.util.log import logger
+
+# Same reason as Downloader
+get_time = time.monotonic
+
+MAX_RETRIES = 3
+RETRY_DELAY = 1  # Seconds, doubled on each retry of a file
+
+
+def get_default_workers():
+    """Return the number of files downloaded at once, from the collection_download_workers setting"""
+    try:
+        return int(read_setting("collection_download_workers") or MAX_CONNECTIONS_PER_HOST)
+    except ValueError:
+        logger.warning("Invalid collection_download_workers setting, using %s workers", MAX_CONNECTIONS_PER_HOST)
+        return MAX_CONNECTIONS_PER_HOST
+
+
+def format_time_left(seconds):
+    minutes, seconds = divmod(seconds, 60)
+    hours, minutes = divmod(minutes, 60)
+    return "%d:%02d:%02d" % (hours, minutes, seconds)
+
+
+class CollectionDownloader:
+    """Non-blocking downloader of several files.
+
+    The files are objects with url, dest_file, referer, size and checksum
+    attributes, like InstallerFile. Do start() then check_progress() at
+    regular intervals, until the state is no longer DOWNLOADING. After an error
+    or a cancellation, start() downloads the files that are not complete yet.
+    """
+
+    (
+        INIT,
+        DOWNLOADING,
+        CANCELLED,
+        ERROR,
+        COMPLETED
+    ) = list(range(5))
+
+    def __init__(self, files, workers=None, full_size=0, max_retries=MAX_RETRIES, retry_delay=RETRY_DELAY):
+        self.files = list(files)
+        self.workers = max(workers or get_default_workers(), 1)
+        self.full_size = full_size or sum(file.size or 0 for file in self.files)
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.state = self.INIT
+        self.error = None
+        self.num_files_downloaded = 0
+        self.num_retries = 0
+        self.completed_size = 0  # Bytes of the completed files
+
+        # Read these after a check_progress()
+        self.progress_fraction = 0
+        self.average_speed = 0
+        self.time_left = "???"
+        self.last_size = 0
+        self.last_speeds = []
+        self.speed_check_time = 0
+
+        self._completed = set()  # Indexes of the files downloaded
+        self._queue = deque()
+        self._active = {}  # Index to the downloader of the files being downloaded
+        self._running_workers = 0
+        self._lock = threading.Lock()
+        self._stop_request = threading.Event()
+        self._done = threading.Event()
+
+    def __repr__(self):
+        return "downloader for %s files" % len(self.files)
+
+    @property
+    def downloaded_size(self):
+        with self._lock:
+            return self.completed_size + sum(downloader.downloaded_size for downloader in self._active.values())
+
+    @property
+    def current_files(self):
+        """The files being downloaded"""
+        with self._lock:
+            return [self.files[index] for index in sorted(self._active)]
+
+    def start(self):
+        """Start downloading the files not downloaded yet"""
+        with self._lock:
+            if self.state == self.DOWNLOADING:
+                return
+            self.state = self.DOWNLOADING
+            self.error = None
+            self._stop_request = threading.Event()
+            self._done = threading.Event()
+            self._queue = deque(index for index in range(len(self.files)) if index not in self._completed)
+            self.last_size = self.completed_size
+            self.speed_check_time = get_time()
+            self._running_workers = min(self.workers, len(self._queue))
+            if not self._running_workers:
+                self._finish(self.COMPLETED)
+                return
+            for _i in range(self._running_workers):
+                threading.Thread(target=self._work, name="collection-download", daemon=True).start()
+
+    def cancel(self):
+        """Stop the downloads; the files being downloaded are resumed on the next start, if possible"""
+        logger.debug("❌ %s", self)
+        with self._lock:
+            if self.state == self.DOWNLOADING:
+                self._finish(self.CANCELLED)
+
+    def join(self):
+        """Block until the downloads are over; return True if all the files were
+        downloaded, False if cancelled, and raise the error of a failed file."""
+        self._done.wait()
+        if self.error:
+            raise self.error
+        return self.state == self.COMPLETED
+
+    def _finish(self, state, error=None):
+        """Stop downloading, with the lock held"""
+        self.state = state
+        self.error = error
+        self._stop_request.set()
+        for downloader in self._active.values():
+            downloader.cancel()
+        self._done.set()
+
+    def _work(self):
+        stop_request = self._stop_request
+        while not stop_request.is_set():
+            with self._lock:
+                if not self._queue:
+                    break
+                index = self._queue.popleft()
+            self._download_file(index, stop_request)
+        with self._lock:
+            if stop_request is not self._stop_request:
+                return  # Cancelled, and started again since
+            self._running_workers -= 1
+            if not self._running_workers and self.state == self.DOWNLOADING:
+                self._finish(self.COMPLETED)
+
+    def _download_file(self, index, stop_request):
+        """Download a file, retrying it on errors"""
+        file = self.files[index]
+        for attempt in range(self.max_retries + 1):
+            downloader = Downloader(
+                file.url, file.dest_file, referer=file.referer, overwrite=True, checksum=file.checksum
+            )
+            with self._lock:
+                if stop_request.is_set():
+                    return
+                self._active[index] = downloader
+                downloader.start()
+            error = None
+            try:
+                completed = downloader.join()
+            except Exception as ex:  # pylint: disable=broad-except
+                completed = False
+                error = ex
+            with self._lock:
+                if self._active.get(index) is downloader:
+                    del self._active[index]
+                if completed:
+                    self._completed.add(index)
+                    self.completed_size += downloader.downloaded_size
+                    self.num_files_downloaded += 1
+                    return
+                if stop_request.is_set() or not error:
+                    return  # Cancelled
+                if attempt == self.max_retries:
+                    logger.error("Failed to download %s: %s", file.url, error)
+                    if self.state == self.DOWNLOADING:
+                        self._finish(self.ERROR, error)
+                    return
+                self.num_retries += 1
+            delay = self.retry_delay * 2 ** attempt
+            logger.warning("Retrying download of %s in %ss: %s", file.url, delay, error)
+            stop_request.wait(delay)
+
+    def check_progress(self):
+        """Update the average speed and time left; return the progress, between 0.0 and 1.0"""
+        downloaded_size = self.downloaded_size
+        if self.full_size:
+            self.progress_fraction = min(downloaded_size / self.full_size, 1)
+        elapsed_time = get_time() - self.speed_check_time
+        if elapsed_time < 1:  # Minimum delay
+            return self.progress_fraction
+        self.last_speeds.append((downloaded_size - self.last_size) / elapsed_time)
+        # Last 20 speeds
+        while len(self.last_speeds) > 20:
+            self.last_speeds.pop(0)
+        self.average_speed = sum(self.last_speeds) / len(self.last_speeds)
+        self.last_size = downloaded_size
+        self.speed_check_time = get_time()
+        if self.average_speed and self.full_size:
+            self.time_left = format_time_left(max(self.full_size - downloaded_size, 0) / self.average_speed)
+        else:
+            self.time_left = "???"
+        return self.progress_fraction
@@ -0,0 +1,167 @@
+"""Index of the disk size of directories
+
+Game folders and Wine prefixes can hold hundreds of thousands of files, and
+sizing them means a stat call for each one. The index keeps, for each folder,
+the total size of the files directly in it and the names of its subfolders,
+along with the modification time of the folder. Adding, removing or renaming
+a file updates that time: a folder whose time hasn't changed is not listed
+again, so sizing an indexed tree only takes a stat call per folder. Files
+modified in place don't change the time of their folder, their new size is
+picked up when something else in the folder changes.
+"""
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from lutris import settings
+from lutris.util.log import logger
+
+DISK_SIZE_INDEX_PATH = os.path.join(settings.CACHE_DIR, "disk-sizes.json")
+MAX_WORKERS = 4
+# Folders modified this recently may still change within their timestamp's
+# granularity, they are not indexed.
+MIN_INDEXED_AGE = 2
+
+
+def scan_directory(path):
+    """List a folder, returning the size of the files in it and the names of its
+    subfolders; symbolic links to folders aren't followed."""
+    files_size = 0
+    subdirectories = []
+    with os.scandir(path) as entries:
+        for entry in entries:
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    subdirectories.append(entry.name)
+                elif entry.is_file():
+                    files_size += entry.stat().st_size
+            except OSError:
+                continue  # Removed during the scan, or a broken link
+    return files_size, subdirectories
+
+
+class DiskSizeIndex:
+    """Persistent map of folders to the size of their files, stored as JSON in the cache dir"""
+
+    def __init__(self, path=DISK_SIZE_INDEX_PATH):
+        self.path = path
+        self._entries = None
+        self._dirty = False
+        self._lock = threading.RLock()
+
+    @property
+    def entries(self):
+        with self._lock:
+            if self._entries is None:
+                self._entries = self._load()
+            return self._entries
+
+    def load(self):
+        """Read the index file, if not done yet"""
+        return self.entries
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, encoding="utf-8") as index_file:
+                return json.load(index_file)
+        except (OSError, ValueError) as ex:
+            logger.warning("Unable to read disk size index %s: %s", self.path, ex)
+            return {}
+
+    def save(self):
+        with self._lock:
+            if not self._dirty:
+                return
+            temp_path = self.path + ".tmp"
+            try:
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                with open(temp_path, "w", encoding="utf-8") as index_file:
+                    json.dump(self.entries, index_file)
+                os.replace(temp_path, self.path)
+            except OSError as ex:
+                logger.warning("Unable to write disk size index %s: %s", self.path, ex)
+                return
+            self._dirty = False
+
+    def forget(self, path):
+        """Remove a folder and its subfolders from the index"""
+        with self._lock:
+            prefix = path.rstrip("/") + "/"
+            for indexed_path in [p for p in self.entries if p == path or p.startswith(prefix)]:
+                del self.entries[indexed_path]
+                self._dirty = True
+
+    def get_cached_size(self, path):
+        """Return the size of a folder as of its last indexing, without accessing
+        the disk, or None if it isn't fully indexed."""
+        total_size = 0
+        directories = [os.path.abspath(path)]
+        with self._lock:
+            while directories:
+                directory = directories.pop()
+                entry = self.entries.get(directory)
+                if not entry:
+                    return None
+                total_size += entry["size"]
+                directories.extend(os.path.join(directory, name) for name in entry["dirs"])
+        return total_size
+
+    def _get_entry(self, directory):
+        """Return the index entry of a folder, listing it again if it has changed"""
+        try:
+            mtime = os.stat(directory).st_mtime_ns
+        except OSError:
+            self.forget(directory)
+            return None
+        with self._lock:
+            entry = self.entries.get(directory)
+        if entry and entry["mtime"] == mtime:
+            return entry
+        try:
+            files_size, subdirectories = scan_directory(directory)
+        except OSError as ex:
+            logger.debug("Unable to list %s: %s", directory, ex)
+            return None
+        entry = {"mtime": mtime, "size": files_size, "dirs": subdirectories}
+        with self._lock:
+            previous_entry = self.entries.get(directory)
+            if previous_entry:
+                for name in set(previous_entry["dirs"]) - set(subdirectories):
+                    self.forget(os.path.join(directory, name))
+            if time.time() - mtime / 1e9 > MIN_INDEXED_AGE:
+                self.entries[directory] = entry
+            else:
+                self.entries.pop(directory, None)
+            self._dirty = True
+        return entry
+
+    def _get_tree_size(self, path):
+        total_size = 0
+        directories = [path]
+        while directories:
+            directory = directories.pop()
+            entry = self._get_entry(directory)
+            if entry:
+                total_size += entry["size"]
+                directories.extend(os.path.join(directory, name) for name in entry["dirs"])
+        return total_size
+
+    def get_size(self, path):
+        """Return the size in bytes of the files in a folder, updating the index;
+        the subfolders are sized in parallel."""
+        path = os.path.abspath(path)
+        entry = self._get_entry(path)
+        if not entry:
+            return 0
+        subdirectories = [os.path.join(path, name) for name in entry["dirs"]]
+        with ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="disk-size") as executor:
+            total_size = entry["size"] + sum(executor.map(self._get_tree_size, subdirectories))
+        self.save()
+        return total_size
+
+
+DISK_SIZE_INDEX = DiskSizeIndex()
@@ -31,6 +31,7 @@ from lutris.util.graphics import drivers
 from lutris.util.graphics.displayconfig import MutterDisplayManager
 from lutris.util.graphics.xrandr import LegacyDisplayManager, change_resolution, get_outputs
 from lutris.util.log import logger
+from lutris.util.probe_cache import cached_probe
 from lutris.exceptions import MissingExecutableError
 
 
@@ -86,6 +87,11 @@ def _get_graphics_adapters():
     Returns:
         list: list of tuples containing PCI ID and description of the display controller
     """
+    return [tuple(adapter) for adapter in _probe_graphics_adapters()]
+
+
+@cached_probe("graphics_adapters")
+def _probe_graphics_adapters():
     try:
         lspci_path = system.find_executable("lspci")
     except MissingExecutableError:
@@ -0,0 +1,220 @@
+"""Central scheduling of the downloads made by Lutris
+
+Installers, runtime components, service data and media all submit their
+downloads here, so that the total number of connections, and the number of
+connections to each host, stay bounded. Jobs are run by priority class, and
+jobs of the same class are served round-robin across hosts so that a long
+list of cover art from one CDN doesn't hold back another service.
+
+A job is any function doing network I/O; it must not wait on other scheduled
+jobs, as it could then wait on itself for a free connection.
+"""
+import concurrent.futures
+import threading
+from collections import Counter, OrderedDict, deque
+from urllib.parse import urlparse
+
+from lutris.settings import read_setting
+from lutris.util.jobs import schedule_at_idle
+from lutris.util.log import logger
+
+PRIORITY_INSTALLER = 0
+PRIORITY_RUNTIME = 1
+PRIORITY_SERVICE = 2
+PRIORITY_MEDIA = 3
+PRIORITIES = (PRIORITY_INSTALLER, PRIORITY_RUNTIME, PRIORITY_SERVICE, PRIORITY_MEDIA)
+# Installers and runtime updates show their own progress, these jobs don't
+BACKGROUND_PRIORITIES = (PRIORITY_SERVICE, PRIORITY_MEDIA)
+
+MAX_CONNECTIONS = int(read_setting("max_download_connections") or 8)
+MAX_CONNECTIONS_PER_HOST = int(read_setting("max_host_connections") or 4)
+# Seconds an idle worker thread waits for a new job before exiting
+WORKER_IDLE_TIMEOUT = 30
+
+
+def get_host(url):
+    """Return the host name jobs on `url` are counted against"""
+    if not url:
+        return ""
+    return urlparse(url).hostname or ""
+
+
+class DownloadJob:
+    """A function scheduled for execution, and its future"""
+
+    def __init__(self, function, args, kwargs, host, priority, tracker=None):
+        self.function = function
+        self.args = args
+        self.kwargs = kwargs
+        self.host = host
+        self.priority = priority
+        self.tracker = tracker  # Object with downloaded_size and full_size attributes, if any
+        self.future = concurrent.futures.Future()
+        self.result = None
+        self.error = None
+
+    def run(self):
+        """Run the function, return False if the job was cancelled instead.
+        The future is only resolved by finish()."""
+        if not self.future.set_running_or_notify_cancel():
+            return False
+        try:
+            self.result = self.function(*self.args, **self.kwargs)
+        except BaseException as ex:  # pylint: disable=broad-except
+            self.error = ex
+        return True
+
+    def finish(self):
+        if self.error:
+            self.future.set_exception(self.error)
+        else:
+            self.future.set_result(self.result)
+
+
+class DownloadScheduler:
+    """Runs download jobs on a bounded, on-demand pool of worker threads"""
+
+    def __init__(self, max_connections=MAX_CONNECTIONS, max_connections_per_host=MAX_CONNECTIONS_PER_HOST):
+        self.max_connections = max_connections
+        self.max_connections_per_host = max_connections_per_host
+        self._condition = threading.Condition()
+        # For each priority, the queued jobs of each host; hosts are moved
+        # to the end once served.
+        self._queues = {priority: OrderedDict() for priority in PRIORITIES}
+        self._host_connections = Counter()
+        self._active_jobs = set()
+        self._worker_count = 0
+        self._idle_workers = 0
+        self._listeners = []  # Callbacks, with the priorities they watch
+        self.completed_count = 0
+        self.failed_count = 0
+
+    def submit(self, function, *args, url=None, priority=PRIORITY_MEDIA, tracker=None, **kwargs):
+        """Schedule `function(*args, **kwargs)`, which downloads from `url`.
+
+        Returns:
+            Future: The future of the job's result
+        """
+        if priority not in self._queues:
+            raise ValueError("Invalid download priority %s" % priority)
+        job = DownloadJob(function, args, kwargs, get_host(url), priority, tracker)
+        with self._condition:
+            listeners = [
+                callback for callback, priorities in self._listeners
+                if priority in priorities and self.is_idle(priorities)
+            ]
+            self._queues[priority].setdefault(job.host, deque()).append(job)
+            if not self._idle_workers and self._worker_count < self.max_connections:
+                self._worker_count += 1
+                threading.Thread(target=self._work, name="download-worker", daemon=True).start()
+            self._condition.notify()
+        for listener in listeners:
+            schedule_at_idle(listener)
+        return job.future
+
+    def map(self, function, items, url=None, priority=PRIORITY_MEDIA):
+        """Run `function` on each item, wait for all of them and return their
+        futures. `url` is a function returning the URL an item is fetched from."""
+        futures = [
+            self.submit(function, item, url=url(item) if url else None, priority=priority)
+            for item in items
+        ]
+        concurrent.futures.wait(futures)
+        return futures
+
+    def add_listener(self, callback, priorities=PRIORITIES):
+        """Call `callback` on the main thread whenever a job of one of `priorities`
+        is submitted while none of them were queued or running"""
+        with self._condition:
+            self._listeners.append((callback, priorities))
+
+    def remove_listener(self, callback):
+        with self._condition:
+            self._listeners = [listener for listener in self._listeners if listener[0] != callback]
+
+    def is_idle(self, priorities=PRIORITIES):
+        """Return whether no job of `priorities` is queued or running"""
+        with self._condition:
+            return (
+                not any(job.priority in priorities for job in self._active_jobs)
+                and not any(self._queues[priority] for priority in priorities)
+            )
+
+    def _pop_job(self):
+        """Return the next job that can run without exceeding the host limits"""
+        for queue in self._queues.values():
+            for host, jobs in queue.items():
+                if host and self._host_connections[host] >= self.max_connections_per_host:
+                    continue
+                job = jobs.popleft()
+                del queue[host]
+                if jobs:
+                    queue[host] = jobs
+                return job
+        return None
+
+    def _work(self):
+        while True:
+            with self._condition:
+                job = self._pop_job()
+                while not job:
+                    self._idle_workers += 1
+                    woken = self._condition.wait(WORKER_IDLE_TIMEOUT)
+                    self._idle_workers -= 1
+                    job = self._pop_job()
+                    if not job and not woken:
+                        self._worker_count -= 1
+                        return
+                self._host_connections[job.host] += 1
+                self._active_jobs.add(job)
+            has_run = job.run()
+            with self._condition:
+                self._host_connections[job.host] -= 1
+                self._active_jobs.discard(job)
+                if job.error:
+                    self.failed_count += 1
+                    logger.debug("Download job %s failed: %s", job.function, job.error)
+                elif has_run:
+                    self.completed_count += 1
+                # A slot for this job's host is free, jobs waiting on it may run
+                self._condition.notify_all()
+            if has_run:
+                job.finish()
+
+    def get_stats(self, priorities=PRIORITIES):
+        """Return the statistics of the scheduled downloads.
+
+        Returns:
+            dict: Number of active and queued jobs of `priorities`, queued jobs
+            by priority, bytes downloaded by and expected from the active jobs
+            that report them, and number of completed and failed jobs of any priority.
+        """
+        with self._condition:
+            queued_by_priority = {
+                priority: sum(len(jobs) for jobs in self._queues[priority].values())
+                for priority in priorities
+            }
+            active_jobs = [job for job in self._active_jobs if job.priority in priorities]
+            trackers = [job.tracker for job in active_jobs if job.tracker]
+            return {
+                "active": len(active_jobs),
+                "queued": sum(queued_by_priority.values()),
+                "queued_by_priority": queued_by_priority,
+                "completed": self.completed_count,
+                "failed": self.failed_count,
+                "downloaded_size": sum(tracker.downloaded_size for tracker in trackers),
+                "full_size": sum(tracker.full_size for tracker in trackers),
+            }
+
+
+_SCHEDULER = None
+_SCHEDULER_LOCK = threading.Lock()
+
+
+def get_scheduler():
+    """Return the scheduler shared by every download"""
+    global _SCHEDULER
+    with _SCHEDULER_LOCK:
+        if not _SCHEDULER:
+            _SCHEDULER = DownloadScheduler()
+        return _SCHEDULER
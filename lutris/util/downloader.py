@@ -1,11 +1,15 @@
+import json
 import os
 import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 
 import requests
 
 from lutris import __version__
-from lutris.util import jobs
+from lutris.settings import read_setting
+from lutris.util import hashing
+from lutris.util.download_scheduler import PRIORITY_INSTALLER, get_scheduler
 from lutris.util.log import logger
 
 # `time.time` can skip ahead or even go backwards if the current
@@ -14,6 +18,98 @@ from lutris.util.log import logger
 # download speeds.
 get_time = time.monotonic
 
+CHUNK_SIZE = 1024 * 1024
+# Files are only split in segments if each segment gets at least this size
+MIN_SEGMENT_SIZE = 16 * 1024 * 1024
+# The resume state is written each time this many bytes have been downloaded
+STATE_SAVE_INTERVAL = 16 * CHUNK_SIZE
+# Smaller files are downloaded again from scratch rather than resumed, this
+# spares writing and removing a state file for each of them.
+MIN_RESUMABLE_SIZE = CHUNK_SIZE
+DEFAULT_SEGMENTS = int(read_setting("download_segments") or 1)
+# Bandwidth limit in bytes per second, the setting is in KiB/s; 0 is unlimited
+DEFAULT_RATE_LIMIT = int(read_setting("download_rate_limit") or 0) * 1024
+
+_SESSION = None
+_SESSION_LOCK = threading.Lock()
+
+
+def get_session():
+    """Return the requests session shared by downloads, so that connections
+    to the same hosts are kept alive and reused."""
+    global _SESSION
+    with _SESSION_LOCK:
+        if not _SESSION:
+            _SESSION = requests.Session()
+            adapter = requests.adapters.HTTPAdapter(pool_connections=16, pool_maxsize=16)
+            _SESSION.mount("http://", adapter)
+            _SESSION.mount("https://", adapter)
+        return _SESSION
+
+
+def parse_content_range(content_range):
+    """Return the first byte and the total size from a Content-Range header,
+    the size is 0 if the server doesn't know it."""
+    try:
+        unit, byte_range = content_range.split(" ", 1)
+        first_last, total = byte_range.split("/", 1)
+        if unit != "bytes":
+            raise ValueError(unit)
+        return int(first_last.split("-", 1)[0]), 0 if total == "*" else int(total)
+    except (AttributeError, ValueError) as ex:
+        raise DownloadError("Invalid Content-Range header: %s" % content_range) from ex
+
+
+def get_validator(etag, last_modified):
+    """Return the value to send in an If-Range header, weak ETags can't be used"""
+    if etag and not etag.startswith("W/"):
+        return etag
+    return last_modified
+
+
+def split_segments(full_size, segment_count):
+    """Split `full_size` bytes in segments of [first byte, last byte, position]"""
+    segment_count = max(1, min(segment_count, full_size // MIN_SEGMENT_SIZE))
+    segment_size = full_size // segment_count
+    segments = []
+    for index in range(segment_count):
+        first = index * segment_size
+        last = full_size - 1 if index == segment_count - 1 else first + segment_size - 1
+        segments.append([first, last, first])
+    return segments
+
+
+def get_pending_segments(segments):
+    """Return the segments not downloaded completely"""
+    return [segment for segment in segments if segment[1] is None or segment[2] <= segment[1]]
+
+
+class DownloadError(Exception):
+    """Raised when a download can't be completed"""
+
+
+class RateLimiter:
+    """Limit the throughput of one or more download streams"""
+
+    def __init__(self, rate):
+        self.rate = rate  # Bytes per second
+        self.next_time = 0.0
+        self.lock = threading.Lock()
+
+    def consume(self, size, stop_request=None):
+        """Account for `size` downloaded bytes, sleeping as much as needed to stay
+        under the rate. The wait is interrupted when `stop_request` is set."""
+        if not self.rate:
+            return
+        with self.lock:
+            now = get_time()
+            self.next_time = max(self.next_time, now) + size / self.rate
+            delay = self.next_time - now
+        if stop_request:
+            stop_request.wait(delay)
+        else:
+            time.sleep(delay)
+
 
 class Downloader:
 
@@ -22,6 +118,19 @@ class Downloader:
     Do start() then check_progress() at regular intervals.
     Download is done when check_progress() returns 1.0.
     Stop with cancel().
+
+    The file is downloaded next to its destination with a .part suffix and
+    moved in place once complete. If the server supports range requests and
+    provides an ETag or a Last-Modified date, an interrupted or cancelled
+    download resumes where it stopped the next time it's started; the file is
+    downloaded again from scratch if it changed on the server in the meantime.
+    Large files can also be fetched in several segments in parallel.
+
+    If a checksum (type:hash) is given, the file is hashed as it is downloaded
+    and the download fails if it doesn't match; resumed or segmented downloads
+    are hashed once complete instead.
+
+    Downloads are run by the download scheduler, with the given priority.
     """
 
     (
@@ -32,14 +141,20 @@ class Downloader:
         COMPLETED
     ) = list(range(5))
 
-    def __init__(self, url: str, dest: str, overwrite: bool = False, referer=None, cookies=None) -> None:
+    def __init__(self, url: str, dest: str, overwrite: bool = False, referer=None, cookies=None,
+                 segments: int = DEFAULT_SEGMENTS, rate_limit: int = DEFAULT_RATE_LIMIT,
+                 priority: int = PRIORITY_INSTALLER, checksum: str = None) -> None:
         self.url: str = url
         self.dest: str = dest
         self.cookies = cookies
         self.overwrite: bool = overwrite
         self.referer = referer
+        self.segments: int = segments
+        self.rate_limiter = RateLimiter(rate_limit)
+        self.priority = priority
+        self.checksum = checksum
         self.stop_request = None
-        self.thread = None
+        self.job = None
 
         # Read these after a check_progress()
         self.state = self.INIT
@@ -56,12 +171,26 @@ class Downloader:
         self.last_speeds = []
         self.speed_check_time = 0
         self.time_left_check_time = 0
-        self.file_pointer = None
         self.progress_event = threading.Event()
 
+        self._lock = threading.Lock()
+        self._resume_state = None
+        self._unsaved_size = 0
+        self._hasher = None  # Hashes the file as it is downloaded, when done in order
+
     def __repr__(self):
         return "downloader for %s" % self.url
 
+    @property
+    def part_path(self):
+        """Path of the file being downloaded"""
+        return self.dest + ".part"
+
+    @property
+    def state_path(self):
+        """Path of the file holding what is needed to resume the download"""
+        return self.dest + ".part.json"
+
     def start(self):
         """Start download job."""
         logger.debug("⬇ %s", self.url)
@@ -69,9 +198,8 @@ class Downloader:
         self.last_check_time = get_time()
         if self.overwrite and os.path.isfile(self.dest):
             os.remove(self.dest)
-        self.file_pointer = open(self.dest, "wb")  # pylint: disable=consider-using-with
-        self.thread = jobs.AsyncCall(self.async_download, None)
-        self.stop_request = self.thread.stop_request
+        self.stop_request = threading.Event()
+        self.job = get_scheduler().submit(self.async_download, url=self.url, priority=self.priority, tracker=self)
 
     def reset(self):
         """Reset the state of the downloader"""
@@ -89,14 +217,15 @@ class Downloader:
         self.last_speeds = []
         self.speed_check_time = 0
         self.time_left_check_time = 0
-        self.file_pointer = None
 
     def check_progress(self, blocking=False):
         """Append last downloaded chunk to dest file and store stats.
 
         blocking: if true and still downloading, block until some progress is made.
         :return: progress (between 0.0 and 1.0)"""
-        if blocking and self.state in [self.INIT, self.DOWNLOADING] and self.progress_fraction < 1.0:
+        # The last chunk brings the progress to 1.0 before the file is moved in
+        # place, the completion still sets the event.
+        if blocking and self.state in [self.INIT, self.DOWNLOADING]:
             self.progress_event.wait()
             self.progress_event.clear()
 
@@ -121,50 +250,260 @@ class Downloader:
         return self.state == self.COMPLETED
 
     def cancel(self):
-        """Request download stop and remove destination file."""
+        """Request download stop. The partial file is kept if the download
+        can be resumed later, and removed otherwise."""
         logger.debug("❌ %s", self.url)
         self.state = self.CANCELLED
+        if self.job:
+            self.job.cancel()
         if self.stop_request:
             self.stop_request.set()
-        if self.file_pointer:
-            self.file_pointer.close()
-            self.file_pointer = None
-        if os.path.isfile(self.dest):
-            os.remove(self.dest)
+        self.progress_event.set()
+
+    def get_headers(self):
+        headers = requests.utils.default_headers()
+        headers["User-Agent"] = "Lutris/%s" % __version__
+        if self.referer:
+            headers["Referer"] = self.referer
+        return headers
+
+    def get_validator(self):
+        """Return the value for the If-Range header when resuming"""
+        if not self._resume_state:
+            return None
+        return get_validator(self._resume_state.get("etag"), self._resume_state.get("last_modified"))
+
+    def read_resume_state(self):
+        """Return the saved state of a previous attempt of this download, if any"""
+        if not os.path.isfile(self.part_path) or not os.path.isfile(self.state_path):
+            return None
+        try:
+            with open(self.state_path, encoding="utf-8") as state_file:
+                state = json.load(state_file)
+        except (OSError, ValueError) as ex:
+            logger.warning("Unable to read download state %s: %s", self.state_path, ex)
+            return None
+        if state.get("url") != self.url or not state.get("segments"):
+            return None
+        if os.path.getsize(self.part_path) != state["full_size"]:
+            logger.warning("%s doesn't have the expected size, restarting download", self.part_path)
+            return None
+        return state
+
+    def save_resume_state(self):
+        with self._lock:
+            self._unsaved_size = 0
+            if not self._resume_state:
+                return
+            try:
+                with open(self.state_path, "w", encoding="utf-8") as state_file:
+                    json.dump(self._resume_state, state_file)
+            except OSError as ex:
+                logger.warning("Unable to save download state %s: %s", self.state_path, ex)
+
+    def discard_resume_state(self):
+        self._resume_state = None
+        if os.path.isfile(self.state_path):
+            os.remove(self.state_path)
+
+    def discard_part_file(self):
+        self.discard_resume_state()
+        if os.path.isfile(self.part_path):
+            os.remove(self.part_path)
 
     def async_download(self):
+        if self.stop_request.is_set():
+            return
         try:
-            headers = requests.utils.default_headers()
-            headers["User-Agent"] = "Lutris/%s" % __version__
-            if self.referer:
-                headers["Referer"] = self.referer
-            response = requests.get(self.url, headers=headers, stream=True, timeout=30, cookies=self.cookies)
-            if response.status_code != 200:
-                logger.info("%s returned a %s error", self.url, response.status_code)
-            response.raise_for_status()
-            self.full_size = int(response.headers.get("Content-Length", "").strip() or 0)
-            self.progress_event.set()
-            for chunk in response.iter_content(chunk_size=1024):
-                if not self.file_pointer:
-                    break
-                if chunk:
-                    self.downloaded_size += len(chunk)
-                    self.file_pointer.write(chunk)
-                self.progress_event.set()
+            self.download()
+            # Removed here rather than in cancel(), as this thread could still write it
+            if self.stop_request.is_set() and not self._resume_state:
+                self.discard_part_file()
             self.on_download_completed()
         except Exception as ex:
             logger.exception("Download failed: %s", ex)
+            if not self._resume_state:
+                self.discard_part_file()
             self.on_download_failed(ex)
 
+    def request_file(self):
+        """Send the request for the file, for the remaining range if a previous
+        attempt is resumed. The resume state is discarded when the server can't
+        resume it, or has a different file.
+
+        Returns:
+            tuple: The streamed response and the full size of the file
+        """
+        while True:
+            headers = self.get_headers()
+            resume_position = 0
+            if self._resume_state:
+                logger.info("Resuming download of %s", self.url)
+                resume_position = get_pending_segments(self._resume_state["segments"])[0][2]
+                headers["Range"] = "bytes=%s-" % resume_position
+                headers["If-Range"] = self.get_validator()
+            elif self.segments > 1:
+                headers["Range"] = "bytes=0-"
+            response = get_session().get(self.url, headers=headers, stream=True, timeout=30, cookies=self.cookies)
+            if response.status_code not in (200, 206):
+                logger.info("%s returned a %s error", self.url, response.status_code)
+                response.close()
+                if response.status_code == 416 and self._resume_state:
+                    self.discard_resume_state()
+                    continue
+            response.raise_for_status()
+
+            if response.status_code == 200:
+                if self._resume_state:
+                    logger.info("%s changed on the server, restarting download", self.url)
+                    self.discard_resume_state()
+                return response, int(response.headers.get("Content-Length", "").strip() or 0)
+
+            first_byte, full_size = parse_content_range(response.headers.get("Content-Range"))
+            if self._resume_state and (first_byte != resume_position or full_size != self._resume_state["full_size"]):
+                logger.warning("The server returned an unexpected range for %s, restarting download", self.url)
+                response.close()
+                self.discard_resume_state()
+                continue
+            return response, full_size
+
+    def download(self):
+        """Download the file, resuming a previous attempt if possible"""
+        self._resume_state = self.read_resume_state()
+        response, full_size = self.request_file()
+        if self._resume_state:
+            segments = self._resume_state["segments"]
+            pending = get_pending_segments(segments)
+        else:
+            if response.status_code == 206 and full_size:
+                segments = split_segments(full_size, self.segments)
+            else:
+                segments = [[0, full_size - 1 if full_size else None, 0]]
+            pending = segments
+            etag = response.headers.get("ETag")
+            last_modified = response.headers.get("Last-Modified")
+            if full_size >= MIN_RESUMABLE_SIZE and get_validator(etag, last_modified) and (
+                    response.status_code == 206 or response.headers.get("Accept-Ranges") == "bytes"):
+                self._resume_state = {
+                    "url": self.url,
+                    "etag": etag,
+                    "last_modified": last_modified,
+                    "full_size": full_size,
+                    "segments": segments,
+                }
+            self.create_part_file(full_size)
+
+        self.full_size = full_size
+        self.downloaded_size = sum(segment[2] - segment[0] for segment in segments)
+        self.last_size = self.downloaded_size
+        self._hasher = None
+        if self.checksum and len(segments) == 1 and segments[0][2] == 0:
+            self._hasher = hashing.get_hasher(self.checksum.split(":", 1)[0])
+        self.progress_event.set()
+        try:
+            self.download_segments(pending, response)
+        finally:
+            self.save_resume_state()
+        if self.stop_request.is_set():
+            return None
+        if any(segment[1] is not None and segment[2] <= segment[1] for segment in segments):
+            raise DownloadError("The download of %s is incomplete" % self.url)
+        if self.checksum:
+            self.verify_checksum()
+        os.replace(self.part_path, self.dest)
+        self.discard_resume_state()
+        return None
+
+    def verify_checksum(self):
+        """Compare the downloaded file to the expected checksum, discarding it if it doesn't match"""
+        hash_type, expected_hash = self.checksum.split(":", 1)
+        hash_type = hash_type.lower()
+        if self._hasher:
+            file_hash = self._hasher.hexdigest()
+        else:
+            with open(self.part_path, "rb") as part_file:
+                file_hash = hashing.read_hashes(part_file, (hash_type,))[hash_type]
+        if file_hash != expected_hash.lower():
+            self.discard_part_file()
+            raise DownloadError("%s checksum mismatch for %s" % (hash_type, self.url))
+
+    def create_part_file(self, full_size):
+        """Create an empty partial file, allocating its full size if it's known"""
+        with open(self.part_path, "wb") as part_file:
+            if not full_size:
+                return
+            try:
+                os.posix_fallocate(part_file.fileno(), 0, full_size)
+            except (AttributeError, OSError):
+                part_file.truncate(full_size)
+
+    def download_segments(self, segments, response):
+        """Download the segments in parallel, the first one from `response`"""
+        if len(segments) == 1:
+            self.download_segment(segments[0], response)
+            return
+        with ThreadPoolExecutor(max_workers=len(segments) - 1) as executor:
+            futures = [executor.submit(self.download_segment, segment) for segment in segments[1:]]
+            try:
+                self.download_segment(segments[0], response)
+            except BaseException:
+                self.stop_request.set()
+                raise
+            finally:
+                errors = [future.exception() for future in futures]
+            for error in errors:
+                if error:
+                    raise error
+
+    def download_segment(self, segment, response=None):
+        """Write the bytes of a segment to the partial file, requesting its
+        range if no response is given."""
+        _first_byte, last_byte, position = segment
+        if response is None:
+            headers = self.get_headers()
+            headers["Range"] = "bytes=%s-%s" % (position, last_byte)
+            headers["If-Range"] = self.get_validator()
+            response = get_session().get(
+                self.url, headers=headers, stream=True, timeout=30, cookies=self.cookies
+            )
+            response.raise_for_status()
+            if response.status_code != 206:
+                response.close()
+                raise DownloadError("%s changed on the server during the download" % self.url)
+        logger.debug("Downloading bytes %s-%s of %s", position, last_byte or "", self.url)
+        with response, open(self.part_path, "r+b", buffering=0) as part_file:
+            part_file.seek(position)
+            for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+                if self.stop_request.is_set():
+                    break
+                if last_byte is not None:
+                    chunk = chunk[:last_byte + 1 - segment[2]]
+                if chunk:
+                    part_file.write(chunk)
+                    if self._hasher:
+                        self._hasher.update(chunk)
+                    self.on_chunk_downloaded(segment, len(chunk))
+                if last_byte is not None and segment[2] > last_byte:
+                    break
+
+    def on_chunk_downloaded(self, segment, size):
+        with self._lock:
+            segment[2] += size
+            self.downloaded_size += size
+            self._unsaved_size += size
+            save_state = self._unsaved_size >= STATE_SAVE_INTERVAL
+        if save_state:
+            self.save_resume_state()
+        self.progress_event.set()
+        self.rate_limiter.consume(size, self.stop_request)
+
     def on_download_failed(self, error: Exception):
-        # Cancelling closes the file, which can result in an
+        # Cancelling can interrupt the download with an
         # error. If so, we just remain cancelled.
         if self.state != self.CANCELLED:
             self.state = self.ERROR
             self.error = error
-        if self.file_pointer:
-            self.file_pointer.close()
-            self.file_pointer = None
+        self.progress_event.set()
 
     def on_download_completed(self):
         if self.state == self.CANCELLED:
@@ -178,8 +517,7 @@ class Downloader:
             self.progress_fraction = 1.0
             self.progress_percentage = 100
         self.state = self.COMPLETED
-        self.file_pointer.close()
-        self.file_pointer = None
+        self.progress_event.set()
 
     def get_stats(self):
         """Calculate and store download stats."""
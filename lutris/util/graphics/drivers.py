@@ -5,7 +5,7 @@ Everything in this module should rely on /proc or /sys only, no executable calls
 """
 import os
 import re
-from typing import Dict, Iterable, List
+from typing import Dict, Iterable, List, Optional
 
 from lutris.util import cache_single
 from lutris.util.graphics.glxinfo import GlxInfo
@@ -211,6 +211,15 @@ def get_gpu_info(card: str) -> Dict[str, str]:
     return infos
 
 
+def get_gpu_busy_percent(card: str) -> Optional[int]:
+    """Return how busy a GPU is, in percent, if its driver reports it (amdgpu does)"""
+    try:
+        with open(f"/sys/class/drm/{card}/device/gpu_busy_percent", encoding="utf-8") as busy_file:
+            return int(busy_file.read())
+    except (OSError, ValueError):
+        return None
+
+
 def is_amd() -> bool:
     """Return true if the system uses the AMD driver"""
     for card in get_gpus():
@@ -1,5 +1,6 @@
 """Parser for the glxinfo utility"""
 from lutris.util.log import logger
+from lutris.util.probe_cache import cached_probe
 from lutris.util.system import read_process_output
 
 
@@ -23,6 +24,7 @@ class GlxInfo:
         self.parse()
 
     @staticmethod
+    @cached_probe("glxinfo")
     def get_glxinfo_output():
         """Return the glxinfo -B output"""
         return read_process_output(["glxinfo", "-B"])
@@ -10,6 +10,7 @@ from ctypes import (
 )
 
 from lutris.util import cache_single
+from lutris.util.probe_cache import cached_probe
 
 VkResult = c_int32  # enum (size == 4)
 VK_SUCCESS = 0
@@ -243,7 +244,7 @@ class VkPhysicalDeviceProperties(Structure):
     ]
 
 
-@cache_single
+@cached_probe("vulkan_supported")
 def is_vulkan_supported() -> bool:
     """
     Returns True iff vulkan library can be loaded, initialized,
@@ -265,7 +266,7 @@ def is_vulkan_supported() -> bool:
     return result == VK_SUCCESS and dev_count.value > 0
 
 
-@cache_single
+@cached_probe("vulkan_api_version")
 def get_vulkan_api_version():
     """
     Queries libvulkan to get the API version; if this library is missing
@@ -295,6 +296,11 @@ def get_device_info():
     use vk_api_version_major() and friends to parse them. They are sorted so the
     highest version device is first, and software rendering devices are omitted.
     """
+    return [DeviceInfo(*device) for device in _probe_device_info()]
+
+
+@cached_probe("vulkan_devices")
+def _probe_device_info():
     try:
         vulkan = _get_vulkan()
     except OSError:
@@ -0,0 +1,203 @@
+"""Cached file hashing
+
+Checksums are computed for several algorithms in a single read of the file and
+stored in a persistent cache keyed by the identity of the file on disk
+(device, inode, size and modification time), so that ROMs and installers which
+did not change are never read twice. The cache is written once per batch of
+files, with save_hash_cache(), and when Lutris exits.
+"""
+import atexit
+import concurrent.futures
+import hashlib
+import json
+import os
+import threading
+import zlib
+
+from lutris import settings
+from lutris.util.log import logger
+
+HASH_CACHE_PATH = os.path.join(settings.CACHE_DIR, "hashes.json")
+DEFAULT_ALGORITHMS = ("md5", "sha1", "sha256", "crc32")
+BUFFER_SIZE = 1024 * 1024
+MAX_CACHE_ENTRIES = 50000
+MAX_WORKERS = min(8, os.cpu_count() or 1)
+
+
+class Crc32:
+    """hashlib-like wrapper around zlib.crc32"""
+    name = "crc32"
+
+    def __init__(self):
+        self._value = 0
+
+    def update(self, data):
+        self._value = zlib.crc32(data, self._value)
+
+    def hexdigest(self):
+        return "%08x" % (self._value & 0xFFFFFFFF)
+
+
+def get_hasher(algorithm):
+    """Return a new hash object for `algorithm`, raises ValueError if unsupported"""
+    algorithm = algorithm.lower()
+    if algorithm == "crc32":
+        return Crc32()
+    return hashlib.new(algorithm)
+
+
+def get_file_key(file_stat):
+    """Return the cache key identifying the contents of a file from its stat"""
+    return "%s:%s:%s:%s" % (file_stat.st_dev, file_stat.st_ino, file_stat.st_size, file_stat.st_mtime_ns)
+
+
+class HashCache:
+    """Persistent map of file keys to their checksums, stored as JSON in the cache dir"""
+
+    def __init__(self, path=HASH_CACHE_PATH):
+        self.path = path
+        self._entries = None
+        self._dirty = False
+        self._lock = threading.RLock()
+
+    @property
+    def entries(self):
+        if self._entries is None:
+            self._entries = self._load()
+        return self._entries
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, encoding="utf-8") as cache_file:
+                entries = json.load(cache_file)
+        except (OSError, ValueError) as ex:
+            logger.warning("Unable to read hash cache %s: %s", self.path, ex)
+            return {}
+        return entries if isinstance(entries, dict) else {}
+
+    def get(self, key):
+        with self._lock:
+            entry = self.entries.pop(key, None)
+            if entry is None:
+                return {}
+            # Moved to the end as the most recently used; the order is saved
+            # along with the next update.
+            self.entries[key] = entry
+            return dict(entry)
+
+    def update(self, key, hashes):
+        with self._lock:
+            entry = self.entries.pop(key, {})
+            entry.update(hashes)
+            # Re-insert so that the dict order stays least recently used first
+            self.entries[key] = entry
+            while len(self.entries) > MAX_CACHE_ENTRIES:
+                del self.entries[next(iter(self.entries))]
+            self._dirty = True
+
+    def save(self):
+        with self._lock:
+            if not self._dirty:
+                return
+            temp_path = self.path + ".tmp"
+            try:
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                with open(temp_path, "w", encoding="utf-8") as cache_file:
+                    json.dump(self.entries, cache_file)
+                os.replace(temp_path, self.path)
+            except OSError as ex:
+                logger.warning("Unable to write hash cache %s: %s", self.path, ex)
+                return
+            self._dirty = False
+
+    def clear(self):
+        with self._lock:
+            self._entries = {}
+            self._dirty = True
+
+
+HASH_CACHE = HashCache()
+
+
+def save_hash_cache():
+    """Write the checksums computed since the last save"""
+    HASH_CACHE.save()
+
+
+atexit.register(save_hash_cache)
+
+
+def read_hashes(filedesc, algorithms=DEFAULT_ALGORITHMS):
+    """Return the checksums of an open binary file for every algorithm in a single pass"""
+    hashers = {algorithm: get_hasher(algorithm) for algorithm in algorithms}
+    buffer = bytearray(BUFFER_SIZE)
+    view = memoryview(buffer)
+    while True:
+        size = filedesc.readinto(buffer)
+        if not size:
+            break
+        for hasher in hashers.values():
+            hasher.update(view[:size])
+    return {algorithm: hasher.hexdigest() for algorithm, hasher in hashers.items()}
+
+
+def hash_file(path, algorithms=DEFAULT_ALGORITHMS, save=False):
+    """Return a dict of the checksums of `path` for the requested algorithms.
+
+    Cached values are used when the file is unchanged; missing algorithms are
+    computed together in one read. New checksums are only written to disk
+    with `save`, callers hashing several files call save_hash_cache() once
+    they are done. Raises OSError if the file can't be read.
+    """
+    algorithms = tuple(algorithm.lower() for algorithm in algorithms)
+    key = get_file_key(os.stat(path))
+    hashes = HASH_CACHE.get(key)
+    missing = [algorithm for algorithm in algorithms if algorithm not in hashes]
+    if missing:
+        # Compute all the default algorithms along with the requested ones,
+        # the file is being read anyway.
+        missing += [
+            algorithm for algorithm in DEFAULT_ALGORITHMS
+            if algorithm not in hashes and algorithm not in missing
+        ]
+        with open(path, "rb") as hashed_file:
+            hashes.update(read_hashes(hashed_file, missing))
+        HASH_CACHE.update(key, hashes)
+        if save:
+            HASH_CACHE.save()
+    return {algorithm: hashes[algorithm] for algorithm in algorithms}
+
+
+def get_file_hash(path, algorithm="md5"):
+    """Return the checksum of type `algorithm` for a given file"""
+    return hash_file(path, (algorithm, ))[algorithm.lower()]
+
+
+def hash_files(paths, algorithms=DEFAULT_ALGORITHMS, max_workers=MAX_WORKERS):
+    """Hash several files in parallel, return a dict of path to checksums.
+
+    Files that can't be read are logged and left out of the result.
+    """
+    results = {}
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+        future_paths = {executor.submit(hash_file, path, algorithms): path for path in paths}
+        for future in concurrent.futures.as_completed(future_paths):
+            path = future_paths[future]
+            try:
+                results[path] = future.result()
+            except OSError as ex:
+                logger.warning("Error reading %s: %s", path, ex)
+    save_hash_cache()
+    return results
+
+
+def hash_directory(path, algorithms=DEFAULT_ALGORITHMS, recursive=False, max_workers=MAX_WORKERS):
+    """Hash every regular file in a directory in parallel"""
+    paths = []
+    for root, dirs, files in os.walk(path):
+        paths += [os.path.join(root, filename) for filename in files]
+        if not recursive:
+            dirs.clear()
+    return hash_files([p for p in paths if os.path.isfile(p)], algorithms, max_workers=max_workers)
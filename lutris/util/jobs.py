@@ -39,6 +39,59 @@ class AsyncCall(threading.Thread):
         return self.source_id
 
 
+class QueryWorker:
+    """Runs calls one at a time on a worker thread, for queries where only the
+    latest result matters. Each call gets a generation number; a call submitted
+    while another runs replaces any call still waiting, and the callback is only
+    scheduled in the main loop for the result of the latest call."""
+
+    def __init__(self, name="query-worker"):
+        self.name = name
+        self.generation = 0
+        self._pending_call = None
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def submit(self, func, callback, *args):
+        """Run `func(generation, *args)` on the worker thread, then `callback(result, error)`
+        in the main loop unless another call was submitted meanwhile. Return the
+        generation of the call."""
+        with self._lock:
+            self.generation += 1
+            self._pending_call = self.generation, func, callback, args
+            if not self._thread:
+                self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+                self._thread.start()
+            return self.generation
+
+    def is_current(self, generation):
+        """Whether a call is the latest one submitted; long calls can check this
+        to give up early once superseded."""
+        return generation == self.generation
+
+    def _run(self):
+        while True:
+            with self._lock:
+                if not self._pending_call:
+                    self._thread = None
+                    return
+                generation, func, callback, args = self._pending_call
+                self._pending_call = None
+            result = None
+            error = None
+            try:
+                result = func(generation, *args)
+            except Exception as ex:  # pylint: disable=broad-except
+                logger.exception("Error while running query %s: %s", func, ex)
+                error = ex
+            if self.is_current(generation):
+                schedule_at_idle(self._deliver, generation, callback, result, error)
+
+    def _deliver(self, generation, callback, result, error):
+        if self.is_current(generation):
+            callback(result, error)
+
+
 def synchronized_call(func, event, result):
     """Calls func, stores the result by reference, set an event when finished"""
     result.append(func())
@@ -6,11 +6,13 @@ import re
 import resource
 import shutil
 import sys
+import threading
 from collections import Counter, defaultdict
 
 from lutris.util import system
 from lutris.util.graphics import drivers, glxinfo, vkquery
 from lutris.util.log import logger
+from lutris.util.probe_cache import PROBE_CACHE
 
 try:
     from distro import linux_distribution
@@ -123,11 +125,30 @@ class LinuxSystem:  # pylint: disable=too-many-public-methods
         # Detect if system is 64bit capable
         self.is_64_bit = sys.maxsize > 2 ** 32
         self.arch = self.get_arch()
-        self.shared_libraries = self.get_shared_libraries()
-        self.populate_libraries()
         self.populate_sound_fonts()
         self.soft_limit, self.hard_limit = self.get_file_limits()
-        self.glxinfo = self.get_glxinfo()
+
+        # Libraries and glxinfo are probed on first use, possibly from another thread
+        self._shared_libraries = None
+        self._libraries_lock = threading.RLock()
+        self._glxinfo = None
+        self._glxinfo_probed = False
+        self._glxinfo_lock = threading.Lock()
+
+    @property
+    def shared_libraries(self):
+        with self._libraries_lock:
+            if self._shared_libraries is None:
+                self._shared_libraries = self.get_shared_libraries()
+            return self._shared_libraries
+
+    @property
+    def glxinfo(self):
+        with self._glxinfo_lock:
+            if not self._glxinfo_probed:
+                self._glxinfo = self.get_glxinfo()
+                self._glxinfo_probed = True
+            return self._glxinfo
 
     @staticmethod
     def get_sbin_path(command):
@@ -347,8 +368,12 @@ class LinuxSystem:  # pylint: disable=too-many-public-methods
         if not ldconfig:
             logger.error("Could not detect ldconfig on this system")
             return []
-        output = system.read_process_output([ldconfig, "-p"]).split("\n")
-        return [line.strip("\t") for line in output if line.startswith("\t")]
+
+        def read_ldconfig_libs():
+            output = system.read_process_output([ldconfig, "-p"]).split("\n")
+            return [line.strip("\t") for line in output if line.startswith("\t")]
+
+        return PROBE_CACHE.get("ldconfig", read_ldconfig_libs)
 
     def get_shared_libraries(self):
         """Loads all available libraries on the system as SharedLibrary instances
@@ -368,13 +393,21 @@ class LinuxSystem:  # pylint: disable=too-many-public-methods
 
     def populate_libraries(self):
         """Populates the LIBRARIES cache with what is found on the system"""
-        self._cache["LIBRARIES"] = {}
+        libraries = {}
         for arch in self.runtime_architectures:
-            self._cache["LIBRARIES"][arch] = defaultdict(list)
+            libraries[arch] = defaultdict(list)
         for req in self.requirements:
             for lib in SYSTEM_COMPONENTS["LIBRARIES"][req]:
                 for shared_lib in self.shared_libraries[lib]:
-                    self._cache["LIBRARIES"][shared_lib.arch][req].append(lib)
+                    libraries[shared_lib.arch][req].append(lib)
+        self._cache["LIBRARIES"] = libraries
+
+    def get_libraries(self):
+        """Return the required libraries found for each architecture"""
+        with self._libraries_lock:
+            if "LIBRARIES" not in self._cache:
+                self.populate_libraries()
+            return self._cache["LIBRARIES"]
 
     def populate_sound_fonts(self):
         """Populates the soundfont cache"""
@@ -388,7 +421,8 @@ class LinuxSystem:  # pylint: disable=too-many-public-methods
     def get_missing_requirement_libs(self, req):
         """Return a list of sets of missing libraries for each supported architecture"""
         required_libs = set(SYSTEM_COMPONENTS["LIBRARIES"][req])
-        return [list(required_libs - set(self._cache["LIBRARIES"][arch][req])) for arch in self.runtime_architectures]
+        libraries = self.get_libraries()
+        return [list(required_libs - set(libraries[arch][req])) for arch in self.runtime_architectures]
 
     def get_missing_libs(self):
         """Return a dictionary of missing libraries"""
@@ -8,6 +8,8 @@ from gi.repository import GLib
 
 # Used to store log buffers for games.
 LOG_BUFFERS = {}
+# Used to store the whole output of games, see lutris.util.log_store
+LOG_STORES = {}
 
 CACHE_DIR = os.path.realpath(os.path.join(GLib.get_user_cache_dir(), "lutris"))
 if not os.path.isdir(CACHE_DIR):
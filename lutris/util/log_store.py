@@ -0,0 +1,272 @@
+"""Bounded storage of the output of a game
+
+A game running for hours can print gigabytes of output. The store keeps the
+most recent lines in memory; older lines are grouped in blocks, compressed and
+appended to a file for the session, which is deleted along with the store.
+The position and first line of each block are indexed, so a page of lines
+anywhere in the log is read by decompressing a block or two, and a search skips
+the blocks without a match with a single lookup in their text.
+
+Spill files are named after the process that wrote them; the files of processes
+that are gone, after a crash for instance, are deleted by the first store made.
+"""
+import bisect
+import contextlib
+import itertools
+import os
+import threading
+import uuid
+import weakref
+import zlib
+from collections import deque, namedtuple
+
+from lutris import settings
+from lutris.util.log import logger
+from lutris.util.lru_cache import LRUCache
+from lutris.util.strings import lookup_strings_in_text
+
+LOG_SPILL_DIR = os.path.join(settings.CACHE_DIR, "logs")
+MAX_MEMORY_LINES = 10000
+BLOCK_LINES = 2000
+# Budget of the decompressed blocks kept for paging and searching, in characters
+MAX_CACHED_BLOCKS_SIZE = 16 * 1024 * 1024
+
+# A block of lines spilled to disk: where it is in the file and which lines it holds
+SpilledBlock = namedtuple("SpilledBlock", "offset size first_line line_count")
+
+_pruned_spill_dirs = set()
+_prune_lock = threading.Lock()
+
+
+def _remove_spill_file(path, fd):
+    os.close(fd)
+    with contextlib.suppress(OSError):
+        os.remove(path)
+
+
+def is_process_running(pid):
+    try:
+        os.kill(pid, 0)
+    except PermissionError:
+        return True  # Running, as another user
+    except (OSError, OverflowError):
+        return False
+    return True
+
+
+def prune_spill_files(spill_dir):
+    """Delete the spill files of the processes no longer running"""
+    try:
+        filenames = os.listdir(spill_dir)
+    except OSError:
+        return
+    for filename in filenames:
+        if not filename.endswith(".log.z"):
+            continue
+        pid = filename.split("-", 1)[0]
+        if pid.isdigit() and is_process_running(int(pid)):
+            continue
+        logger.debug("Removing stale log %s", filename)
+        with contextlib.suppress(OSError):
+            os.remove(os.path.join(spill_dir, filename))
+
+
+def _prune_spill_dir_once(spill_dir):
+    with _prune_lock:
+        if spill_dir in _pruned_spill_dirs:
+            return
+        _pruned_spill_dirs.add(spill_dir)
+    prune_spill_files(spill_dir)
+
+
+class LogStore:
+    """Lines of output, the most recent in memory and older ones compressed on disk.
+    Lines are numbered from 0; an unterminated last line is included in reads but
+    not in line_count."""
+
+    def __init__(self, max_memory_lines=MAX_MEMORY_LINES, block_lines=BLOCK_LINES, spill_dir=LOG_SPILL_DIR):
+        self.max_memory_lines = max_memory_lines
+        self.block_lines = block_lines
+        self.spill_dir = spill_dir
+        self.spill_path = None
+        self._spill_fd = None
+        self._spill_size = 0
+        self._blocks = []
+        self._block_first_lines = []  # First line of each block, for bisecting
+        self._lines = deque()
+        self._partial_line = ""
+        self._cached_blocks = LRUCache(MAX_CACHED_BLOCKS_SIZE)
+        self._lock = threading.RLock()
+        self._finalizer = None
+        _prune_spill_dir_once(spill_dir)
+
+    @property
+    def line_count(self):
+        """The number of complete lines"""
+        with self._lock:
+            return self.spilled_line_count + len(self._lines)
+
+    @property
+    def spilled_line_count(self):
+        with self._lock:
+            return self._block_first_lines[-1] + self._blocks[-1].line_count if self._blocks else 0
+
+    def append(self, text):
+        """Add output, which need not end at a line break"""
+        if not text:
+            return
+        with self._lock:
+            lines = (self._partial_line + text).split("\n")
+            self._partial_line = lines.pop()
+            self._lines.extend(lines)
+            while len(self._lines) >= self.max_memory_lines + self.block_lines:
+                self._spill([self._lines.popleft() for _i in range(self.block_lines)])
+
+    def _spill(self, lines):
+        """Write lines, the oldest in memory, to a new block in the spill file"""
+        if self._spill_fd is None:
+            os.makedirs(self.spill_dir, exist_ok=True)
+            self.spill_path = os.path.join(self.spill_dir, "%s-%s.log.z" % (os.getpid(), uuid.uuid4()))
+            self._spill_fd = os.open(self.spill_path, os.O_RDWR | os.O_CREAT | os.O_APPEND, 0o600)
+            self._finalizer = weakref.finalize(self, _remove_spill_file, self.spill_path, self._spill_fd)
+        data = zlib.compress(("\n".join(lines) + "\n").encode("utf-8"), 1)
+        try:
+            os.write(self._spill_fd, data)
+        except OSError as ex:
+            logger.warning("Unable to write log to %s, %s lines are lost: %s", self.spill_path, len(lines), ex)
+            data = b""  # The lines are still counted, and read back as empty lines
+        block = SpilledBlock(self._spill_size, len(data), self.spilled_line_count, len(lines))
+        self._spill_size += len(data)
+        self._blocks.append(block)
+        self._block_first_lines.append(block.first_line)
+
+    def clear(self):
+        """Remove all lines, and the spill file"""
+        with self._lock:
+            if self._finalizer:
+                self._finalizer()
+            self.spill_path = None
+            self._spill_fd = None
+            self._spill_size = 0
+            self._blocks = []
+            self._block_first_lines = []
+            self._lines.clear()
+            self._partial_line = ""
+            self._cached_blocks.clear()
+
+    def _read_block(self, index):
+        """Return the text of a spilled block, each line ending with a line break"""
+        with self._lock:
+            text = self._cached_blocks.get(index)
+            if text is not None:
+                return text
+            if index >= len(self._blocks):
+                return ""  # Cleared since
+            block = self._blocks[index]
+            try:
+                data = os.pread(self._spill_fd, block.size, block.offset)
+                text = zlib.decompress(data).decode("utf-8")
+            except (OSError, zlib.error) as ex:
+                logger.warning("Unable to read log from %s: %s", self.spill_path, ex)
+                text = "\n" * block.line_count
+            self._cached_blocks[index] = text
+            return text
+
+    def _get_chunks(self):
+        """Return the first line and a function returning the text of each block
+        of lines, spilled ones first; the lines in memory make the last one."""
+        with self._lock:
+            chunks = [
+                (block.first_line, lambda index=index: self._read_block(index))
+                for index, block in enumerate(self._blocks)
+            ]
+            memory_text = self.get_recent_text()
+            chunks.append((self.spilled_line_count, lambda: memory_text))
+            return chunks
+
+    def iter_text(self):
+        """Yield the whole text, a block at a time"""
+        for _first_line, get_text in self._get_chunks():
+            yield get_text()
+
+    def get_recent_text(self):
+        """Return the text of the lines kept in memory"""
+        with self._lock:
+            return "".join(line + "\n" for line in self._lines) + self._partial_line
+
+    def get_lines(self, start, count):
+        """Return the text of up to count lines from line start, as a list"""
+        start = max(start, 0)
+        end = start + count
+        lines = []
+        with self._lock:
+            index = bisect.bisect_right(self._block_first_lines, start) - 1
+            while 0 <= index < len(self._blocks) and len(lines) < count:
+                block = self._blocks[index]
+                block_lines = self._read_block(index).split("\n")[:-1]
+                lines.extend(block_lines[max(start - block.first_line, 0):end - block.first_line])
+                index += 1
+            memory_start = max(start - self.spilled_line_count, 0)
+            lines.extend(itertools.islice(self._lines, memory_start, memory_start + count - len(lines)))
+            if self._partial_line and start <= self.line_count < end:
+                lines.append(self._partial_line)
+        return lines
+
+    def find_lines(self, text):
+        """Return each line where a string was found"""
+        return [line for chunk in self.iter_text() if text in chunk for line in lookup_strings_in_text(text, chunk)]
+
+    def search(self, text, start_line=0, backward=False):
+        """Return the number of the first line from start_line that contains text,
+        ignoring case; backward, of the last line before start_line. The search
+        wraps around the ends of the log. Return None if there's no match."""
+        needle = text.lower()
+        if not needle:
+            return None
+        chunks = self._get_chunks()
+        end_line = self.line_count + 1  # Includes the unterminated line
+        start_line = min(max(start_line, 0), end_line)
+        if backward:
+            ranges = [(0, start_line), (start_line, end_line)]
+        else:
+            ranges = [(start_line, end_line), (0, start_line)]
+        for low, high in ranges:
+            line = self._search_range(chunks, needle, low, high, backward)
+            if line is not None:
+                return line
+        return None
+
+    @staticmethod
+    def _search_range(chunks, needle, low, high, backward):
+        """Search the lines from low to high, excluded, in the first or last chunk that has a match"""
+        chunk_ranges = [
+            (first_line, chunks[index + 1][0] if index + 1 < len(chunks) else None, get_text)
+            for index, (first_line, get_text) in enumerate(chunks)
+        ]
+        if backward:
+            chunk_ranges.reverse()
+        for first_line, next_first_line, get_text in chunk_ranges:
+            if first_line >= high or (next_first_line is not None and next_first_line <= low):
+                continue
+            text = get_text().lower()
+            if backward:
+                end = _get_line_offset(text, high - first_line)
+                position = text.rfind(needle, 0, end)
+            else:
+                position = text.find(needle, _get_line_offset(text, low - first_line))
+            if position == -1:
+                continue
+            line = first_line + text.count("\n", 0, position)
+            return line if low <= line < high else None
+        return None
+
+
+def _get_line_offset(text, line):
+    """Return the position in text of the start of a line, or the length of
+    the text if it has fewer lines"""
+    position = 0
+    for _i in range(max(line, 0)):
+        position = text.find("\n", position) + 1
+        if not position:
+            return len(text)
+    return position
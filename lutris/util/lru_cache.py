@@ -0,0 +1,51 @@
+"""Least recently used cache with a size budget"""
+from collections import OrderedDict
+
+
+class LRUCache:
+    """Maps keys to values, discarding the least recently used values once the
+    total size of the values exceeds a budget. The size of each value is given
+    by a function, typically its size in bytes."""
+
+    def __init__(self, max_size, get_size=len):
+        self.max_size = max_size
+        self.get_size = get_size
+        self.size = 0
+        self._items = OrderedDict()  # Key to (value, size), oldest first
+
+    def __len__(self):
+        return len(self._items)
+
+    def __contains__(self, key):
+        return key in self._items
+
+    def __getitem__(self, key):
+        value, _size = self._items[key]
+        self._items.move_to_end(key)
+        return value
+
+    def __setitem__(self, key, value):
+        self.pop(key)
+        size = self.get_size(value)
+        self._items[key] = value, size
+        self.size += size
+        # The new value is kept even if it exceeds the budget on its own
+        while self.size > self.max_size and len(self._items) > 1:
+            _key, (_value, discarded_size) = self._items.popitem(last=False)
+            self.size -= discarded_size
+
+    def get(self, key, default=None):
+        if key in self._items:
+            return self[key]
+        return default
+
+    def pop(self, key, default=None):
+        if key not in self._items:
+            return default
+        value, size = self._items.pop(key)
+        self.size -= size
+        return value
+
+    def clear(self):
+        self._items.clear()
+        self.size = 0
@@ -0,0 +1,92 @@
+"""Prioritized loading of resources on worker threads
+
+The views load the media of the rows around their viewport ahead of time; as
+the view scrolls, the rows that come into view must be loaded first and those
+scrolled past need not be loaded at all. Jobs are identified by a key, so that
+a queued job can be moved up or down the queue, or cancelled, before it runs.
+"""
+import heapq
+import itertools
+import threading
+
+from lutris.util.log import logger
+
+
+class PrioritizedLoader:
+    """Runs jobs on a pool of worker threads, lowest priority number first"""
+
+    def __init__(self, max_workers, name="loader"):
+        self.max_workers = max_workers
+        self.name = name
+        self._queue = []  # Heap of [priority, sequence, key]; the key is None once cancelled
+        self._jobs = {}  # Key to (function, args, callback, queue entry) of queued jobs
+        self._sequence = itertools.count()
+        self._condition = threading.Condition()
+        self._workers = []
+        self._idle_workers = 0
+
+    def submit(self, key, priority, function, callback, *args):
+        """Queue a call to function(*args); callback(key, result, error) is called
+        on the worker thread once it has run. If a job with the same key is queued,
+        only its priority is updated; a job already running is left alone."""
+        with self._condition:
+            job = self._jobs.get(key)
+            if job:
+                if job[3][0] == priority:
+                    return
+                job[3][2] = None
+                function, args, callback = job[:3]
+            entry = [priority, next(self._sequence), key]
+            self._jobs[key] = function, args, callback, entry
+            heapq.heappush(self._queue, entry)
+            if not self._idle_workers and len(self._workers) < self.max_workers:
+                worker = threading.Thread(target=self._work, name=self.name, daemon=True)
+                self._workers.append(worker)
+                worker.start()
+            self._condition.notify()
+
+    def is_queued(self, key):
+        with self._condition:
+            return key in self._jobs
+
+    def cancel(self, key):
+        """Remove a job from the queue; return whether it was queued"""
+        with self._condition:
+            job = self._jobs.pop(key, None)
+            if not job:
+                return False
+            job[3][2] = None
+            return True
+
+    def cancel_if(self, predicate):
+        """Remove the queued jobs whose key matches a predicate, and return their keys"""
+        with self._condition:
+            cancelled_keys = [key for key in self._jobs if predicate(key)]
+            for key in cancelled_keys:
+                self.cancel(key)
+            return cancelled_keys
+
+    def _get_job(self):
+        with self._condition:
+            while True:
+                while self._queue:
+                    _priority, _sequence, key = heapq.heappop(self._queue)
+                    if key is not None:
+                        function, args, callback, _entry = self._jobs.pop(key)
+                        return key, function, args, callback
+                self._idle_workers += 1
+                self._condition.wait()
+                self._idle_workers -= 1
+
+    def _work(self):
+        while True:
+            key, function, args, callback = self._get_job()
+            result = error = None
+            try:
+                result = function(*args)
+            except Exception as ex:  # pylint: disable=broad-except
+                error = ex
+            try:
+                callback(key, result, error)
+            except Exception as ex:  # pylint: disable=broad-except
+                logger.exception("Error in callback of %s: %s", key, ex)
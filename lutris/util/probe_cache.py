@@ -0,0 +1,152 @@
+"""Persistent cache of the system probes
+
+Probing the system at startup means running ldconfig, glxinfo, lspci and
+vulkaninfo and creating a Vulkan instance, which takes a good part of a second
+on most systems. Their results are kept in a JSON file in the cache dir along
+with a fingerprint of what they depend on (kernel, libraries, Vulkan and Nvidia
+drivers, display) and reused until that fingerprint changes.
+"""
+import hashlib
+import json
+import os
+import platform
+import threading
+from functools import wraps
+
+from lutris import __version__, settings
+from lutris.util.log import logger
+
+PROBE_CACHE_PATH = os.path.join(settings.CACHE_DIR, "system-probes.json")
+LD_CACHE_PATH = "/etc/ld.so.cache"
+NVIDIA_VERSION_PATH = "/proc/driver/nvidia/version"
+DRM_PATH = "/sys/class/drm"
+FINGERPRINT_VARIABLES = (
+    "DISPLAY",
+    "WAYLAND_DISPLAY",
+    "DRI_PRIME",
+    "LD_LIBRARY_PATH",
+    "VK_ICD_FILENAMES",
+    "VK_DRIVER_FILES",
+    "__GLX_VENDOR_LIBRARY_NAME",
+    "__NV_PRIME_RENDER_OFFLOAD",
+)
+
+
+def get_mtime(path):
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def read_driver_version():
+    """Return the version string of the Nvidia kernel module, if loaded"""
+    try:
+        with open(NVIDIA_VERSION_PATH, encoding="utf-8") as version_file:
+            return version_file.read()
+    except OSError:
+        return None
+
+
+def get_system_fingerprint():
+    """Return a hash of everything the system probes depend on"""
+    from lutris.util.system import get_vk_icd_file_sets  # pylint: disable=import-outside-toplevel
+
+    icd_files = sorted(path for icd_set in get_vk_icd_file_sets().values() for path in icd_set)
+    try:
+        gpus = sorted(os.listdir(DRM_PATH))
+    except OSError:
+        gpus = []
+    fingerprint = {
+        "version": __version__,
+        "kernel": platform.release(),
+        "ld_cache": get_mtime(LD_CACHE_PATH),
+        "icd_files": {path: get_mtime(path) for path in icd_files},
+        "nvidia": read_driver_version(),
+        "gpus": gpus,
+        "environment": {variable: os.environ.get(variable) for variable in FINGERPRINT_VARIABLES},
+    }
+    return hashlib.sha1(json.dumps(fingerprint, sort_keys=True).encode()).hexdigest()
+
+
+class ProbeCache:
+    """Persistent map of probe names to their results, stored as JSON in the
+    cache dir and discarded when the system fingerprint changes"""
+
+    def __init__(self, path=PROBE_CACHE_PATH):
+        self.path = path
+        self._fingerprint = None
+        self._entries = None
+        self._lock = threading.RLock()
+
+    @property
+    def fingerprint(self):
+        if self._fingerprint is None:
+            self._fingerprint = get_system_fingerprint()
+        return self._fingerprint
+
+    @property
+    def entries(self):
+        with self._lock:
+            if self._entries is None:
+                self._entries = self._load()
+            return self._entries
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, encoding="utf-8") as cache_file:
+                cache = json.load(cache_file)
+        except (OSError, ValueError) as ex:
+            logger.warning("Unable to read system probes %s: %s", self.path, ex)
+            return {}
+        if not isinstance(cache, dict) or cache.get("fingerprint") != self.fingerprint:
+            return {}
+        return cache.get("probes") or {}
+
+    def get(self, name, probe):
+        """Return the cached result of a probe, running it if it isn't cached.
+        The probe runs outside of the lock so that probes can run concurrently;
+        its result must be serializable to JSON."""
+        with self._lock:
+            if name in self.entries:
+                return self.entries[name]
+        result = probe()
+        with self._lock:
+            self.entries[name] = result
+            self.save()
+        return result
+
+    def save(self):
+        with self._lock:
+            temp_path = self.path + ".tmp"
+            try:
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                with open(temp_path, "w", encoding="utf-8") as cache_file:
+                    json.dump({"fingerprint": self.fingerprint, "probes": self.entries}, cache_file)
+                os.replace(temp_path, self.path)
+            except OSError as ex:
+                logger.warning("Unable to write system probes %s: %s", self.path, ex)
+
+    def clear(self):
+        with self._lock:
+            self._fingerprint = None
+            self._entries = {}
+            self.save()
+
+
+PROBE_CACHE = ProbeCache()
+
+
+def cached_probe(name):
+    """Decorator caching the result of a function without arguments in the probe cache"""
+
+    def decorator(function):
+        @wraps(function)
+        def wrapper():
+            return PROBE_CACHE.get(name, function)
+
+        return wrapper
+
+    return decorator
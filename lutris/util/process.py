@@ -8,6 +8,7 @@ IGNORED_PROCESSES = (
     "tracker-extract",
     "kworker",
 )
+CLOCK_TICKS = os.sysconf("SC_CLK_TCK")
 
 
 class Process:
@@ -89,6 +90,57 @@ class Process:
             return _stat[0]
         return None
 
+    @property
+    def start_time(self):
+        """Time the process started after system boot, in clock ticks; along
+        with the PID, this identifies a process."""
+        _stat = self.get_stat()
+        if _stat and len(_stat) > 19:
+            return int(_stat[19])
+        return None
+
+    @property
+    def cpu_time(self):
+        """User and system CPU time used by the process, in seconds"""
+        _stat = self.get_stat()
+        if _stat and len(_stat) > 12:
+            return (int(_stat[11]) + int(_stat[12])) / CLOCK_TICKS
+        return None
+
+    @property
+    def thread_count(self):
+        """Number of threads of the process"""
+        _stat = self.get_stat()
+        if _stat and len(_stat) > 17:
+            return int(_stat[17])
+        return None
+
+    def _read_fields(self, file_path):
+        """Return the numeric fields of a "Name: value" file in /proc, values
+        in kB are converted to bytes"""
+        fields = {}
+        for line in self._read_content(file_path).splitlines():
+            name, _sep, value = line.partition(":")
+            value = value.split()
+            if value and value[0].isdigit():
+                fields[name] = int(value[0]) * (1024 if value[1:] == ["kB"] else 1)
+        return fields
+
+    @property
+    def memory(self):
+        """Resident and proportional set sizes of the process, in bytes"""
+        fields = self._read_fields("/proc/{}/smaps_rollup".format(self.pid))
+        if "Rss" not in fields:
+            # smaps_rollup is missing before Linux 4.14
+            fields = {"Rss": self._read_fields("/proc/{}/status".format(self.pid)).get("VmRSS", 0)}
+        return {"rss": fields["Rss"], "pss": fields.get("Pss")}
+
+    @property
+    def io(self):
+        """Bytes the process caused to be read from and written to storage"""
+        fields = self._read_fields("/proc/{}/io".format(self.pid))
+        return {"read_bytes": fields.get("read_bytes", 0), "write_bytes": fields.get("write_bytes", 0)}
+
     @property
     def cmdline(self):
         """Return command line used to run the process `pid`."""
@@ -0,0 +1,72 @@
+"""Tracking of the processes of a running game
+
+Game processes are found by the LUTRIS_GAME_UUID in their environment, which
+meant reading the environment of every process started since the launch on
+each heartbeat. The tracker remembers the processes it has already looked at:
+each scan only reads the environment of processes started since the previous
+one, and only the game's own processes are checked again.
+"""
+import threading
+
+from lutris.util.process import Process
+from lutris.util.system import get_running_pid_list
+
+
+class ProcessTracker:
+    """Keeps track of the processes of a game launch"""
+
+    def __init__(self, game_uuid, game_folder, excluded_pids):
+        """Create a process tracker.
+        Params:
+            game_uuid (str): LUTRIS_GAME_UUID set in the environment of the launch
+            game_folder (str): folder found in the command line of the game processes
+            excluded_pids (iterable): PIDs of the processes running before the launch
+        """
+        self.game_uuid = game_uuid
+        self.game_folder = game_folder
+        self.excluded_pids = set(excluded_pids)
+        self._seen_pids = set()
+        self._launch_processes = {}  # PID to start time of the processes with our game UUID
+        self._lock = threading.Lock()
+
+    def get_launch_start_time(self, process):
+        """Return the start time of a process of the launch, None for other processes"""
+        start_time = process.start_time
+        if start_time is None or process.environ.get("LUTRIS_GAME_UUID") != self.game_uuid:
+            return None
+        return start_time
+
+    def is_game_process(self, process):
+        cmdline = process.cmdline or ""
+        # pressure-vessel: This could potentially pick up PIDs not started by lutris?
+        return self.game_folder in cmdline or "pressure-vessel" in cmdline
+
+    def get_pids(self):
+        """Return the PIDs of the running processes of the game"""
+        with self._lock:
+            running_pids = set(get_running_pid_list()) - self.excluded_pids
+            # PIDs of exited processes can be reused, forget about them
+            self._seen_pids &= running_pids
+            for pid in set(self._launch_processes) - running_pids:
+                del self._launch_processes[pid]
+
+            new_pids = running_pids - self._seen_pids
+            self._seen_pids |= new_pids
+            for pid in new_pids:
+                start_time = self.get_launch_start_time(Process(pid))
+                if start_time is not None:
+                    self._launch_processes[pid] = start_time
+
+            game_pids = set()
+            for pid, start_time in list(self._launch_processes.items()):
+                process = Process(pid)
+                if pid not in new_pids and process.start_time != start_time:
+                    # The PID was reused between two scans
+                    start_time = self.get_launch_start_time(process)
+                    if start_time is None:
+                        del self._launch_processes[pid]
+                        continue
+                    self._launch_processes[pid] = start_time
+                if self.is_game_process(process):
+                    game_pids.add(pid)
+            return game_pids
@@ -0,0 +1,99 @@
+"""Timeline of the startup phases
+
+Started by `lutris --profile-startup`, the timeline records how long each
+startup phase takes and saves it in the Chrome trace event format, which can
+be opened in chrome://tracing or https://ui.perfetto.dev.
+
+This module is imported before anything else by bin/lutris to time the
+imports, so it must only depend on the standard library.
+"""
+import atexit
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+
+class Timeline:
+    """Records named phases; does nothing until started"""
+
+    def __init__(self):
+        self.enabled = False
+        self.path = None
+        self.events = []
+        self.start_time = 0
+        self._open_phases = {}
+        self._lock = threading.Lock()
+
+    def start(self, path=None):
+        """Start recording, the trace is saved to `path` on exit"""
+        if self.enabled:
+            return
+        self.enabled = True
+        self.path = path
+        self.start_time = time.perf_counter()
+        atexit.register(self.save)
+
+    def get_timestamp(self):
+        """Return the microseconds elapsed since the start of the recording"""
+        return (time.perf_counter() - self.start_time) * 1000000
+
+    def add_event(self, event):
+        event.update(pid=os.getpid(), tid=threading.get_ident())
+        with self._lock:
+            self.events.append(event)
+
+    @contextmanager
+    def phase(self, name):
+        """Record the time spent in the block as the phase `name`"""
+        if not self.enabled:
+            yield
+            return
+        start = self.get_timestamp()
+        try:
+            yield
+        finally:
+            self.add_event({"name": name, "ph": "X", "ts": start, "dur": self.get_timestamp() - start})
+
+    def begin(self, name):
+        """Start a phase ended by a later call to end(), for phases spanning callbacks"""
+        if self.enabled:
+            self._open_phases[name] = self.get_timestamp()
+
+    def end(self, name):
+        start = self._open_phases.pop(name, None)
+        if start is not None:
+            self.add_event({"name": name, "ph": "X", "ts": start, "dur": self.get_timestamp() - start})
+
+    def mark(self, name):
+        """Record an instant event"""
+        if self.enabled:
+            self.add_event({"name": name, "ph": "i", "s": "g", "ts": self.get_timestamp()})
+
+    def get_durations(self):
+        """Return the total duration of each phase, in milliseconds"""
+        durations = {}
+        with self._lock:
+            for event in self.events:
+                if event["ph"] == "X":
+                    durations[event["name"]] = durations.get(event["name"], 0) + event["dur"] / 1000
+        return durations
+
+    def save(self, path=None):
+        """Write the recorded events as a Chrome trace file"""
+        path = path or self.path
+        if not self.enabled or not path:
+            return
+        with self._lock:
+            trace = {"traceEvents": list(self.events), "displayTimeUnit": "ms"}
+        with open(path, "w", encoding="utf-8") as trace_file:
+            json.dump(trace, trace_file)
+
+
+STARTUP_TIMELINE = Timeline()
+
+
+def phase(name):
+    """Record the time spent in the block as a startup phase"""
+    return STARTUP_TIMELINE.phase(name)
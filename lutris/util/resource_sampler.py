@@ -0,0 +1,145 @@
+"""Sampling of the resources used by a running game
+
+While a game runs, a sampler thread reads the CPU time, memory, disk IO and
+thread count of the game's processes from /proc, and the busy percentage of
+the GPUs whose driver reports it, at a fixed interval. The samples are kept in
+a ring buffer and summed up at the end of the play session.
+"""
+import threading
+import time
+from collections import deque, namedtuple
+
+from lutris.util.graphics import drivers
+from lutris.util.log import logger
+from lutris.util.process import Process
+
+DEFAULT_SAMPLING_INTERVAL = 5
+MAX_SAMPLES = 720  # One hour at the default interval
+
+ResourceSample = namedtuple(
+    "ResourceSample",
+    "timestamp processes cpu_time cpu_percent rss pss read_bytes write_bytes threads gpu_busy"
+)
+
+
+class ResourceSampler:
+    """Samples the resources used by a set of processes in a background thread"""
+
+    def __init__(self, get_pids, interval=DEFAULT_SAMPLING_INTERVAL, max_samples=MAX_SAMPLES):
+        """Create a resource sampler.
+        Params:
+            get_pids (callable): returns the PIDs of the processes to sample
+            interval (float): seconds between two samples
+            max_samples (int): number of samples kept, older ones are dropped
+        """
+        self.get_pids = get_pids
+        self.interval = interval
+        self.samples = deque(maxlen=max_samples)
+        self.started_at = None
+        self.ended_at = None
+        self.sample_count = 0
+        self._totals = {}  # PID to last CPU time, read and written bytes
+        self._cpu_time = 0
+        self._read_bytes = 0
+        self._write_bytes = 0
+        self._peaks = {"cpu_percent": 0, "rss": 0, "pss": 0, "threads": 0, "gpu_busy": None}
+        self._gpu_busy_sum = 0
+        self._gpu_busy_count = 0
+        self._gpus = []
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self.started_at = time.time()
+        self._gpus = [card for card in drivers.get_gpus() if drivers.get_gpu_busy_percent(card) is not None]
+        self._thread = threading.Thread(target=self.run, name="resource-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop sampling, waiting for a sample being taken to complete"""
+        self._stop_event.set()
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join()
+        self.ended_at = time.time()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            try:
+                self.take_sample()
+            except Exception as ex:  # pylint: disable=broad-except
+                logger.exception("Unable to sample the resources of the game: %s", ex)
+                return
+
+    def take_sample(self):
+        """Read the resource usage of the processes and add it to the samples"""
+        pids = self.get_pids()
+        previous_cpu_time = self._cpu_time
+        rss = pss = threads = 0
+        totals = {}
+        for pid in pids:
+            process = Process(pid)
+            cpu_time = process.cpu_time
+            if cpu_time is None:
+                continue  # The process has exited
+            memory = process.memory
+            io = process.io
+            last_cpu_time, last_read, last_write = self._totals.get(pid, (0, 0, 0))
+            self._cpu_time += max(cpu_time - last_cpu_time, 0)
+            self._read_bytes += max(io["read_bytes"] - last_read, 0)
+            self._write_bytes += max(io["write_bytes"] - last_write, 0)
+            totals[pid] = (cpu_time, io["read_bytes"], io["write_bytes"])
+            rss += memory["rss"]
+            pss += memory["pss"] or 0
+            threads += process.thread_count or 0
+        self._totals = totals
+
+        timestamp = time.time()
+        last_timestamp = self.samples[-1].timestamp if self.samples else self.started_at
+        elapsed = timestamp - last_timestamp
+        cpu_percent = (self._cpu_time - previous_cpu_time) * 100 / elapsed if elapsed > 0 else 0
+        gpu_busy = None
+        if self._gpus:
+            gpu_busy = max(drivers.get_gpu_busy_percent(card) or 0 for card in self._gpus)
+            self._gpu_busy_sum += gpu_busy
+            self._gpu_busy_count += 1
+
+        sample = ResourceSample(
+            timestamp=timestamp,
+            processes=len(totals),
+            cpu_time=self._cpu_time,
+            cpu_percent=cpu_percent,
+            rss=rss,
+            pss=pss,
+            read_bytes=self._read_bytes,
+            write_bytes=self._write_bytes,
+            threads=threads,
+            gpu_busy=gpu_busy,
+        )
+        for key in ("cpu_percent", "rss", "pss", "threads", "gpu_busy"):
+            value = getattr(sample, key)
+            if value is not None and (self._peaks[key] is None or value > self._peaks[key]):
+                self._peaks[key] = value
+        self.samples.append(sample)
+        self.sample_count += 1
+        return sample
+
+    def get_summary(self):
+        """Return the resource usage over the whole session, including the
+        samples dropped from the ring buffer"""
+        ended_at = self.ended_at or time.time()
+        duration = ended_at - self.started_at
+        return {
+            "started_at": int(self.started_at),
+            "ended_at": int(ended_at),
+            "samples": self.sample_count,
+            "cpu_time": self._cpu_time,
+            "cpu_percent_avg": self._cpu_time * 100 / duration if duration > 0 else 0,
+            "cpu_percent_max": self._peaks["cpu_percent"],
+            "rss_max": self._peaks["rss"],
+            "pss_max": self._peaks["pss"],
+            "read_bytes": self._read_bytes,
+            "write_bytes": self._write_bytes,
+            "threads_max": self._peaks["threads"],
+            "gpu_busy_avg": self._gpu_busy_sum / self._gpu_busy_count if self._gpu_busy_count else None,
+            "gpu_busy_max": self._peaks["gpu_busy"],
+        }
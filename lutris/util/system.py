@@ -17,9 +17,12 @@ from gi.repository import Gio, GLib
 
 from lutris import settings
 from lutris.exceptions import MissingExecutableError
+from lutris.util import hashing
+from lutris.util.disk_size import scan_directory
 from lutris.util.jobs import AsyncCall
 from lutris.util.log import logger
 from lutris.util.portals import TrashPortal
+from lutris.util.probe_cache import PROBE_CACHE
 
 # Home folders that should never get deleted.
 PROTECTED_HOME_FOLDERS = (
@@ -208,28 +211,22 @@ def get_md5_in_zip(filename):
 def get_md5_hash(filename):
     """Return the md5 hash of a file."""
     try:
-        with open(filename, "rb") as _file:
-            _hash = read_file_md5(_file)
+        return hashing.get_file_hash(filename, "md5")
     except IOError:
         logger.warning("Error reading %s", filename)
         return False
-    return _hash
 
 
 def read_file_md5(filedesc):
     md5 = hashlib.md5()
-    for chunk in iter(lambda: filedesc.read(8192), b""):
+    for chunk in iter(lambda: filedesc.read(hashing.BUFFER_SIZE), b""):
         md5.update(chunk)
     return md5.hexdigest()
 
 
 def get_file_checksum(filename, hash_type):
     """Return the checksum of type `hash_type` for a given filename"""
-    hasher = hashlib.new(hash_type)
-    with open(filename, "rb") as input_file:
-        for chunk in iter(lambda: input_file.read(4096), b""):
-            hasher.update(chunk)
-    return hasher.hexdigest()
+    return hashing.get_file_hash(filename, hash_type)
 
 
 def is_executable(exec_path):
@@ -578,12 +575,15 @@ def update_desktop_icons():
 def get_disk_size(path):
     """Return the disk size in bytes of a folder"""
     total_size = 0
-    for base, _dirs, files in os.walk(path):
-        total_size += sum(
-            os.stat(os.path.join(base, f)).st_size
-            for f in files
-            if os.path.isfile(os.path.join(base, f))
-        )
+    directories = [path]
+    while directories:
+        directory = directories.pop()
+        try:
+            files_size, subdirectories = scan_directory(directory)
+        except OSError:
+            continue
+        total_size += files_size
+        directories.extend(os.path.join(directory, name) for name in subdirectories)
     return total_size
 
 
@@ -705,10 +705,10 @@ def _load_vulkan_gpu_name(icd_files, use_dri_prime):
                 logger.warning("vulkaninfo not available, unable to list GPUs")
                 return _("Unknown GPU")
 
-            gpu = fetch_vulkan_gpu_name(False)
+            gpu = PROBE_CACHE.get("vulkaninfo:%s" % icd_files, lambda: fetch_vulkan_gpu_name(False))
 
             if use_dri_prime:
-                prime_gpu = fetch_vulkan_gpu_name(True)
+                prime_gpu = PROBE_CACHE.get("vulkaninfo-prime:%s" % icd_files, lambda: fetch_vulkan_gpu_name(True))
                 if prime_gpu != gpu:
                     gpu += _(" (Discrete GPU: %s)") % prime_gpu
 
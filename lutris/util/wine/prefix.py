@@ -1,11 +1,12 @@
 """Wine prefix management"""
 import os
+from contextlib import contextmanager
 
 from lutris.settings import get_lutris_directory_settings, set_lutris_directory_settings
 from lutris.util import joypad, system
 from lutris.util.display import DISPLAY_MANAGER
 from lutris.util.log import logger
-from lutris.util.wine.registry import WineRegistry
+from lutris.util.wine.registry import WineRegistry, WineRegistrySession
 from lutris.util.xdgshortcuts import get_xdg_entry
 
 DESKTOP_KEYS = ["Desktop", "Personal", "My Music", "My Videos", "My Pictures"]
@@ -50,6 +51,7 @@ class WinePrefixManager:
             logger.warning("No path specified for Wine prefix")
         # expanduser() just in case- it should already be expanded.
         self.path = os.path.expanduser(path)
+        self.registry_session = None
 
     def get_user_dir(self, default_user=None):
         user = default_user or os.getenv("USER") or "lutrisuser"
@@ -80,12 +82,13 @@ class WinePrefixManager:
 
     def setup_defaults(self):
         """Sets the defaults for newly created prefixes"""
-        for dll, value in DEFAULT_DLL_OVERRIDES.items():
-            self.override_dll(dll, value)
-        try:
-            self.enable_desktop_disintegration()
-        except Exception as ex:
-            logger.exception("Failed to setup desktop integration, the prefix may not be valid: %s", ex)
+        with self.edit_registry():
+            for dll, value in DEFAULT_DLL_OVERRIDES.items():
+                self.override_dll(dll, value)
+            try:
+                self.enable_desktop_disintegration()
+            except Exception as ex:
+                logger.exception("Failed to setup desktop integration, the prefix may not be valid: %s", ex)
 
     def create_user_symlinks(self):
         """Link together user profiles created by Wine and Proton"""
@@ -113,24 +116,51 @@ class WinePrefixManager:
                 return key[len(prefix) + 1:]
         raise ValueError("The key {} is currently not supported by WinePrefixManager".format(key))
 
+    @contextmanager
+    def edit_registry(self):
+        """Batch the registry reads and edits made inside the block: each registry
+        file is parsed once, and the modified files are written when the block
+        exits, unless it raises."""
+        if self.registry_session:
+            yield self.registry_session
+            return
+        self.registry_session = WineRegistrySession()
+        try:
+            yield self.registry_session
+            self.registry_session.commit()
+        finally:
+            self.registry_session = None
+
+    def get_registry(self, key):
+        """Return the registry holding a key, shared with the current edit_registry() block if any"""
+        reg_filename = self.get_registry_path(key)
+        if self.registry_session:
+            return self.registry_session.get_registry(reg_filename)
+        return WineRegistry(reg_filename, lazy=True)
+
+    def save_registry(self, registry):
+        """Save a modified registry, unless the edit_registry() block will"""
+        if registry.dirty_keys and not self.registry_session:
+            registry.save()
+
     def get_registry_key(self, key, subkey):
-        registry = WineRegistry(self.get_registry_path(key))
+        registry = self.get_registry(key)
         return registry.query(self.get_key_path(key), subkey)
 
     def set_registry_key(self, key, subkey, value):
-        registry = WineRegistry(self.get_registry_path(key))
+        registry = self.get_registry(key)
         registry.set_value(self.get_key_path(key), subkey, value)
-        registry.save()
+        self.save_registry(registry)
 
     def clear_registry_key(self, key):
-        registry = WineRegistry(self.get_registry_path(key))
+        registry = self.get_registry(key)
         registry.clear_key(self.get_key_path(key))
-        registry.save()
+        self.save_registry(registry)
 
     def clear_registry_subkeys(self, key, subkeys):
-        registry = WineRegistry(self.get_registry_path(key))
+        registry = self.get_registry(key)
         registry.clear_subkeys(self.get_key_path(key), subkeys)
-        registry.save()
+        self.save_registry(registry)
 
     def override_dll(self, dll, mode):
         key = self.hkcu_prefix + "/Software/Wine/DllOverrides"
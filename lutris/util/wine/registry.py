@@ -1,4 +1,5 @@
 """Manipulate Wine registry files"""
+import mmap
 import os
 import re
 from collections import OrderedDict
@@ -28,6 +29,14 @@ DATA_TYPES = {
     "dword": REG_DWORD,
 }
 
+# Separates the name of a key from its timestamp in a key definition line
+KEY_DEF_SEPARATOR = re.compile(r"(?<=[^\\]\]) ")
+
+
+def get_key_name(raw_name):
+    """Return the path of a key from its bracketed name in a .reg file"""
+    return raw_name.replace("\\\\", "/").strip("[]")
+
 
 class WindowsFileTime:
 
@@ -74,12 +83,23 @@ class WineRegistry:
     version_header = "WINE REGISTRY Version "
     relative_to_header = ";; All keys relative to "
 
-    def __init__(self, reg_filename=None):
+    def __init__(self, reg_filename=None, lazy=False):
+        """In lazy mode, the file is only scanned for the position of its keys;
+        keys are parsed when queried or modified, and the unchanged parts of
+        the file are copied as is when saving. `keys` then only holds the keys
+        parsed so far, and the file header is never rewritten."""
         self.arch = WINE_DEFAULT_ARCH
         self.version = 2
         self.relative_to = "\\\\User\\\\S-1-5-21-0-0-0-1000"
         self.keys = OrderedDict()
         self.reg_filename = reg_filename
+        self.lazy = lazy
+        # Names of the keys changed since the registry was loaded or saved
+        self.dirty_keys = set()
+        # In lazy mode, the contents of the file and the (start, end) offsets
+        # of each key in it, in file order
+        self.content = b""
+        self.key_offsets = OrderedDict()
         if reg_filename:
             if not system.path_exists(reg_filename):
                 logger.error("No registry file at %s", reg_filename)
@@ -110,14 +130,58 @@ class WineRegistry:
         return registry_content
 
     def parse_reg_file(self, reg_filename):
-        registry_lines = self.get_raw_registry(reg_filename)
+        if self.lazy:
+            self.index_reg_file(reg_filename)
+            return
+        self.parse_lines(line.rstrip("\n") for line in self.get_raw_registry(reg_filename))
+
+    def index_reg_file(self, reg_filename):
+        """Map a registry file in memory and record where each of its keys is"""
+        self.close()
+        self.key_offsets = OrderedDict()
+        if not system.path_exists(reg_filename):
+            return
+        with open(reg_filename, "rb") as reg_file:
+            try:
+                self.content = mmap.mmap(reg_file.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                # Empty files can't be mapped
+                self.content = b""
+        content = self.content
+        start = 0 if content[:1] == b"[" else content.find(b"\n[") + 1 or len(content)
+        self.parse_lines(content[:start].decode("utf-8").split("\n"))
+        while start < len(content):
+            end = content.find(b"\n[", start) + 1 or len(content)
+            line_end = content.find(b"\n", start, end)
+            key_def = content[start:end if line_end == -1 else line_end].decode("utf-8")
+            raw_name = KEY_DEF_SEPARATOR.split(key_def, maxsplit=1)[0]
+            self.key_offsets[get_key_name(raw_name)] = (start, end)
+            start = end
+
+    def close(self):
+        """Release the file mapped by a lazy registry"""
+        if isinstance(self.content, mmap.mmap):
+            self.content.close()
+        self.content = b""
+
+    def get_key(self, path):
+        """Return the key at `path`, parsing it first in lazy mode"""
+        key = self.keys.get(path)
+        if key is None and path in self.key_offsets:
+            start, end = self.key_offsets[path]
+            self.parse_lines(self.content[start:end].decode("utf-8").split("\n"))
+            key = self.keys.get(path)
+        return key
+
+    def parse_lines(self, registry_lines):
         current_key = None
         add_next_to_value = False
         additional_values = []
         for line in registry_lines:
-            line = line.rstrip("\n")
-
             if line.startswith("["):
+                if additional_values:
+                    current_key.add_to_last("\n".join(additional_values))
+                    additional_values = []
                 current_key = WineRegistryKey(key_def=line)
                 self.keys[current_key.name] = current_key
             elif current_key:
@@ -136,15 +200,40 @@ class WineRegistry:
                 self.relative_to = line[len(self.relative_to_header):]
             elif line.startswith("#arch"):
                 self.arch = line.split("=")[1]
+        if additional_values:
+            current_key.add_to_last("\n".join(additional_values))
 
     def render(self):
-        content = "{}{}\n".format(self.version_header, self.version)
-        content += "{}{}\n\n".format(self.relative_to_header, self.relative_to)
-        content += "#arch={}\n".format(self.arch)
-        for key in self.keys:
-            content += "\n"
-            content += self.keys[key].render()
-        return content
+        if self.lazy:
+            return b"".join(self.render_lazy()).decode("utf-8")
+        parts = [
+            "{}{}\n".format(self.version_header, self.version),
+            "{}{}\n\n".format(self.relative_to_header, self.relative_to),
+            "#arch={}\n".format(self.arch),
+        ]
+        for key in self.keys.values():
+            parts.append("\n")
+            parts.append(key.render())
+        return "".join(parts)
+
+    def render_lazy(self):
+        """Generate the contents of a lazy registry as chunks of bytes: runs of
+        unchanged keys are copied from the file, modified keys are rendered."""
+        content = self.content
+        copy_start = 0
+        for name, (start, end) in self.key_offsets.items():
+            if name not in self.dirty_keys:
+                continue
+            yield content[copy_start:start]
+            raw_key = content[start:end]
+            yield self.keys[name].render().encode("utf-8")
+            # Keep the blank lines following the key
+            yield raw_key[len(raw_key.rstrip(b"\n")) + 1:]
+            copy_start = end
+        yield content[copy_start:]
+        for name, key in self.keys.items():
+            if name not in self.key_offsets:
+                yield ("\n" + key.render()).encode("utf-8")
 
     def save(self, path=None):
         """Write the registry to a file"""
@@ -158,38 +247,54 @@ class WineRegistry:
                 "Invalid Wine prefix path %s, make sure to "
                 "create the prefix before saving to a registry" % prefix_path
             )
-        with open(path, "w", encoding='utf-8') as registry_file:
-            registry_file.write(self.render())
+        # Write to a temporary file first so that the registry is never left half written
+        temp_path = path + ".tmp"
+        if self.lazy:
+            with open(temp_path, "wb") as registry_file:
+                registry_file.writelines(self.render_lazy())
+        else:
+            with open(temp_path, "w", encoding='utf-8') as registry_file:
+                registry_file.write(self.render())
+        os.replace(temp_path, path)
+        self.dirty_keys.clear()
+        if self.lazy and path == self.reg_filename:
+            # The offsets of the keys after the modified ones have moved
+            self.index_reg_file(path)
 
     def query(self, path, subkey):
-        key = self.keys.get(path)
+        key = self.get_key(path)
         if key:
             return key.get_subkey(subkey)
         return
 
     def set_value(self, path, subkey, value):
-        key = self.keys.get(path)
+        key = self.get_key(path)
         if not key:
             key = WineRegistryKey(path=path)
             self.keys[key.name] = key
-        key.set_subkey(subkey, value)
+            self.dirty_keys.add(key.name)
+        if key.subkeys.get(subkey) != key.render_value(value):
+            key.set_subkey(subkey, value)
+            self.dirty_keys.add(key.name)
 
     def clear_key(self, path):
         """Removes all subkeys from a key"""
-        key = self.keys.get(path)
-        if not key:
+        key = self.get_key(path)
+        if not key or not key.subkeys:
             return
         key.subkeys.clear()
+        self.dirty_keys.add(key.name)
 
     def clear_subkeys(self, path, keys):
         """Remove some subkeys from a key"""
-        key = self.keys.get(path)
+        key = self.get_key(path)
         if not key:
             return
         for subkey in list(key.subkeys.keys()):
             if subkey not in keys:
                 continue
             key.subkeys.pop(subkey)
+            self.dirty_keys.add(key.name)
 
     def get_unix_path(self, windows_path):
         windows_path = windows_path.replace("\\", "/")
@@ -212,6 +317,25 @@ class WineRegistry:
         return os.path.join(drive_path, relpath)
 
 
+class WineRegistrySession:
+    """Reads and edits spanning several registry files: each file is parsed
+    once, and only the files that changed are written back by commit()."""
+
+    def __init__(self):
+        self.registries = OrderedDict()
+
+    def get_registry(self, reg_filename):
+        if reg_filename not in self.registries:
+            self.registries[reg_filename] = WineRegistry(reg_filename, lazy=True)
+        return self.registries[reg_filename]
+
+    def commit(self):
+        """Save the modified registries"""
+        for registry in self.registries.values():
+            if registry.dirty_keys:
+                registry.save()
+
+
 class WineRegistryKey:
 
     def __init__(self, key_def=None, path=None):
@@ -230,8 +354,8 @@ class WineRegistryKey:
             self.metas["time"] = windows_timestamp.to_hex()
         else:
             # Existing key loaded from file
-            self.raw_name, self.raw_timestamp = re.split(re.compile(r"(?<=[^\\]\]) "), key_def, maxsplit=1)
-            self.name = self.raw_name.replace("\\\\", "/").strip("[]")
+            self.raw_name, self.raw_timestamp = KEY_DEF_SEPARATOR.split(key_def, maxsplit=1)
+            self.name = get_key_name(self.raw_name)
 
         # Parse timestamp either as int or float
         ts_parts = self.raw_timestamp.strip().split()
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""Compare downloading a collection of small files one at a time with downloading
+them in parallel, from a local HTTP server, with their checksums verified.
+
+Usage: tests/benchmarks/collection_download.py [file_count] [file_size] [workers] [latency_ms]
+
+The latency is added by the server before each response, to stand for the
+round trip to a CDN; the default of 0 only measures the local overhead.
+"""
+import hashlib
+import os
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from lutris.util.collection_downloader import CollectionDownloader  # noqa: E402
+
+
+class FileRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # The headers and the body are sent separately, Nagle's algorithm would
+    # hold the body until the client acknowledges the headers.
+    disable_nagle_algorithm = True
+
+    def log_message(self, *args):  # pylint: disable=arguments-differ
+        pass
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        if self.server.latency:
+            time.sleep(self.server.latency)
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(self.server.content)))
+        self.end_headers()
+        self.wfile.write(self.server.content)
+
+
+def run(server, file_count, workers, dest_dir):
+    checksum = "sha256:%s" % hashlib.sha256(server.content).hexdigest()
+    files = [
+        SimpleNamespace(
+            url="http://127.0.0.1:%s/file%s" % (server.server_port, index),
+            dest_file=os.path.join(dest_dir, "file%s" % index),
+            referer=None,
+            size=len(server.content),
+            checksum=checksum,
+        )
+        for index in range(file_count)
+    ]
+    collection_downloader = CollectionDownloader(files, workers=workers)
+    start = time.perf_counter()
+    collection_downloader.start()
+    collection_downloader.join()
+    return time.perf_counter() - start
+
+
+def main():
+    file_count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    file_size = int(sys.argv[2]) if len(sys.argv) > 2 else 4096
+    workers = int(sys.argv[3]) if len(sys.argv) > 3 else 8
+    latency = int(sys.argv[4]) / 1000 if len(sys.argv) > 4 else 0
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FileRequestHandler)
+    server.content = os.urandom(file_size)
+    server.latency = latency
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        for label, worker_count in (("serial", 1), ("parallel", workers)):
+            with tempfile.TemporaryDirectory() as dest_dir:
+                elapsed = run(server, file_count, worker_count, dest_dir)
+            print("%-8s %6d files in %.3fs (%.0f files/s)" % (label, file_count, elapsed, file_count / elapsed))
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
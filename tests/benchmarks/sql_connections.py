@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""Compare the legacy connect-per-query database access with the pooled connections
+of lutris.database.sql, with several threads reading while one thread writes.
+
+Usage: tests/benchmarks/sql_connections.py [game_count] [reader_threads] [queries_per_thread]
+"""
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from lutris.database import schema, sql  # noqa: E402
+
+LEGACY_LOCK = threading.RLock()
+
+
+def legacy_query(db_path, query, params=()):
+    """What every query used to do: connect, lock, execute, commit and close"""
+    db_conn = sqlite3.connect(db_path)
+    cursor = db_conn.cursor()
+    if not LEGACY_LOCK.acquire(timeout=1):  # pylint: disable=consider-using-with
+        db_conn.close()
+        return None
+    cursor.execute(query, params)
+    LEGACY_LOCK.release()
+    rows = cursor.fetchall()
+    db_conn.commit()
+    db_conn.close()
+    return rows
+
+
+def legacy_update(db_path, query, params=()):
+    legacy_query(db_path, query, params)
+
+
+def pooled_query(db_path, query, params=()):
+    return sql.db_query(db_path, query, params)
+
+
+def pooled_update(db_path, query, params=()):
+    with sql.db_cursor(db_path) as cursor:
+        cursor.execute(query, params)
+
+
+def create_database(db_path, game_count):
+    fields = ", ".join(schema.field_to_string(**field) for field in schema.DATABASE["games"])
+    with sql.db_transaction(db_path) as cursor:
+        cursor.execute("CREATE TABLE games (%s)" % fields)
+        cursor.executemany(
+            "INSERT INTO games (name, slug, runner, installed) VALUES (?, ?, ?, ?)",
+            [("Game %s" % i, "game-%s" % i, "wine", i % 2) for i in range(game_count)]
+        )
+    sql.close_connections(db_path)
+
+
+def run(db_path, query_func, update_func, game_count, reader_count, query_count):
+    dropped = []
+    stop_writer = threading.Event()
+
+    def reader(offset):
+        for index in range(query_count):
+            slug = "game-%s" % ((offset * query_count + index) % game_count)
+            if query_func(db_path, "SELECT * FROM games WHERE slug=?", (slug,)) is None:
+                dropped.append(slug)
+
+    def writer():
+        index = 0
+        while not stop_writer.is_set():
+            update_func(db_path, "UPDATE games SET lastplayed=? WHERE id=?", (int(time.time()), index % game_count + 1))
+            index += 1
+
+    writer_thread = threading.Thread(target=writer)
+    readers = [threading.Thread(target=reader, args=(i,)) for i in range(reader_count)]
+    start = time.perf_counter()
+    writer_thread.start()
+    for thread in readers:
+        thread.start()
+    for thread in readers:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    stop_writer.set()
+    writer_thread.join()
+    return elapsed, len(dropped)
+
+
+def main():
+    game_count = int(sys.argv[1]) if len(sys.argv) > 1 else 15000
+    reader_count = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+    query_count = int(sys.argv[3]) if len(sys.argv) > 3 else 500
+    with tempfile.TemporaryDirectory() as temp_dir:
+        db_path = os.path.join(temp_dir, "pga.db")
+        create_database(db_path, game_count)
+        for label, query_func, update_func in (
+            ("legacy", legacy_query, legacy_update),
+            ("pooled", pooled_query, pooled_update),
+        ):
+            elapsed, dropped = run(db_path, query_func, update_func, game_count, reader_count, query_count)
+            total = reader_count * query_count
+            print("%-8s %6d queries in %.3fs (%.0f queries/s, %d dropped)" % (
+                label, total, elapsed, total / elapsed, dropped
+            ))
+        sql.close_connections()
+
+
+if __name__ == "__main__":
+    main()
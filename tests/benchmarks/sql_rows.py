@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""Compare the time and peak memory used to load a large games table as a list
+of dicts, as a list of records and as a stream of records.
+
+Usage: tests/benchmarks/sql_rows.py [game_count]
+"""
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from lutris.database import schema, sql  # noqa: E402
+
+
+def create_database(db_path, game_count):
+    fields = ", ".join(schema.field_to_string(**field) for field in schema.DATABASE["games"])
+    with sql.db_transaction(db_path) as cursor:
+        cursor.execute("CREATE TABLE games (%s)" % fields)
+        cursor.executemany(
+            "INSERT INTO games (name, slug, runner, platform, directory, installed, playtime) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            [
+                ("Game %s" % i, "game-%s" % i, "wine", "Windows", "/home/user/Games/game-%s" % i, i % 2, i / 7)
+                for i in range(game_count)
+            ]
+        )
+
+
+def load_dicts(db_path):
+    return len(sql.filtered_query(db_path, "games"))
+
+
+def load_records(db_path):
+    return len(list(sql.iter_filtered_query(db_path, "games")))
+
+
+def stream_records(db_path):
+    return sum(1 for _record in sql.iter_filtered_query(db_path, "games"))
+
+
+def main():
+    game_count = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    with tempfile.TemporaryDirectory() as temp_dir:
+        db_path = os.path.join(temp_dir, "pga.db")
+        create_database(db_path, game_count)
+        for label, loader in (
+            ("dicts", load_dicts),
+            ("records", load_records),
+            ("stream", stream_records),
+        ):
+            tracemalloc.start()
+            start = time.perf_counter()
+            row_count = loader(db_path)
+            elapsed = time.perf_counter() - start
+            _current, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            print("%-8s %6d rows in %.3fs, peak memory %.1f MiB" % (label, row_count, elapsed, peak / 1024 / 1024))
+        sql.close_connections()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""Time the startup phases of Lutris, up to the startup checks, with empty
+configuration and cache folders, and fail if a phase takes longer than its
+budget in startup_budget.json.
+
+Usage: tests/benchmarks/startup.py [--save-budget] [trace_path]
+
+--save-budget replaces the budget with three times the measured durations.
+The timeline is saved as a Chrome trace to trace_path if given.
+"""
+import json
+import math
+import os
+import sys
+import tempfile
+
+BUDGET_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "startup_budget.json")
+BUDGET_MARGIN = 3
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from lutris.util.profiling import STARTUP_TIMELINE, phase  # noqa: E402
+
+
+def run_startup(home_dir):
+    for variable in ("XDG_CONFIG_HOME", "XDG_DATA_HOME", "XDG_CACHE_HOME"):
+        os.environ[variable] = os.path.join(home_dir, variable.lower())
+    STARTUP_TIMELINE.start()
+    with phase("imports"):
+        from lutris.gui import application  # noqa: F401 pylint: disable=unused-import
+        from lutris.startup import init_lutris, run_all_checks
+    with phase("init_lutris"):
+        init_lutris()
+    with phase("run_all_checks"):
+        run_all_checks()
+    return STARTUP_TIMELINE.get_durations()
+
+
+def main():
+    args = sys.argv[1:]
+    save_budget = "--save-budget" in args
+    args = [arg for arg in args if arg != "--save-budget"]
+    with tempfile.TemporaryDirectory() as home_dir:
+        durations = run_startup(home_dir)
+    if args:
+        STARTUP_TIMELINE.save(args[0])
+
+    if save_budget:
+        budget = {name: math.ceil(duration * BUDGET_MARGIN / 10) * 10 for name, duration in durations.items()}
+        with open(BUDGET_PATH, "w", encoding="utf-8") as budget_file:
+            json.dump(budget, budget_file, indent=2)
+            budget_file.write("\n")
+    with open(BUDGET_PATH, encoding="utf-8") as budget_file:
+        budget = json.load(budget_file)
+
+    over_budget = []
+    for name, duration in durations.items():
+        limit = budget.get(name)
+        print("%-24s %8.1fms / %sms" % (name, duration, limit if limit is not None else "-"))
+        if limit is not None and duration > limit:
+            over_budget.append(name)
+    if over_budget:
+        print("Over budget: %s" % ", ".join(over_budget))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
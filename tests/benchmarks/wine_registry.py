@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""Compare applying a set of registry edits one file parse and write per edit,
+as the prefix manager used to do, with a single registry session, and reading
+a single value with a fully parsed and a lazy registry.
+
+Usage: tests/benchmarks/wine_registry.py [size_in_mib]
+"""
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from lutris.util.wine.registry import WineRegistry, WineRegistrySession  # noqa: E402
+
+# Similar to what set_regedit_keys() does at each launch
+EDITS = [
+    ("Software/Wine/Direct3D", "renderer", "vulkan"),
+    ("Software/Wine/Direct3D", "OffscreenRenderingMode", "fbo"),
+    ("Software/Wine/Direct3D", "VideoMemorySize", 4096),
+    ("Software/Wine/DirectSound", "DefaultSampleRate", "48000"),
+    ("Software/Wine/Drivers", "Audio", "pulse"),
+    ("Software/Wine/X11 Driver", "GrabFullscreen", "Y"),
+    ("Software/Wine/X11 Driver", "UseTakeFocus", "N"),
+    ("Software/Wine/WineDbg", "ShowCrashDialog", 0),
+    ("Software/Wine/Explorer", "Desktop", "WineDesktop"),
+    ("Software/Wine/Explorer/Desktops", "WineDesktop", "1920x1080"),
+    ("Software/Wine/Fonts", "LogPixels", 96),
+    ("Control Panel/Desktop", "LogPixels", 96),
+]
+
+
+def create_registry(path, size):
+    with open(path, "w", encoding="utf-8") as reg_file:
+        reg_file.write(
+            "WINE REGISTRY Version 2\n"
+            ";; All keys relative to \\\\User\\\\S-1-5-21-0-0-0-1000\n"
+            "\n"
+            "#arch=win64\n"
+        )
+        index = 0
+        while reg_file.tell() < size:
+            reg_file.write(
+                "\n[Software\\\\Vendor%s\\\\Application\\\\Settings] 1477412318\n"
+                "#time=1d22edb71813e3c\n"
+                "\"InstallPath\"=\"C:\\\\Program Files\\\\Vendor%s\\\\Application\"\n"
+                "\"Version\"=dword:%08x\n"
+                "\"Data\"=hex:00,01,02,03,04,05,06,07,08,09,0a,0b,0c,0d,0e,0f,\\\n"
+                "  10,11,12,13,14,15,16,17,18,19,1a,1b,1c,1d,1e,1f\n" % (index, index, index)
+            )
+            index += 1
+
+
+def edit_per_call(path):
+    for key, subkey, value in EDITS:
+        registry = WineRegistry(path)
+        registry.set_value(key, subkey, value)
+        registry.save()
+
+
+def edit_in_session(path):
+    session = WineRegistrySession()
+    for key, subkey, value in EDITS:
+        session.get_registry(path).set_value(key, subkey, value)
+    session.commit()
+
+
+def query_eager(path):
+    WineRegistry(path).query(*EDITS[0][:2])
+
+
+def query_lazy(path):
+    WineRegistry(path, lazy=True).query(*EDITS[0][:2])
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = os.path.join(temp_dir, "user.reg")
+        create_registry(path, size * 1024 * 1024)
+        for label, edit in (("per call", edit_per_call), ("session", edit_in_session)):
+            start = time.perf_counter()
+            edit(path)
+            print("%-8s %d edits in %.3fs" % (label, len(EDITS), time.perf_counter() - start))
+        # Nothing changes the second time, the session doesn't write the file
+        start = time.perf_counter()
+        edit_in_session(path)
+        print("%-8s %d edits in %.3fs (unchanged)" % ("session", len(EDITS), time.perf_counter() - start))
+        for label, query in (("eager", query_eager), ("lazy", query_lazy)):
+            start = time.perf_counter()
+            query(path)
+            print("%-8s 1 query in %.3fs" % (label, time.perf_counter() - start))
+
+
+if __name__ == "__main__":
+    main()
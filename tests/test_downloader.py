@@ -0,0 +1,343 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+from unittest import TestCase
+from unittest.mock import patch
+
+from lutris.util import download_scheduler, downloader
+from lutris.util.collection_downloader import CollectionDownloader
+from lutris.util.download_scheduler import DownloadScheduler
+from lutris.util.downloader import DownloadError, Downloader
+
+
+class RangeRequestHandler(BaseHTTPRequestHandler):
+    """Serves the server's content, supporting range requests"""
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):  # pylint: disable=arguments-differ
+        pass
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        server = self.server
+        content = server.content
+        range_header = self.headers.get("Range")
+        server.ranges.append(range_header)
+        first_byte, last_byte = 0, len(content) - 1
+        status = 200
+        if range_header and self.headers.get("If-Range", server.etag) == server.etag:
+            first_text, last_text = range_header[len("bytes="):].split("-")
+            first_byte = int(first_text)
+            if last_text:
+                last_byte = int(last_text)
+            status = 206
+        body = content[first_byte:last_byte + 1]
+        self.send_response(status)
+        self.send_header("Content-Length", str(len(body)))
+        if server.etag:
+            self.send_header("ETag", server.etag)
+            self.send_header("Accept-Ranges", "bytes")
+        if status == 206:
+            self.send_header("Content-Range", "bytes %s-%s/%s" % (first_byte, last_byte, len(content)))
+        self.end_headers()
+        if server.truncate_at is not None:
+            # Simulate a dropped connection
+            body = body[:server.truncate_at]
+            server.truncate_at = None
+            self.close_connection = True
+        try:
+            self.wfile.write(body)
+        except ConnectionError:
+            pass
+
+
+class FilesRequestHandler(BaseHTTPRequestHandler):
+    """Serves the server's files, failing the first requests of some of them"""
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):  # pylint: disable=arguments-differ
+        pass
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        server = self.server
+        with server.lock:
+            server.request_count += 1
+            failures = server.failures.get(self.path, 0)
+            if failures:
+                server.failures[self.path] = failures - 1
+        body = server.files.get(self.path)
+        status = 500 if failures else 200 if body is not None else 404
+        body = body if status == 200 else b""
+        self.send_response(status)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class TestDownloader(TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.dest = os.path.join(self.temp_dir.name, "installer.bin")
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), RangeRequestHandler)
+        self.server.content = os.urandom(3 * downloader.CHUNK_SIZE + 1234)
+        self.server.etag = '"v1"'
+        self.server.truncate_at = None
+        self.server.ranges = []
+        self.url = "http://127.0.0.1:%s/installer.bin" % self.server.server_port
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.temp_dir.cleanup()
+
+    def download(self, **kwargs):
+        file_downloader = Downloader(self.url, self.dest, overwrite=True, **kwargs)
+        file_downloader.start()
+        return file_downloader.join()
+
+    def read_dest(self):
+        with open(self.dest, "rb") as dest_file:
+            return dest_file.read()
+
+    def interrupt_download(self):
+        self.server.truncate_at = 2 * downloader.CHUNK_SIZE + 512
+        with self.assertRaises(Exception):
+            self.download()
+        self.assertFalse(os.path.exists(self.dest))
+        with open(self.dest + ".part.json", encoding="utf-8") as state_file:
+            return json.load(state_file)["segments"][0][2]
+
+    def test_download(self):
+        self.assertTrue(self.download())
+        self.assertEqual(self.read_dest(), self.server.content)
+        self.assertFalse(os.path.exists(self.dest + ".part"))
+        self.assertFalse(os.path.exists(self.dest + ".part.json"))
+
+    def test_resume_after_interruption(self):
+        position = self.interrupt_download()
+        self.assertGreater(position, 0)
+        self.assertTrue(self.download())
+        self.assertEqual(self.server.ranges[-1], "bytes=%s-" % position)
+        self.assertEqual(self.read_dest(), self.server.content)
+
+    def assert_no_partial_files(self):
+        self.assertEqual(os.listdir(self.temp_dir.name), [])
+
+    def test_cancelled_download_without_resume_is_removed(self):
+        self.server.etag = None
+        file_downloader = Downloader(self.url, self.dest, overwrite=True, rate_limit=downloader.CHUNK_SIZE)
+        file_downloader.start()
+        while not file_downloader.downloaded_size:
+            file_downloader.check_progress(blocking=True)
+        file_downloader.cancel()
+        self.assertFalse(file_downloader.join())
+        file_downloader.job.result(timeout=5)
+        self.assert_no_partial_files()
+
+    def test_failed_download_without_resume_is_removed(self):
+        self.server.etag = None
+        self.server.truncate_at = downloader.CHUNK_SIZE
+        with self.assertRaises(Exception):
+            self.download()
+        self.assert_no_partial_files()
+
+    def test_changed_file_is_downloaded_again(self):
+        self.interrupt_download()
+        self.server.content = os.urandom(2 * downloader.CHUNK_SIZE)
+        self.server.etag = '"v2"'
+        self.assertTrue(self.download())
+        self.assertEqual(self.read_dest(), self.server.content)
+
+    def test_segmented_download(self):
+        min_segment_size = downloader.MIN_SEGMENT_SIZE
+        downloader.MIN_SEGMENT_SIZE = downloader.CHUNK_SIZE
+        try:
+            self.assertTrue(self.download(segments=3))
+        finally:
+            downloader.MIN_SEGMENT_SIZE = min_segment_size
+        self.assertEqual(len(self.server.ranges), 3)
+        self.assertEqual(self.read_dest(), self.server.content)
+
+    def test_checksum_is_verified(self):
+        checksum = "sha256:%s" % hashlib.sha256(self.server.content).hexdigest()
+        self.assertTrue(self.download(checksum=checksum))
+        self.assertEqual(self.read_dest(), self.server.content)
+
+    def test_checksum_type_is_case_insensitive(self):
+        checksum = "SHA256:%s" % hashlib.sha256(self.server.content).hexdigest().upper()
+        self.assertTrue(self.download(checksum=checksum))
+        self.interrupt_download()
+        self.assertTrue(self.download(checksum=checksum))
+
+    def test_checksum_mismatch(self):
+        with self.assertRaises(DownloadError):
+            self.download(checksum="sha256:%s" % hashlib.sha256(b"other").hexdigest())
+        self.assertFalse(os.path.exists(self.dest))
+        self.assertFalse(os.path.exists(self.dest + ".part"))
+
+    def test_checksum_of_resumed_download(self):
+        self.interrupt_download()
+        checksum = "sha256:%s" % hashlib.sha256(self.server.content).hexdigest()
+        self.assertTrue(self.download(checksum=checksum))
+
+    def test_rate_limit(self):
+        rate_limiter = downloader.RateLimiter(10 * downloader.CHUNK_SIZE)
+        start_time = downloader.get_time()
+        for _i in range(3):
+            rate_limiter.consume(downloader.CHUNK_SIZE)
+        self.assertGreaterEqual(downloader.get_time() - start_time, 0.29)
+
+
+class TestDownloadScheduler(TestCase):
+    def setUp(self):
+        self.scheduler = DownloadScheduler(max_connections=1)
+        self.release = threading.Event()
+        self.order = []
+        # Occupies the only connection until released
+        self.blocker = self.scheduler.submit(self.release.wait, url="http://blocker/")
+
+    def record(self, name):
+        self.order.append(name)
+
+    def run_jobs(self):
+        self.release.set()
+        self.blocker.result(timeout=5)
+
+    def test_priorities(self):
+        futures = [
+            self.scheduler.submit(self.record, "media", priority=download_scheduler.PRIORITY_MEDIA),
+            self.scheduler.submit(self.record, "runtime", priority=download_scheduler.PRIORITY_RUNTIME),
+            self.scheduler.submit(self.record, "installer", priority=download_scheduler.PRIORITY_INSTALLER),
+        ]
+        self.run_jobs()
+        for future in futures:
+            future.result(timeout=5)
+        self.assertEqual(self.order, ["installer", "runtime", "media"])
+
+    def test_hosts_are_served_fairly(self):
+        futures = [
+            self.scheduler.submit(self.record, name, url="https://%s.example.com/" % name[0])
+            for name in ("a1", "a2", "a3", "b1")
+        ]
+        self.run_jobs()
+        for future in futures:
+            future.result(timeout=5)
+        self.assertEqual(self.order, ["a1", "b1", "a2", "a3"])
+
+    def test_connections_per_host(self):
+        self.run_jobs()
+        scheduler = DownloadScheduler(max_connections=4, max_connections_per_host=2)
+        lock = threading.Lock()
+        connections = [0]
+        max_connections = [0]
+
+        def connect():
+            with lock:
+                connections[0] += 1
+                max_connections[0] = max(max_connections[0], connections[0])
+            time.sleep(0.02)
+            with lock:
+                connections[0] -= 1
+
+        futures = scheduler.map(lambda _i: connect(), range(8), url=lambda _i: "https://cdn.example.com/")
+        self.assertTrue(all(future.done() for future in futures))
+        self.assertEqual(max_connections[0], 2)
+        self.assertEqual(scheduler.get_stats()["completed"], 8)
+
+    def test_stats_of_some_priorities(self):
+        while not self.blocker.running():
+            time.sleep(0.01)
+        self.scheduler.submit(self.record, "installer", priority=download_scheduler.PRIORITY_INSTALLER)
+        stats = self.scheduler.get_stats(download_scheduler.BACKGROUND_PRIORITIES)
+        self.assertEqual((stats["active"], stats["queued"]), (1, 0))
+        stats = self.scheduler.get_stats()
+        self.assertEqual((stats["active"], stats["queued"]), (1, 1))
+        self.run_jobs()
+
+    def test_listeners_are_called_when_their_jobs_start(self):
+        calls = []
+        self.scheduler.add_listener(lambda: calls.append("installer"), (download_scheduler.PRIORITY_INSTALLER, ))
+        self.scheduler.add_listener(lambda: calls.append("media"), (download_scheduler.PRIORITY_MEDIA, ))
+        self.scheduler.submit(self.record, "installer", priority=download_scheduler.PRIORITY_INSTALLER)
+        self.scheduler.submit(self.record, "installer", priority=download_scheduler.PRIORITY_INSTALLER)
+        self.scheduler.submit(self.record, "media", priority=download_scheduler.PRIORITY_MEDIA)
+        self.run_jobs()
+        # The blocker is a media job, so media listeners were not idle
+        self.assertEqual(calls, ["installer"])
+
+
+class TestCollectionDownloader(TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), FilesRequestHandler)
+        self.server.files = {"/file%s" % index: os.urandom(100 + index) for index in range(20)}
+        self.server.failures = {}
+        self.server.request_count = 0
+        self.server.lock = threading.Lock()
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.temp_dir.cleanup()
+
+    def get_files(self):
+        return [
+            SimpleNamespace(
+                url="http://127.0.0.1:%s%s" % (self.server.server_port, path),
+                dest_file=os.path.join(self.temp_dir.name, path[1:]),
+                referer=None,
+                size=len(content),
+                checksum="sha256:%s" % hashlib.sha256(content).hexdigest(),
+            )
+            for path, content in self.server.files.items()
+        ]
+
+    def assert_downloaded(self):
+        for path, content in self.server.files.items():
+            with open(os.path.join(self.temp_dir.name, path[1:]), "rb") as dest_file:
+                self.assertEqual(dest_file.read(), content)
+
+    def test_download(self):
+        files = self.get_files()
+        collection_downloader = CollectionDownloader(files, workers=4)
+        collection_downloader.start()
+        self.assertTrue(collection_downloader.join())
+        self.assert_downloaded()
+        self.assertEqual(collection_downloader.num_files_downloaded, 20)
+        self.assertEqual(collection_downloader.downloaded_size, collection_downloader.full_size)
+        self.assertEqual(collection_downloader.check_progress(), 1)
+
+    def test_failed_files_are_retried(self):
+        self.server.failures = {"/file3": 2, "/file7": 1}
+        files = self.get_files()
+        collection_downloader = CollectionDownloader(files, workers=4, retry_delay=0.01)
+        collection_downloader.start()
+        self.assertTrue(collection_downloader.join())
+        self.assert_downloaded()
+        self.assertEqual(collection_downloader.num_retries, 3)
+
+    def test_retry_after_error_skips_downloaded_files(self):
+        self.server.failures = {"/file3": 2}
+        files = self.get_files()
+        collection_downloader = CollectionDownloader(files, workers=1, max_retries=1, retry_delay=0.01)
+        collection_downloader.start()
+        with self.assertRaises(Exception):
+            collection_downloader.join()
+        self.assertEqual(collection_downloader.state, collection_downloader.ERROR)
+        request_count = self.server.request_count
+        collection_downloader.start()
+        self.assertTrue(collection_downloader.join())
+        self.assert_downloaded()
+        # Files 0 to 2 were downloaded before the error
+        self.assertEqual(self.server.request_count - request_count, 20 - 3)
+
+    def test_invalid_worker_setting_is_ignored(self):
+        with patch("lutris.util.collection_downloader.read_setting", return_value="many"):
+            collection_downloader = CollectionDownloader(self.get_files())
+        self.assertEqual(collection_downloader.workers, download_scheduler.MAX_CONNECTIONS_PER_HOST)
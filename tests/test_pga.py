@@ -4,7 +4,9 @@ from sqlite3 import OperationalError
 
 from lutris import settings
 from lutris.database import games as games_db
-from lutris.database import schema, sql
+from lutris.database import explain, game_paths, play_sessions, schema, sql
+from lutris.database import tosec as tosec_db
+from lutris.database.services import ServiceGameCollection
 from lutris.util.test_config import setup_test_environment
 
 setup_test_environment()
@@ -45,6 +47,37 @@ class TestPersonnalGameArchive(DatabaseTester):
         self.assertEqual(len(game_list), 1)
         self.assertEqual(game_list[0]['name'], 'bang')
 
+    def test_text_search(self):
+        games_db.add_game(name="Half-Life", runner="linux")
+        games_db.add_game(name="Pokémon", runner="linux")
+        games_db.add_game(name="Quake", runner="linux")
+        self.assertEqual([game["name"] for game in games_db.get_games(text_search="lif")], ["Half-Life"])
+        self.assertEqual([game["name"] for game in games_db.get_games(text_search="pokemon")], ["Pokémon"])
+        self.assertEqual(games_db.get_games(text_search="half quake"), [])
+
+    def test_text_search_index_follows_changes(self):
+        game_id = games_db.add_game(name="Quake", runner="linux")
+        sql.db_update(settings.PGA_DB, "games", {"name": "Doom", "slug": "doom"}, {"id": game_id})
+        self.assertEqual(games_db.get_games(text_search="quake"), [])
+        self.assertEqual(len(games_db.get_games(text_search="doom")), 1)
+        games_db.delete_game(game_id)
+        self.assertEqual(games_db.get_games(text_search="doom"), [])
+
+    def test_games_are_records(self):
+        game_id = games_db.add_game(name="LutrisTest", runner="Linux")
+        game = games_db.get_games()[0]
+        self.assertEqual(game["id"], game_id)
+        self.assertEqual(game.get("runner"), "Linux")
+        self.assertIsNone(game.get("notafield"))
+        self.assertIn("slug", game)
+        self.assertEqual(dict(game)["name"], "LutrisTest")
+
+    def test_iter_games_with_fields(self):
+        games_db.add_game(name="foobar", runner="Linux")
+        games_db.add_game(name="bang", runner="Linux")
+        games = list(games_db.iter_games(fields=("slug", )))
+        self.assertEqual([dict(game) for game in games], [{"slug": "bang"}, {"slug": "foobar"}])
+
     def test_can_filter_by_installed_games(self):
         games_db.add_game(name="installed_game", runner="Linux", installed=1)
         games_db.add_game(name="bang", runner="Linux", installed=0)
@@ -60,6 +93,140 @@ class TestPersonnalGameArchive(DatabaseTester):
         game = games_db.get_game_by_field("some-game", "slug")
         self.assertEqual(game['directory'], '/foo')
 
+    def test_add_games_bulk(self):
+        game_ids = games_db.add_games_bulk([
+            {"name": "foo", "slug": "foo", "runner": "linux"},
+            {"name": "bar", "slug": "bar", "runner": "wine"},
+        ])
+        self.assertEqual(len(game_ids), 2)
+        self.assertEqual(games_db.get_game_by_field(game_ids[1], "id")["slug"], "bar")
+
+
+class TestSortKeys(DatabaseTester):
+    def test_sort_key_is_natural_and_ignores_articles(self):
+        self.assertEqual(games_db.get_sort_key("The Witcher 3"), games_db.get_sort_key("witcher 3"))
+        self.assertLess(games_db.get_sort_key("Mega slap battler 3"), games_db.get_sort_key("Mega slap battler 20"))
+        self.assertEqual(games_db.get_sort_key("The"), "the")
+        self.assertEqual(games_db.get_sort_key("The Witcher", sortname="The Witcher"), "the witcher")
+
+    def test_sort_key_follows_name_changes(self):
+        game_id = games_db.add_game(name="Quake 2", runner="linux")
+        games_db.add_games_bulk([{"name": "A Quake 10", "slug": "a-quake-10", "runner": "linux"}])
+        self.assertEqual(games_db.get_game_by_field(game_id, "id")["sort_key"], games_db.get_sort_key("Quake 2"))
+        games_db.update_existing(id=game_id, sortname="Doom")
+        self.assertEqual(games_db.get_game_by_field(game_id, "id")["sort_key"], "doom")
+        games_db.update_existing(id=game_id, sortname="", name="Quake 4")
+        names = [game["name"] for game in games_db.get_games(sorts=[("sort_key", "ASC")])]
+        self.assertEqual(names, ["Quake 4", "A Quake 10"])
+
+    def test_pages_of_sorted_games(self):
+        games_db.add_games_bulk([
+            {"name": "Game %s" % index, "slug": "game-%s" % index, "runner": "linux"}
+            for index in range(12)
+        ])
+        sorts = [("sort_key", "ASC"), ("id", "ASC")]
+        page = games_db.get_games(sorts=sorts, limit=5, offset=10)
+        self.assertEqual([game["name"] for game in page], ["Game 10", "Game 11"])
+        page = games_db.get_games(sorts=sorts, offset=9)
+        self.assertEqual(len(page), 3)
+
+    def test_missing_sort_keys_are_filled_in(self):
+        game_id = games_db.add_game(name="Quake 2", runner="linux")
+        sql.db_update(settings.PGA_DB, "games", {"sort_key": None}, {"id": game_id})
+        schema.syncdb()
+        self.assertEqual(games_db.get_game_by_field(game_id, "id")["sort_key"], games_db.get_sort_key("Quake 2"))
+
+
+class TestServiceGames(DatabaseTester):
+    def test_upsert_updates_existing_games(self):
+        sql.db_upsert_many(settings.PGA_DB, "service_games", [
+            {"service": "gog", "appid": "1", "name": "Foo"},
+            {"service": "gog", "appid": "2", "name": "Bar"},
+        ], conflict_fields=("service", "appid"))
+        sql.db_upsert_many(settings.PGA_DB, "service_games", [
+            {"service": "gog", "appid": "1", "name": "Foo Deluxe"},
+            {"service": "steam", "appid": "1", "name": "Foo"},
+        ], conflict_fields=("service", "appid"))
+        service_games = sql.db_select(settings.PGA_DB, "service_games")
+        self.assertEqual(len(service_games), 3)
+        game = ServiceGameCollection.get_game("gog", "1")
+        self.assertEqual(game["name"], "Foo Deluxe")
+
+    def test_unique_index_removes_duplicates(self):
+        with sql.db_cursor(settings.PGA_DB) as cursor:
+            cursor.execute("DROP INDEX service_games_service_appid")
+        sql.db_insert(settings.PGA_DB, "service_games", {"service": "gog", "appid": "1", "name": "Old"})
+        sql.db_insert(settings.PGA_DB, "service_games", {"service": "gog", "appid": "1", "name": "New"})
+        schema.syncdb()
+        service_games = sql.db_select(settings.PGA_DB, "service_games")
+        self.assertEqual([game["name"] for game in service_games], ["New"])
+
+
+class TestTosecIndex(DatabaseTester):
+    def setUp(self):
+        super().setUp()
+        tosec_db.replace_dat_roms("/dats/genesis.dat", [
+            {"category": "Sega Genesis", "game": "Sonic", "name": "sonic.md",
+             "size": 1, "crc": "01", "md5": "aa", "sha1": "a1"},
+            {"category": "Sega Genesis", "game": "Multi", "name": "multi (disk 1).md",
+             "size": 1, "crc": "02", "md5": "bb", "sha1": "b1"},
+            {"category": "Sega Genesis", "game": "Multi", "name": "multi (disk 2).md",
+             "size": 1, "crc": "03", "md5": "cc", "sha1": "c1"},
+        ])
+
+    def test_get_rom_sets(self):
+        roms = tosec_db.get_rom_sets(["BB", "unknown"])
+        self.assertEqual([rom["name"] for rom in roms], ["multi (disk 1).md", "multi (disk 2).md"])
+        roms = tosec_db.get_rom_sets(["a1"], checksum_type="sha1")
+        self.assertEqual([rom["game"] for rom in roms], ["Sonic"])
+
+    def test_reimport_replaces_roms(self):
+        tosec_db.replace_dat_roms("/dats/genesis.dat", [
+            {"category": "Sega Genesis", "game": "Sonic 2", "name": "sonic2.md",
+             "size": 1, "crc": "04", "md5": "dd", "sha1": "d1"},
+        ])
+        self.assertEqual(tosec_db.get_rom_sets(["aa"]), [])
+        self.assertEqual(tosec_db.get_dats()[0]["roms"], 1)
+
+
+class TestPlaySessions(DatabaseTester):
+    def test_sessions_are_listed_with_their_game(self):
+        game_id = games_db.add_game(name="LutrisTest", runner="Linux")
+        summary = dict.fromkeys(play_sessions.PLAY_SESSION_FIELDS, 1)
+        play_sessions.add_play_session(game_id, dict(summary, started_at=20))
+        play_sessions.add_play_session(game_id, dict(summary, started_at=10))
+        sessions = play_sessions.get_play_sessions(game_id)
+        self.assertEqual([session["started_at"] for session in sessions], [10, 20])
+        self.assertEqual(sessions[0]["slug"], "lutristest")
+        self.assertEqual(play_sessions.get_play_sessions(game_id + 1), [])
+
+
+class TestGamePaths(DatabaseTester):
+    def test_paths_are_updated_per_game(self):
+        game_id = games_db.add_game(name="LutrisTest", runner="linux")
+        other_game_id = games_db.add_game(name="LutrisTest2", runner="linux")
+        self.assertFalse(game_paths.has_game_paths())
+        game_paths.set_game_paths({game_id: "/games/test", other_game_id: "/games/test2"})
+        game_paths.set_game_paths({game_id: "/games/moved"})
+        self.assertEqual(
+            game_paths.get_game_paths(),
+            {str(game_id): "/games/moved", str(other_game_id): "/games/test2"}
+        )
+        game_paths.delete_game_path(other_game_id)
+        self.assertEqual(game_paths.get_game_paths(), {str(game_id): "/games/moved"})
+
+    def test_paths_of_deleted_games_are_ignored(self):
+        game_id = games_db.add_game(name="LutrisTest", runner="linux")
+        game_paths.set_game_paths({game_id: "/games/test"})
+        games_db.delete_game(game_id)
+        self.assertEqual(game_paths.get_game_paths(), {})
+
+
+class TestQueryPlans(DatabaseTester):
+    def test_standard_queries_use_indexes(self):
+        for query_report in explain.explain_standard_queries():
+            self.assertEqual(query_report["unexpected_scans"], [], query_report["query"])
+
 
 class TestDbCreator(DatabaseTester):
     def test_can_generate_fields(self):
@@ -1,7 +1,9 @@
 import os
+import shutil
+import tempfile
 from unittest import TestCase
 
-from lutris.util.wine.registry import WineRegistry, WineRegistryKey
+from lutris.util.wine.registry import WineRegistry, WineRegistryKey, WineRegistrySession
 
 FIXTURES_PATH = os.path.join(os.path.dirname(__file__), 'fixtures')
 
@@ -86,6 +88,105 @@ class TestWineRegistry(TestCase):
         self.registry.clear_key(path)
         self.assertEqual(len(key.subkeys), 0)
 
+    def test_tracks_dirty_keys(self):
+        self.registry.set_value('Control Panel/Desktop', 'DragWidth', '4')
+        self.registry.clear_key('Wine/DX11')
+        self.assertEqual(self.registry.dirty_keys, set())
+        self.registry.set_value('Control Panel/Desktop', 'DragWidth', '8')
+        self.registry.clear_subkeys('Control Panel/Mouse', ['DoubleClickSpeed'])
+        self.assertEqual(self.registry.dirty_keys, {'Control Panel/Desktop', 'Control Panel/Mouse'})
+
+
+class TestLazyWineRegistry(TestCase):
+    def setUp(self):
+        self.prefix_dir = tempfile.TemporaryDirectory()
+        self.registry_path = os.path.join(self.prefix_dir.name, 'system.reg')
+        shutil.copy(os.path.join(FIXTURES_PATH, 'system.reg'), self.registry_path)
+        self.registry = WineRegistry(self.registry_path, lazy=True)
+
+    def tearDown(self):
+        self.registry.close()
+        self.prefix_dir.cleanup()
+
+    def test_only_queried_keys_are_parsed(self):
+        eager_registry = WineRegistry(self.registry_path)
+        self.assertEqual(list(self.registry.key_offsets), list(eager_registry.keys))
+        self.assertEqual(self.registry.keys, {})
+        self.assertEqual(self.registry.version, 2)
+        for path, key in eager_registry.keys.items():
+            self.assertEqual(self.registry.get_key(path).subkeys, key.subkeys)
+
+    def test_unchanged_registry_renders_as_is(self):
+        with open(self.registry_path, 'r') as registry_file:
+            original_content = registry_file.read()
+        self.registry.get_key(next(iter(self.registry.key_offsets)))
+        self.assertEqual(self.registry.render(), original_content)
+
+    def test_saves_like_eager_registry(self):
+        eager_registry = WineRegistry(self.registry_path)
+        paths = list(self.registry.key_offsets)
+        for registry in (eager_registry, self.registry):
+            registry.set_value(paths[1], 'Lutris', 'yes')
+            registry.set_value(paths[-1], 'Lutris', 1)
+        self.registry.save()
+        with open(self.registry_path, 'r') as registry_file:
+            self.assertEqual(registry_file.read(), eager_registry.render())
+        self.assertEqual(self.registry.query(paths[-1], 'Lutris'), 1)
+
+    def test_new_keys_are_appended(self):
+        self.registry.set_value('Software/Lutris', 'Version', '0.5')
+        self.registry.save()
+        registry = WineRegistry(self.registry_path)
+        self.assertEqual(list(registry.keys)[-1], 'Software/Lutris')
+        self.assertEqual(registry.query('Software/Lutris', 'Version'), '0.5')
+        self.assertEqual(self.registry.query('Software/Lutris', 'Version'), '0.5')
+
+
+class TestWineRegistrySession(TestCase):
+    def setUp(self):
+        self.prefix_dir = tempfile.TemporaryDirectory()
+        self.registry_path = os.path.join(self.prefix_dir.name, 'user.reg')
+        shutil.copy(os.path.join(FIXTURES_PATH, 'user.reg'), self.registry_path)
+        with open(self.registry_path, 'r') as registry_file:
+            self.original_content = registry_file.read()
+
+    def tearDown(self):
+        self.prefix_dir.cleanup()
+
+    def read_registry(self):
+        with open(self.registry_path, 'r') as registry_file:
+            return registry_file.read()
+
+    def test_registry_is_parsed_once(self):
+        session = WineRegistrySession()
+        registry = session.get_registry(self.registry_path)
+        self.assertIs(session.get_registry(self.registry_path), registry)
+
+    def test_edits_are_written_on_commit(self):
+        session = WineRegistrySession()
+        session.get_registry(self.registry_path).set_value('Control Panel/Desktop', 'DragWidth', '8')
+        session.get_registry(self.registry_path).set_value('Wine/DX11', 'FullyWorking', 1)
+        self.assertEqual(self.read_registry(), self.original_content)
+        session.commit()
+        registry = WineRegistry(self.registry_path)
+        self.assertEqual(registry.query('Control Panel/Desktop', 'DragWidth'), '8')
+        self.assertEqual(registry.query('Wine/DX11', 'FullyWorking'), 1)
+        self.assertFalse(os.path.exists(self.registry_path + '.tmp'))
+
+    def test_multiline_value_at_end_of_file(self):
+        with open(self.registry_path, 'a') as registry_file:
+            registry_file.write('\n[Software\\\\Last] 1477412318\n"Data"=hex:00,01,\\\n  02,03\n')
+        registry = WineRegistry(self.registry_path)
+        self.assertEqual(registry.keys['Software/Last'].subkeys['Data'], 'hex:00,01,\\\n  02,03')
+        self.assertEqual(registry.render(), self.read_registry())
+
+    def test_unchanged_registry_is_not_written(self):
+        os.utime(self.registry_path, (0, 0))
+        session = WineRegistrySession()
+        session.get_registry(self.registry_path).set_value('Control Panel/Desktop', 'DragWidth', '4')
+        session.commit()
+        self.assertEqual(os.stat(self.registry_path).st_mtime, 0)
+
 
 class TestWineRegistryKey(TestCase):
     def test_creation_by_key_def_parses(self):
@@ -1,10 +1,14 @@
 import logging
+import os
+import tempfile
+from unittest import TestCase
 from unittest.mock import patch
 
 from test_pga import DatabaseTester
 
 from lutris import runners
 from lutris.config import LutrisConfig
+from lutris.runners import metadata
 from lutris.util.test_config import setup_test_environment
 
 LOGGER = logging.getLogger(__name__)
@@ -108,3 +112,38 @@ class ImportRunnerTest(DatabaseTester):
             self.assertEqual(game_config.runner_slug, 'wine')
             wine = wine_runner(game_config)
             self.assertEqual(wine.system_config.get('resolution'), '1680x1050')
+
+
+class RunnerMetadataTest(TestCase):
+    def setUp(self):
+        self.cache_dir = tempfile.TemporaryDirectory()
+        self.cache_path = os.path.join(self.cache_dir.name, "runners.json")
+        self.cache = metadata.RunnerMetadataCache(self.cache_path)
+
+    def tearDown(self):
+        self.cache_dir.cleanup()
+
+    def test_metadata_matches_runners(self):
+        for runner_name in runners.__all__:
+            runner = runners.import_runner(runner_name)()
+            runner_metadata = self.cache.get(runner_name)
+            self.assertEqual(runner_metadata["human_name"], runner.human_name)
+            self.assertEqual(runner_metadata["platforms"], runner.platforms)
+            self.assertEqual(
+                metadata.is_runner_installed(runner_name, save=False),
+                runner.is_installed(),
+                "Wrong installation status for %s" % runner_name
+            )
+
+    def test_metadata_is_read_from_cache(self):
+        self.cache.get("snes9x")
+        with patch("lutris.runners.metadata.read_runner_metadata") as read_runner_metadata:
+            cache = metadata.RunnerMetadataCache(self.cache_path)
+            self.assertEqual(cache.get("snes9x")["human_name"], "Snes9x")
+            self.assertFalse(read_runner_metadata.called)
+
+    def test_outdated_metadata_is_read_again(self):
+        runner_metadata = self.cache.get("snes9x")
+        for path in runner_metadata["mtimes"]:
+            runner_metadata["mtimes"][path] = 0
+        self.assertIsNot(self.cache.get("snes9x"), runner_metadata)
@@ -0,0 +1,63 @@
+import os
+import tempfile
+from unittest import TestCase
+from unittest.mock import patch
+
+import cairo
+
+from lutris.gui.widgets import utils
+from lutris.util.test_config import setup_test_environment
+
+setup_test_environment()
+
+
+class TestThumbnailCache(TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        cache_path = os.path.join(self.temp_dir.name, "thumbnails")
+        for patcher in (
+            patch.object(utils, "THUMBNAIL_CACHE_PATH", cache_path),
+            patch.object(utils, "_thumbnail_cache_size", None),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.image_path = os.path.join(self.temp_dir.name, "banner.png")
+        with open(self.image_path, "wb") as image_file:
+            image_file.write(b"not read by the thumbnail cache")
+
+    def write_thumbnail(self, size=(184, 69)):
+        surface = cairo.ImageSurface(cairo.Format.ARGB32, size[0], size[1])  # pylint:disable=no-member
+        utils.write_thumbnail(surface, self.image_path, size, 1)
+
+    def test_thumbnail_round_trip(self):
+        self.assertIsNone(utils.read_thumbnail(self.image_path, (184, 69), 1))
+        self.write_thumbnail()
+        surface = utils.read_thumbnail(self.image_path, (184, 69), 1)
+        self.assertEqual((surface.get_width(), surface.get_height()), (184, 69))
+        self.assertIsNone(utils.read_thumbnail(self.image_path, (184, 69), 2))
+
+    def test_modified_image_invalidates_thumbnail(self):
+        self.write_thumbnail()
+        mtime = os.stat(self.image_path).st_mtime_ns + 1000000000
+        os.utime(self.image_path, ns=(mtime, mtime))
+        self.assertIsNone(utils.read_thumbnail(self.image_path, (184, 69), 1))
+
+    def test_cache_is_pruned_to_its_maximum_size(self):
+        self.write_thumbnail((32, 32))
+        thumbnail_size = os.path.getsize(utils.get_thumbnail_path(self.image_path, (32, 32), 1))
+        with patch.object(utils, "MAX_THUMBNAIL_CACHE_SIZE", thumbnail_size * 2):
+            self.write_thumbnail((64, 64))
+            self.write_thumbnail((128, 128))
+        cache_size = sum(
+            os.path.getsize(os.path.join(utils.THUMBNAIL_CACHE_PATH, filename))
+            for filename in os.listdir(utils.THUMBNAIL_CACHE_PATH)
+        )
+        self.assertLessEqual(cache_size, thumbnail_size * 2)
+        self.assertIsNone(utils.read_thumbnail(self.image_path, (32, 32), 1))
+
+    def test_prune_keeps_the_cache_under_a_size(self):
+        self.write_thumbnail((32, 32))
+        self.assertGreater(utils.prune_thumbnail_cache(10 ** 9), 0)
+        self.assertEqual(utils.prune_thumbnail_cache(0), 0)
+        self.assertEqual(os.listdir(utils.THUMBNAIL_CACHE_PATH), [])
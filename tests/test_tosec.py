@@ -0,0 +1,135 @@
+import hashlib
+import os
+import tempfile
+import unittest
+
+from lutris import settings
+from lutris.database import schema
+from lutris.scanners import tosec
+from lutris.util import hashing
+from lutris.util.test_config import setup_test_environment
+
+setup_test_environment()
+
+SONIC_DATA = b"sonic"
+DISK_1_DATA = b"multi disk 1"
+DISK_2_DATA = b"multi disk 2"
+
+DAT_TEMPLATE = """<?xml version="1.0"?>
+<datafile>
+    <header>
+        <name>Sega Genesis - Games</name>
+        <description>Sega Genesis - Games (TOSEC-v2023-01-01)</description>
+    </header>
+    <game name="Sonic (1991)(Sega)">
+        <description>Sonic (1991)(Sega)</description>
+        <rom name="Sonic (1991)(Sega).md" size="5" crc="0A1B2C3D" md5="{sonic}"/>
+    </game>
+    <machine name="Multi (1992)(Sega)">
+        <rom name="Multi (1992)(Sega)(Disk 1 of 2).md" size="12" md5="{disk_1}"/>
+        <rom name="Multi (1992)(Sega)(Disk 2 of 2).md" size="12" md5="{disk_2}"/>
+    </machine>
+</datafile>
+"""
+
+
+def get_md5(data):
+    return hashlib.md5(data).hexdigest()
+
+
+class TosecTestCase(unittest.TestCase):
+    def setUp(self):
+        if os.path.exists(settings.PGA_DB):
+            os.remove(settings.PGA_DB)
+        schema.syncdb()
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.original_cache = hashing.HASH_CACHE
+        hashing.HASH_CACHE = hashing.HashCache(os.path.join(self.temp_dir.name, "hashes.json"))
+        self.dat_path = os.path.join(self.temp_dir.name, "genesis.dat")
+        with open(self.dat_path, "w", encoding="utf-8") as dat_file:
+            dat_file.write(DAT_TEMPLATE.format(
+                sonic=get_md5(SONIC_DATA).upper(),
+                disk_1=get_md5(DISK_1_DATA),
+                disk_2=get_md5(DISK_2_DATA),
+            ))
+
+    def tearDown(self):
+        hashing.HASH_CACHE = self.original_cache
+        self.temp_dir.cleanup()
+
+    def create_rom_folder(self, files):
+        folder = os.path.join(self.temp_dir.name, "roms")
+        os.makedirs(folder)
+        for filename, data in files.items():
+            with open(os.path.join(folder, filename), "wb") as rom_file:
+                rom_file.write(data)
+        return folder
+
+
+class TestParseDat(TosecTestCase):
+    def test_roms_are_listed_with_their_game(self):
+        roms = list(tosec.parse_dat(self.dat_path))
+        self.assertEqual([rom["game"] for rom in roms], [
+            "Sonic (1991)(Sega)", "Multi (1992)(Sega)", "Multi (1992)(Sega)"
+        ])
+        self.assertEqual({rom["category"] for rom in roms}, {"Sega Genesis - Games"})
+        self.assertEqual(roms[0]["md5"], get_md5(SONIC_DATA))
+        self.assertEqual(roms[0]["crc"], "0a1b2c3d")
+        self.assertEqual(roms[0]["size"], 5)
+        self.assertEqual(roms[1]["sha1"], "")
+
+    def test_invalid_dat_is_rejected(self):
+        with open(self.dat_path, "w", encoding="utf-8") as dat_file:
+            dat_file.write("<datafile><game>")
+        with self.assertRaises(ValueError):
+            tosec.import_dat(self.dat_path)
+
+
+class TestSearchTosec(TosecTestCase):
+    def test_offline_search_returns_whole_sets(self):
+        self.assertEqual(tosec.import_dat(self.dat_path), 3)
+        results = tosec.search_tosec_by_md5s([get_md5(DISK_1_DATA), "unknown"], offline=True)
+        self.assertEqual(results["unknown"], [])
+        games = results[get_md5(DISK_1_DATA)]
+        self.assertEqual(len(games), 1)
+        self.assertEqual(games[0]["name"], "Multi (1992)(Sega)")
+        self.assertEqual(games[0]["category"]["name"], "Sega Genesis - Games")
+        self.assertEqual(len(games[0]["roms"]), 2)
+
+    def test_complete_sets_are_renamed(self):
+        tosec.import_dat(self.dat_path)
+        rom_files = {
+            "sonic.md": get_md5(SONIC_DATA),
+            "disk1.md": get_md5(DISK_1_DATA),
+            "disk2.md": get_md5(DISK_2_DATA),
+        }
+        games_by_md5 = tosec.search_tosec_by_md5s(rom_files.values(), offline=True)
+        self.assertEqual(sorted(tosec.get_rom_set_renames(rom_files, games_by_md5)), [
+            ("disk1.md", "Multi (1992)(Sega)(Disk 1 of 2).md"),
+            ("disk2.md", "Multi (1992)(Sega)(Disk 2 of 2).md"),
+            ("sonic.md", "Sonic (1991)(Sega).md"),
+        ])
+
+    def test_incomplete_sets_are_skipped(self):
+        tosec.import_dat(self.dat_path)
+        rom_files = {"disk1.md": get_md5(DISK_1_DATA), "unknown.md": "unknown"}
+        games_by_md5 = tosec.search_tosec_by_md5s(rom_files.values(), offline=True)
+        self.assertEqual(tosec.get_rom_set_renames(rom_files, games_by_md5), [])
+
+
+class TestScanFolder(TosecTestCase):
+    def test_dry_run_reports_renames(self):
+        tosec.import_dat(self.dat_path)
+        folder = self.create_rom_folder({"sonic.md": SONIC_DATA, "sonic.srm": b"save", "disk1.md": DISK_1_DATA})
+        renames = tosec.scan_folder(folder, dry_run=True, offline=True)
+        self.assertEqual(renames, [
+            ("sonic.srm", "Sonic (1991)(Sega).srm"),
+            ("sonic.md", "Sonic (1991)(Sega).md"),
+        ])
+        self.assertEqual(sorted(os.listdir(folder)), ["disk1.md", "sonic.md", "sonic.srm"])
+
+    def test_roms_are_renamed(self):
+        tosec.import_dat(self.dat_path)
+        folder = self.create_rom_folder({"sonic.md": SONIC_DATA, "sonic.srm": b"save"})
+        tosec.scan_folder(folder, offline=True)
+        self.assertEqual(sorted(os.listdir(folder)), ["Sonic (1991)(Sega).md", "Sonic (1991)(Sega).srm"])
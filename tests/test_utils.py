@@ -1,9 +1,13 @@
+import hashlib
+import json
 import os
+import tempfile
+import zlib
 from collections import OrderedDict
-from unittest import TestCase
+from unittest import TestCase, mock
 
 from lutris.util.wine import wine
-from lutris.util import fileio, strings, system
+from lutris.util import fileio, hashing, probe_cache, profiling, strings, system
 from lutris.util.steam import vdfutils
 
 
@@ -174,3 +178,117 @@ class TestSubstitute(TestCase):
     def test_can_sub_game_files_with_dashes_in_key(self):
         replacements = {'steam-data': '/tmp'}
         self.assertEqual(system.substitute('--path=$steam-data', replacements), '--path=/tmp')
+
+
+class TestHashing(TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.original_cache = hashing.HASH_CACHE
+        hashing.HASH_CACHE = hashing.HashCache(os.path.join(self.temp_dir.name, "hashes.json"))
+        self.content = b"lutris" * 100000
+        self.rom_path = os.path.join(self.temp_dir.name, "game.rom")
+        with open(self.rom_path, "wb") as rom_file:
+            rom_file.write(self.content)
+
+    def tearDown(self):
+        hashing.HASH_CACHE = self.original_cache
+        self.temp_dir.cleanup()
+
+    def test_hashes_all_algorithms_in_one_pass(self):
+        hashes = hashing.hash_file(self.rom_path)
+        self.assertEqual(hashes["md5"], hashlib.md5(self.content).hexdigest())
+        self.assertEqual(hashes["sha1"], hashlib.sha1(self.content).hexdigest())
+        self.assertEqual(hashes["sha256"], hashlib.sha256(self.content).hexdigest())
+        self.assertEqual(hashes["crc32"], "%08x" % zlib.crc32(self.content))
+        self.assertEqual(system.get_md5_hash(self.rom_path), hashes["md5"])
+
+    def test_cache_is_persistent_and_follows_changes(self):
+        md5 = hashing.get_file_hash(self.rom_path, "md5")
+        self.assertFalse(os.path.exists(hashing.HASH_CACHE.path))
+        hashing.save_hash_cache()
+        reloaded_cache = hashing.HashCache(hashing.HASH_CACHE.path)
+        key = hashing.get_file_key(os.stat(self.rom_path))
+        self.assertEqual(reloaded_cache.get(key)["md5"], md5)
+
+        with open(self.rom_path, "ab") as rom_file:
+            rom_file.write(b"changed")
+        self.assertEqual(hashing.get_file_hash(self.rom_path, "md5"),
+                         hashlib.md5(self.content + b"changed").hexdigest())
+
+    def test_cache_evicts_least_recently_used(self):
+        cache = hashing.HashCache(os.path.join(self.temp_dir.name, "lru.json"))
+        max_cache_entries = hashing.MAX_CACHE_ENTRIES
+        hashing.MAX_CACHE_ENTRIES = 2
+        try:
+            cache.update("old", {"md5": "1"})
+            cache.update("new", {"md5": "2"})
+            self.assertEqual(cache.get("old"), {"md5": "1"})
+            cache.update("newest", {"md5": "3"})
+        finally:
+            hashing.MAX_CACHE_ENTRIES = max_cache_entries
+        self.assertEqual(cache.get("new"), {})
+        self.assertEqual(cache.get("old"), {"md5": "1"})
+
+    def test_hash_directory(self):
+        other_path = os.path.join(self.temp_dir.name, "other.rom")
+        with open(other_path, "wb") as rom_file:
+            rom_file.write(b"other")
+        hashes = hashing.hash_directory(self.temp_dir.name, ("md5", ))
+        self.assertEqual(hashes[other_path], {"md5": hashlib.md5(b"other").hexdigest()})
+        self.assertIn(self.rom_path, hashes)
+        self.assertNotIn(hashing.HASH_CACHE.path, hashes)
+
+
+class TestTimeline(TestCase):
+    def test_disabled_timeline_records_nothing(self):
+        timeline = profiling.Timeline()
+        with timeline.phase("imports"):
+            pass
+        timeline.mark("first_paint")
+        self.assertEqual(timeline.events, [])
+
+    def test_saves_chrome_trace(self):
+        timeline = profiling.Timeline()
+        timeline.start()
+        timeline.begin("main_window")
+        with timeline.phase("checks"):
+            with timeline.phase("check_libs"):
+                pass
+        timeline.end("main_window")
+        timeline.mark("first_paint")
+        self.assertEqual(set(timeline.get_durations()), {"main_window", "checks", "check_libs"})
+        with tempfile.TemporaryDirectory() as temp_dir:
+            trace_path = os.path.join(temp_dir, "trace.json")
+            timeline.save(trace_path)
+            with open(trace_path, encoding="utf-8") as trace_file:
+                events = json.load(trace_file)["traceEvents"]
+        self.assertEqual([event["name"] for event in events], ["check_libs", "checks", "main_window", "first_paint"])
+        checks, check_libs = events[1], events[0]
+        self.assertLessEqual(checks["ts"], check_libs["ts"])
+        self.assertGreaterEqual(checks["ts"] + checks["dur"], check_libs["ts"] + check_libs["dur"])
+
+
+class TestProbeCache(TestCase):
+    def setUp(self):
+        self.cache_dir = tempfile.TemporaryDirectory()
+        self.cache_path = os.path.join(self.cache_dir.name, "system-probes.json")
+        self.probe_count = 0
+
+    def tearDown(self):
+        self.cache_dir.cleanup()
+
+    def probe(self):
+        self.probe_count += 1
+        return ["libc.so.6 (libc6,x86-64) => /lib/x86_64-linux-gnu/libc.so.6"]
+
+    def test_probes_run_once_per_system(self):
+        probe_cache.ProbeCache(self.cache_path).get("ldconfig", self.probe)
+        cache = probe_cache.ProbeCache(self.cache_path)
+        self.assertEqual(cache.get("ldconfig", self.probe), self.probe())
+        self.assertEqual(self.probe_count, 2)
+
+    def test_probes_run_again_when_system_changes(self):
+        probe_cache.ProbeCache(self.cache_path).get("ldconfig", self.probe)
+        with mock.patch.dict(os.environ, {"DRI_PRIME": "1"}):
+            probe_cache.ProbeCache(self.cache_path).get("ldconfig", self.probe)
+        self.assertEqual(self.probe_count, 2)
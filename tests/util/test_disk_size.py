@@ -0,0 +1,50 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from lutris.util.disk_size import DiskSizeIndex
+from lutris.util.system import get_disk_size
+
+
+class TestDiskSizeIndex(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.game_dir = os.path.join(self.temp_dir, "game")
+        self.write_file("data/level1.pak", 1000)
+        self.write_file("data/music/theme.ogg", 300)
+        self.write_file("game.exe", 20)
+        os.symlink("/", os.path.join(self.game_dir, "root"))
+        self.age_folders()
+        self.index = DiskSizeIndex(os.path.join(self.temp_dir, "disk-sizes.json"))
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def write_file(self, path, size):
+        path = os.path.join(self.game_dir, path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as data_file:
+            data_file.write(b"\0" * size)
+
+    def age_folders(self):
+        """Date the folders back, recently modified folders aren't indexed"""
+        for base, dirs, _files in os.walk(self.game_dir):
+            for directory in [base] + [os.path.join(base, name) for name in dirs]:
+                os.utime(directory, (0, 0))
+
+    def test_sizes_folders_like_get_disk_size(self):
+        self.assertIsNone(self.index.get_cached_size(self.game_dir))
+        self.assertEqual(self.index.get_size(self.game_dir), 1320)
+        self.assertEqual(get_disk_size(self.game_dir), 1320)
+        self.assertEqual(self.index.get_cached_size(self.game_dir), 1320)
+        self.assertEqual(DiskSizeIndex(self.index.path).get_cached_size(self.game_dir), 1320)
+
+    def test_only_changed_folders_are_listed_again(self):
+        self.index.get_size(self.game_dir)
+        self.index.entries[os.path.join(self.game_dir, "data")]["size"] = 1
+        self.write_file("data/music/credits.ogg", 5)
+        shutil.rmtree(os.path.join(self.game_dir, "data", "music"))
+        self.age_folders()
+        self.assertEqual(self.index.get_size(self.game_dir), 21)
+        self.assertNotIn(os.path.join(self.game_dir, "data", "music"), self.index.entries)
@@ -0,0 +1,73 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from lutris.util.log_store import LogStore
+
+
+class TestLogStore(unittest.TestCase):
+    def setUp(self):
+        self.spill_dir = tempfile.mkdtemp()
+        self.store = LogStore(max_memory_lines=10, block_lines=4, spill_dir=self.spill_dir)
+        self.text = "".join("Line %s\n" % number for number in range(50)) + "last"
+        for position in range(0, len(self.text), 7):
+            self.store.append(self.text[position:position + 7])
+
+    def tearDown(self):
+        self.store.clear()
+        shutil.rmtree(self.spill_dir)
+
+    def test_older_lines_are_spilled_to_disk(self):
+        self.assertEqual(self.store.line_count, 50)
+        self.assertEqual(self.store.spilled_line_count, 40)
+        self.assertTrue(os.path.exists(self.store.spill_path))
+        self.assertEqual(self.store.get_recent_text(), self.text[self.text.index("Line 40"):])
+        self.assertEqual("".join(self.store.iter_text()), self.text)
+
+    def test_get_lines_across_blocks(self):
+        self.assertEqual(self.store.get_lines(2, 3), ["Line 2", "Line 3", "Line 4"])
+        self.assertEqual(self.store.get_lines(38, 4), ["Line 38", "Line 39", "Line 40", "Line 41"])
+        self.assertEqual(self.store.get_lines(49, 5), ["Line 49", "last"])
+        self.assertEqual(self.store.get_lines(0, 100), self.text.split("\n"))
+        self.assertEqual(self.store.get_lines(60, 5), [])
+
+    def test_search_ignores_case_and_wraps_around(self):
+        self.assertEqual(self.store.search("line 3"), 3)
+        self.assertEqual(self.store.search("line 3", 4), 30)
+        self.assertEqual(self.store.search("line 3", 40), 3)
+        self.assertEqual(self.store.search("LAST", 10), 50)
+        self.assertIsNone(self.store.search("missing"))
+
+    def test_search_backward(self):
+        self.assertEqual(self.store.search("line 3", 31, backward=True), 30)
+        self.assertEqual(self.store.search("line 3", 3, backward=True), 39)
+        self.assertEqual(self.store.search("line 4", 48, backward=True), 47)
+
+    def test_find_lines(self):
+        self.assertEqual(self.store.find_lines("Line 1"), ["Line 1"] + ["Line 1%s" % number for number in range(10)])
+
+    def test_clear_removes_the_spill_file(self):
+        spill_path = self.store.spill_path
+        self.store.clear()
+        self.assertFalse(os.path.exists(spill_path))
+        self.assertEqual(self.store.line_count, 0)
+        self.assertEqual(self.store.get_lines(0, 10), [])
+        self.store.append("new\n")
+        self.assertEqual(self.store.get_lines(0, 10), ["new"])
+
+
+class TestSpillFilePruning(unittest.TestCase):
+    def setUp(self):
+        self.spill_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.spill_dir)
+
+    def test_files_of_stopped_processes_are_removed(self):
+        filenames = ["%s-live.log.z" % os.getpid(), "999999999-stale.log.z", "legacy.log.z", "notes.txt"]
+        for filename in filenames:
+            with open(os.path.join(self.spill_dir, filename), "wb"):
+                pass
+        LogStore(spill_dir=self.spill_dir)
+        self.assertEqual(sorted(os.listdir(self.spill_dir)), ["%s-live.log.z" % os.getpid(), "notes.txt"])
@@ -0,0 +1,33 @@
+import unittest
+
+from lutris.util.lru_cache import LRUCache
+
+
+class TestLRUCache(unittest.TestCase):
+    def setUp(self):
+        self.cache = LRUCache(10)
+
+    def test_discards_least_recently_used_values_over_budget(self):
+        self.cache["a"] = "aaaa"
+        self.cache["b"] = "bbbb"
+        self.assertEqual(self.cache["a"], "aaaa")
+        self.cache["c"] = "cccc"
+        self.assertIn("a", self.cache)
+        self.assertNotIn("b", self.cache)
+        self.assertIn("c", self.cache)
+        self.assertEqual(self.cache.size, 8)
+
+    def test_replacing_a_value_updates_the_size(self):
+        self.cache["a"] = "aaaa"
+        self.cache["a"] = "aa"
+        self.assertEqual(len(self.cache), 1)
+        self.assertEqual(self.cache.size, 2)
+        self.assertEqual(self.cache.pop("a"), "aa")
+        self.assertEqual(self.cache.size, 0)
+
+    def test_keeps_a_value_larger_than_the_budget(self):
+        self.cache["a"] = "a"
+        self.cache["big"] = "b" * 20
+        self.assertEqual(len(self.cache), 1)
+        self.assertIn("big", self.cache)
+        self.assertIsNone(self.cache.get("a"))
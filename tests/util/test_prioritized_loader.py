@@ -0,0 +1,55 @@
+import threading
+import unittest
+
+from lutris.util.prioritized_loader import PrioritizedLoader
+
+
+class TestPrioritizedLoader(unittest.TestCase):
+    def setUp(self):
+        self.loader = PrioritizedLoader(max_workers=1)
+        self.results = []
+        self.done = threading.Event()
+        self.release = threading.Event()
+
+    def on_loaded(self, key, result, error):
+        self.results.append((key, result, error))
+        if key == "last":
+            self.done.set()
+
+    def test_runs_jobs_by_priority(self):
+        self.loader.submit("blocker", 0, self.release.wait, self.on_loaded, 5)
+        self.loader.submit("far", 5, str.upper, self.on_loaded, "far")
+        self.loader.submit("near", 1, str.upper, self.on_loaded, "near")
+        self.loader.submit("scrolled-past", 2, str.upper, self.on_loaded, "scrolled-past")
+        self.loader.submit("last", 9, str.upper, self.on_loaded, "last")
+        self.loader.submit("far", 0, str.upper, self.on_loaded, "far")
+        self.assertTrue(self.loader.cancel("scrolled-past"))
+        self.assertFalse(self.loader.cancel("unknown"))
+        self.release.set()
+        self.assertTrue(self.done.wait(5))
+        self.assertEqual(
+            [key for key, _result, _error in self.results],
+            ["blocker", "far", "near", "last"]
+        )
+        self.assertEqual(self.results[1], ("far", "FAR", None))
+
+    def test_reports_errors_to_callback(self):
+        self.loader.submit("last", 0, int, self.on_loaded, "not a number")
+        self.assertTrue(self.done.wait(5))
+        _key, result, error = self.results[0]
+        self.assertIsNone(result)
+        self.assertIsInstance(error, ValueError)
+
+    def test_cancel_if(self):
+        self.loader.submit("blocker", 0, self.release.wait, self.on_loaded, 5)
+        for index in range(4):
+            self.loader.submit(("row", index), index, str, self.on_loaded, index)
+        self.loader.submit("last", 9, str, self.on_loaded, "last")
+        cancelled = self.loader.cancel_if(lambda key: key[0] == "row" and key[1] > 1)
+        self.assertEqual(sorted(cancelled), [("row", 2), ("row", 3)])
+        self.release.set()
+        self.assertTrue(self.done.wait(5))
+        self.assertEqual(
+            [key for key, _result, _error in self.results],
+            ["blocker", ("row", 0), ("row", 1), "last"]
+        )
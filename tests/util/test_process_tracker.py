@@ -0,0 +1,54 @@
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+import uuid
+from unittest.mock import PropertyMock, patch
+
+from lutris.util.process import Process
+from lutris.util.process_tracker import ProcessTracker
+from lutris.util.system import get_running_pid_list
+
+
+class TestProcessTracker(unittest.TestCase):
+    def setUp(self):
+        self.game_folder = tempfile.mkdtemp()
+        self.game_uuid = str(uuid.uuid4())
+        self.tracker = ProcessTracker(self.game_uuid, self.game_folder, get_running_pid_list())
+        self.processes = []
+
+    def tearDown(self):
+        for process in self.processes:
+            process.kill()
+            process.wait()
+        os.rmdir(self.game_folder)
+
+    def start_process(self, game_uuid=None, folder=None):
+        env = dict(os.environ)
+        if game_uuid:
+            env["LUTRIS_GAME_UUID"] = game_uuid
+        process = subprocess.Popen(
+            [sys.executable, "-c", "import time; time.sleep(30)", folder or self.game_folder], env=env
+        )
+        self.processes.append(process)
+        return process
+
+    def test_finds_game_processes(self):
+        game_process = self.start_process(self.game_uuid)
+        self.start_process()
+        self.start_process(str(uuid.uuid4()))
+        self.start_process(self.game_uuid, folder="/")
+        self.assertEqual(self.tracker.get_pids(), {game_process.pid})
+        game_process.kill()
+        game_process.wait()
+        self.assertEqual(self.tracker.get_pids(), set())
+
+    def test_environment_is_read_once_per_process(self):
+        game_process = self.start_process(self.game_uuid)
+        with patch.object(Process, "environ", new_callable=PropertyMock) as environ:
+            environ.return_value = {"LUTRIS_GAME_UUID": self.game_uuid}
+            self.assertIn(game_process.pid, self.tracker.get_pids())
+            read_count = environ.call_count
+            self.assertIn(game_process.pid, self.tracker.get_pids())
+            self.assertEqual(environ.call_count, read_count)
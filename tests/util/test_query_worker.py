@@ -0,0 +1,49 @@
+import threading
+import unittest
+from unittest.mock import patch
+
+from lutris.util.jobs import QueryWorker
+
+
+def call_now(func, *args):
+    func(*args)
+
+
+@patch("lutris.util.jobs.schedule_at_idle", call_now)
+class TestQueryWorker(unittest.TestCase):
+    def setUp(self):
+        self.worker = QueryWorker()
+        self.calls = []
+        self.results = []
+        self.done = threading.Event()
+        self.started = threading.Event()
+
+    def query(self, generation, text, release=None):
+        self.calls.append(text)
+        self.started.set()
+        if release:
+            release.wait(5)
+        return generation, text.upper()
+
+    def on_result(self, result, error):
+        self.results.append((result, error))
+        self.done.set()
+
+    def test_only_the_latest_query_is_delivered(self):
+        release = threading.Event()
+        first = self.worker.submit(self.query, self.on_result, "l", release)
+        self.assertTrue(self.started.wait(5))
+        self.worker.submit(self.query, self.on_result, "lu")
+        last = self.worker.submit(self.query, self.on_result, "lut")
+        self.assertFalse(self.worker.is_current(first))
+        release.set()
+        self.assertTrue(self.done.wait(5))
+        self.assertEqual(self.calls, ["l", "lut"])
+        self.assertEqual(self.results, [((last, "LUT"), None)])
+
+    def test_errors_are_passed_to_the_callback(self):
+        self.worker.submit(self.query, self.on_result, None)
+        self.assertTrue(self.done.wait(5))
+        result, error = self.results[0]
+        self.assertIsNone(result)
+        self.assertIsInstance(error, AttributeError)
@@ -0,0 +1,31 @@
+import os
+import time
+import unittest
+
+from lutris.util.resource_sampler import ResourceSampler
+
+
+class TestResourceSampler(unittest.TestCase):
+    def setUp(self):
+        self.sampler = ResourceSampler(lambda: {os.getpid()}, max_samples=2)
+        self.sampler.started_at = time.time()
+
+    def test_samples_own_process(self):
+        first_sample = self.sampler.take_sample()
+        end = time.process_time() + 0.05
+        while time.process_time() < end:
+            pass
+        sample = self.sampler.take_sample()
+        self.assertEqual(sample.processes, 1)
+        self.assertGreater(sample.cpu_time, first_sample.cpu_time)
+        self.assertGreater(sample.rss, 0)
+        self.assertGreaterEqual(sample.threads, 1)
+
+    def test_summary_covers_dropped_samples(self):
+        for _ in range(3):
+            self.sampler.take_sample()
+        self.assertEqual(len(self.sampler.samples), 2)
+        summary = self.sampler.get_summary()
+        self.assertEqual(summary["samples"], 3)
+        self.assertGreaterEqual(summary["rss_max"], max(sample.rss for sample in self.sampler.samples))
+        self.assertEqual(summary["cpu_time"], self.sampler.samples[-1].cpu_time)